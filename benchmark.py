@@ -0,0 +1,975 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""数据库性能基准测试
+
+用法:
+    python benchmark.py
+
+所有测试都在临时目录中的新数据库上运行，不会影响 student_score.db。
+"""
+
+import copy
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import models
+import score_statistics
+from data_archive import ARCHIVE_SUFFIX, ArchiveReader, export_archive, import_archive, load_archive_rows
+from data_export import export_json
+from data_import import import_json, load_import_file
+from database import Database
+from models import (
+    AdditionRecord, CompensationRecord, DeductionRecord, DeductionType, ViolationType, date_to_day
+)
+
+
+# 插入记录时按学生姓名填入student_id
+STUDENT_ID = '(SELECT id FROM students WHERE name = ?)'
+
+
+class NameKeyedDatabase(Database):
+    """迁移8之前的数据库结构: 记录表以学生姓名引用学生，只用于对比测试"""
+    MIGRATIONS = Database.MIGRATIONS[:7]
+
+
+def make_database(directory: str, student_count: int, records_per_student: int = 20,
+                  database_class=Database) -> Database:
+    """创建一个填充了测试数据的数据库
+
+    参数:
+        directory: 数据库文件所在目录
+        student_count: 学生人数
+        records_per_student: 每个学生的扣分记录数，加分记录数为其一半
+        database_class: Database或NameKeyedDatabase
+    """
+    db_path = os.path.join(directory, f"bench_{database_class.__name__}_{student_count}.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = database_class(db_path)
+    student_column, student_value = student_key(db)
+    rng = random.Random(student_count)
+    base_date = datetime(2024, 9, 1)
+
+    students = [(f"学生{i:05d}", 100.0) for i in range(student_count)]
+    db.cursor.executemany('INSERT INTO students (name, initial_score) VALUES (?, ?)', students)
+
+    deduction_rows = []
+    addition_rows = []
+    for name, _ in students:
+        for _ in range(records_per_student):
+            date = base_date + timedelta(days=rng.randrange(150))
+            if rng.random() < 0.7:
+                deduction_rows.append((name, rng.choice([1.0, 2.0, 5.0]), date_to_day(date), 1, rng.randrange(1, 8), None))
+            else:
+                deduction_rows.append((name, rng.choice([1.0, 2.0]), date_to_day(date), 2, None, "福利卷"))
+        for week in range(records_per_student // 2):
+            start = base_date + timedelta(days=week * 7)
+            end = start + timedelta(days=6)
+            addition_rows.append((name, rng.choice([1.0, 2.0, 3.0]), f"第{week + 1}周", date_to_day(start), date_to_day(end)))
+
+    db.cursor.executemany(
+        f'''
+        INSERT INTO deduction_records
+        ({student_column}, points, date, deduction_type, violation_type, non_violation_type)
+        VALUES ({student_value}, ?, ?, ?, ?, ?)
+        ''',
+        deduction_rows
+    )
+    db.cursor.executemany(
+        f'INSERT INTO addition_records ({student_column}, points, reason, start_date, end_date) '
+        f'VALUES ({student_value}, ?, ?, ?, ?)',
+        addition_rows
+    )
+    db.conn.commit()
+    db.invalidate_tables('students', 'deduction_records', 'addition_records')
+    return db
+
+
+def student_key(db: Database) -> tuple:
+    """记录表中引用学生的列名，以及按学生姓名填入该列的SQL表达式"""
+    if isinstance(db, NameKeyedDatabase):
+        return 'student_name', '?'
+    return 'student_id', STUDENT_ID
+
+
+def count_queries(db: Database, func, *args, **kwargs):
+    """执行func并统计其间发出的SQL语句数量
+
+    返回:
+        (语句数量, 耗时秒数, func的返回值)
+    """
+    statements = []
+    set_trace(db, statements.append)
+    try:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    finally:
+        set_trace(db, None)
+    return len(statements), elapsed, result
+
+
+def set_trace(db: Database, callback):
+    """在写连接和只读连接上设置SQL跟踪回调"""
+    db.conn.set_trace_callback(callback)
+    db.read_conn.set_trace_callback(callback)
+
+
+def bench_total_score_ranking(directory: str):
+    """总分排名: 查询次数应与学生人数无关"""
+    print("总分排名 (get_total_score_ranking)")
+    for student_count in (50, 500, 5000):
+        db = make_database(directory, student_count)
+        queries, elapsed, ranking = count_queries(db, db.get_total_score_ranking)
+        print(f"  学生数 {student_count:>5}: 查询 {queries} 次, 耗时 {elapsed * 1000:8.2f} ms, 返回 {len(ranking)} 行")
+        db.close()
+
+
+def bench_deduction_ranking(directory: str):
+    """扣分排名: 每种排序方式只需一次扫描"""
+    print("扣分排名 (get_deduction_ranking)")
+    for student_count in (50, 500, 5000):
+        db = make_database(directory, student_count)
+        for sort_by in ("total", "violation", "non_violation"):
+            queries, elapsed, ranking = count_queries(db, db.get_deduction_ranking, sort_by)
+            print(f"  学生数 {student_count:>5} [{sort_by:<13}]: 查询 {queries} 次, 耗时 {elapsed * 1000:8.2f} ms, 返回 {len(ranking)} 行")
+        db.close()
+
+
+def bench_score_summary(directory: str):
+    """单个学生总分: 读取汇总表，耗时与历史记录数量无关"""
+    print("单个学生总分 (get_student_score_summary)")
+    for records_per_student in (20, 200, 2000):
+        db = make_database(directory, 100, records_per_student)
+        queries, elapsed, _ = count_queries(db, db.get_student_score_summary, "学生00000")
+        print(f"  每人记录数 {records_per_student:>5}: 查询 {queries} 次, 耗时 {elapsed * 1000:8.3f} ms")
+        db.close()
+
+
+def bench_query_cache(directory: str):
+    """查询缓存: 重复打开排名对话框时由缓存直接返回"""
+    print("查询缓存 (get_total_score_ranking 重复调用)")
+    db = make_database(directory, 5000)
+    db.clear_query_cache()
+    cold_queries, cold, _ = count_queries(db, db.get_total_score_ranking)
+    warm_queries, warm, _ = count_queries(db, db.get_total_score_ranking)
+    print(f"  首次: 查询 {cold_queries} 次, 耗时 {cold * 1000:8.3f} ms")
+    print(f"  缓存: 查询 {warm_queries} 次, 耗时 {warm * 1000:8.3f} ms")
+    print(f"  统计: {db.get_cache_stats()}")
+    db.close()
+
+
+def bench_bulk_deductions(directory: str):
+    """批量扣分: 逐条提交 vs 一个事务内executemany"""
+    print("批量扣分 (add_deduction_record 逐条 vs bulk_add_deduction_records)")
+    record_count = 2000
+
+    def make_records():
+        return [
+            DeductionRecord(
+                f"学生{i % 50:05d}", 1.0, datetime(2024, 10, 1), DeductionType.VIOLATION,
+                violation_type=ViolationType.课堂违纪
+            )
+            for i in range(record_count)
+        ]
+
+    db = make_database(directory, 50)
+    start = time.perf_counter()
+    for record in make_records():
+        db.add_deduction_record(record)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = db.bulk_add_deduction_records(make_records())
+    bulk = time.perf_counter() - start
+    print(f"  逐条插入 {record_count} 条: {single * 1000:8.2f} ms ({record_count} 次提交)")
+    print(f"  批量插入 {result['inserted']} 条: {bulk * 1000:8.2f} ms (1 次提交)")
+    db.close()
+
+
+def bench_batch_additions(directory: str):
+    """全班加分: 逐个add_addition_record vs add_batch_addition_records"""
+    print("全班加分 (add_addition_record 逐条 vs add_batch_addition_records)")
+    student_count = 500
+    db = make_database(directory, student_count)
+
+    def make_records(week: int):
+        start = datetime(2025, 3, 3) + timedelta(days=week * 7)
+        return [
+            AdditionRecord(f"学生{i:05d}", 2.0, "全勤", start, start + timedelta(days=6))
+            for i in range(student_count)
+        ]
+
+    queries, single, _ = count_queries(db, lambda: [db.add_addition_record(r) for r in make_records(0)])
+    print(f"  逐条添加 {student_count} 人: 语句 {queries} 条, 耗时 {single * 1000:8.2f} ms")
+    queries, batch, result = count_queries(db, db.add_batch_addition_records, make_records(1))
+    print(f"  批量添加 {result['inserted']} 人: 语句 {queries} 条, 耗时 {batch * 1000:8.2f} ms")
+    db.close()
+
+
+def explain_queries(db: Database, func, *args, **kwargs):
+    """执行func，返回其间每条SELECT语句的EXPLAIN QUERY PLAN明细"""
+    statements = []
+    set_trace(db, statements.append)
+    try:
+        func(*args, **kwargs)
+    finally:
+        set_trace(db, None)
+    # 在新连接上解释: 同一连接缓存的EXPLAIN语句在索引变化后不会重新生成计划
+    conn = sqlite3.connect(db.db_path)
+    try:
+        plans = []
+        for sql in statements:
+            if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                plans.extend(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        return plans
+    finally:
+        conn.close()
+
+
+def bench_addition_interval_index(directory: str):
+    """加分时间段查询: 120000条加分记录上有无区间索引的查询计划和耗时"""
+    print("加分时间段查询 (idx_addition_student_period / idx_addition_period)")
+    student_count = 2000
+    weeks = 60
+    db = make_database(directory, student_count, 0)
+    base_date = datetime(2023, 9, 4)
+    addition_rows = [
+        (f"学生{i:05d}", 1.0, f"第{week + 1}周",
+         date_to_day(base_date + timedelta(days=week * 7)),
+         date_to_day(base_date + timedelta(days=week * 7 + 6)))
+        for i in range(student_count)
+        for week in range(weeks)
+    ]
+    db.cursor.executemany(
+        f'INSERT INTO addition_records (student_id, points, reason, start_date, end_date) '
+        f'VALUES ({STUDENT_ID}, ?, ?, ?, ?)',
+        addition_rows
+    )
+    db.cursor.execute("INSERT INTO groups (name, description, created_at) VALUES ('第一组', '', ?)", (base_date.isoformat(),))
+    group_id = db.cursor.lastrowid
+    db.cursor.executemany(
+        f'INSERT INTO student_groups (student_id, group_id, join_date) VALUES ({STUDENT_ID}, ?, ?)',
+        [(f"学生{i:05d}", group_id, base_date.isoformat()) for i in range(10)]
+    )
+    db.conn.commit()
+    db.invalidate_tables('addition_records', 'groups', 'student_groups')
+
+    last_week = base_date + timedelta(days=(weeks - 1) * 7)
+    start, end = last_week.strftime('%Y-%m-%d'), (last_week + timedelta(days=6)).strftime('%Y-%m-%d')
+    new_record = AdditionRecord(f"学生{student_count - 1:05d}", 1.0, "重叠检查", last_week + timedelta(days=2), last_week + timedelta(days=3))
+    cases = [
+        ("add_addition_record (重叠)", lambda: _swallow(db.add_addition_record, new_record)),
+        ("get_student_addition_records", lambda: db.get_student_addition_records(1, start, end)),
+        ("get_group_addition_records", lambda: db.get_group_addition_records(group_id, start, end)),
+        ("search_addition_records", lambda: db.search_addition_records(start_date=start, end_date=end)),
+        ("get_group_ranking_by_date_range", lambda: db.get_group_ranking_by_date_range(start, end)),
+    ]
+
+    def run_cases(label: str):
+        print(f"  [{label}] 加分记录 {len(addition_rows)} 条")
+        for name, func in cases:
+            db.clear_query_cache()
+            _, elapsed, _ = count_queries(db, func)
+            db.clear_query_cache()
+            plans = explain_queries(db, func)
+            print(f"    {name:<32} {elapsed * 1000:8.2f} ms")
+            for plan in plans:
+                print(f"      {plan}")
+
+    run_cases("有索引")
+    db.cursor.execute('DROP INDEX idx_addition_student_period')
+    db.cursor.execute('DROP INDEX idx_addition_period')
+    db.conn.commit()
+    run_cases("无索引")
+    db.close()
+
+
+def _swallow(func, *args):
+    """调用func，忽略重叠检查抛出的ValueError"""
+    try:
+        return func(*args)
+    except ValueError:
+        return None
+
+
+def bench_date_decode(directory: str):
+    """日期解码: 整数天数 vs ISO格式文本"""
+    print("日期解码 (DeductionRecord.from_dict)")
+    row_count = 100000
+    day = date_to_day(datetime(2024, 10, 1))
+    base = {
+        "id": 1, "student_name": "学生00000", "points": 1.0, "deduction_type": 1, "violation_type": 5
+    }
+    for label, value in (("整数天数", day), ("ISO文本", "2024-10-01T00:00:00"), ("日期文本", "2024-10-01")):
+        rows = [dict(base, date=value) for _ in range(row_count)]
+        start = time.perf_counter()
+        for row in rows:
+            DeductionRecord.from_dict(row)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<6} {row_count} 行: {elapsed * 1000:8.2f} ms")
+
+
+class PlainDeductionRecord:
+    """不使用__slots__、每个对象带__dict__的扣分记录，字段与DeductionRecord相同，用于对比内存占用"""
+
+    def __init__(self, record: DeductionRecord):
+        for name in DeductionRecord.__slots__:
+            setattr(self, name, getattr(record, name))
+
+
+def allocated_bytes(func) -> tuple:
+    """执行func，返回(返回值, 其间新分配且仍被占用的字节数)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, allocated
+
+
+def bench_record_construction(directory: str):
+    """构造记录对象: sqlite3.Row→dict→from_dict vs row_factory→from_row，以及每条记录的内存"""
+    print("构造扣分记录对象 (from_dict vs row_factory + from_row)")
+    db = make_database(directory, 10000, 100)
+    sql = f'SELECT {db._record_columns(DeductionRecord)} FROM deduction_records'
+    db.read_cursor.execute('SELECT COUNT(*) FROM deduction_records')
+    row_count = db.read_cursor.fetchone()[0]
+
+    def from_dict():
+        db.read_cursor.execute(sql)
+        return [DeductionRecord.from_dict(dict(row)) for row in db.read_cursor]
+
+    def from_row():
+        return db._fetch_records(DeductionRecord, '扣分', sql)
+
+    for label, load in (("sqlite3.Row→dict→from_dict", from_dict), ("row_factory→from_row", from_row)):
+        start = time.perf_counter()
+        records = load()
+        elapsed = time.perf_counter() - start
+        assert len(records) == row_count
+        print(f"  {label:<26} {row_count} 条: {elapsed * 1000:9.2f} ms, {row_count / elapsed:10.0f} 条/秒")
+        del records
+
+    # 字段值(字符串、datetime等)与对象本身分开统计: 复制对象时字段值共享，只新分配对象本身
+    records, total = allocated_bytes(from_row)
+    sample = records[:100000]
+    _, slotted = allocated_bytes(lambda: [copy.copy(record) for record in sample])
+    _, plain = allocated_bytes(lambda: [PlainDeductionRecord(record) for record in sample])
+    print(f"  每条记录共占用 {total / row_count:.0f} 字节(含字段值)")
+    print(f"  对象本身: __slots__ {slotted / len(sample):.0f} 字节, __dict__ {plain / len(sample):.0f} 字节")
+    del records, sample
+    db.close()
+
+
+def bench_record_batch(directory: str):
+    """按学生汇总扣分、小组成员加分统计: 记录对象列表 vs RecordBatch"""
+    print("按列读取记录 (记录对象列表 vs RecordBatch)")
+    db = make_database(directory, 10000, 100)
+    sql = f'SELECT {db._record_columns(DeductionRecord)} FROM deduction_records ORDER BY date, id'
+
+    def object_totals():
+        totals = defaultdict(float)
+        for record in db._fetch_records(DeductionRecord, '扣分', sql):
+            totals[record.student_name] += record.points
+        return totals
+
+    def batch_totals():
+        return db.get_deduction_batch().group_sum('student_name', 'points')
+
+    results = {}
+    for label, func in (("记录对象 + 逐条累加", object_totals), ("RecordBatch.group_sum", batch_totals)):
+        start = time.perf_counter()
+        results[label] = func()
+        elapsed = time.perf_counter() - start
+        print(f"  按学生汇总扣分 {label:<22} {elapsed * 1000:9.2f} ms")
+    expected, actual = results.values()
+    assert expected.keys() == actual.keys()
+    assert all(abs(expected[name] - actual[name]) < 1e-6 for name in expected)
+
+    records, object_bytes = allocated_bytes(lambda: db._fetch_records(DeductionRecord, '扣分', sql))
+    batch, batch_bytes = allocated_bytes(db.get_deduction_batch)
+    print(f"  {len(records)} 条扣分记录占用内存: 记录对象 {object_bytes / 2 ** 20:.1f} MB, "
+          f"RecordBatch {batch_bytes / 2 ** 20:.1f} MB")
+    del records, batch
+
+    # 小组分数统计对话框: 原先每个成员一次查询，现在一次读取全部成员的加分记录
+    member_ids = list(range(1, 51))
+    start, end = '2024-09-01', '2024-12-31'
+
+    def per_member():
+        return {
+            student_id: sum(record['points'] for record in db.get_student_addition_records(student_id, start, end))
+            for student_id in member_ids
+        }
+
+    def one_batch():
+        return db.get_addition_batch(start, end, member_ids).group_sum('student_id', 'points')
+
+    assert per_member() == one_batch()  # 同时预热页缓存
+    repeat = 20
+    for label, func in (("逐个成员查询", per_member), ("get_addition_batch", one_batch)):
+        queries, _, _ = count_queries(db, func)
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (time.perf_counter() - start_time) / repeat
+        print(f"  {len(member_ids)} 名小组成员加分统计 {label:<20} {queries:4d} 次查询 {elapsed * 1000:8.2f} ms")
+    db.close()
+
+
+def bench_score_statistics(directory: str):
+    """统计分析: 逐条记录对象 + statistics模块 vs ScoreStatistics(NumPy)"""
+    print("统计分析 (记录对象 + statistics模块 vs ScoreStatistics)")
+    if not score_statistics.numpy_available():
+        print("  未安装NumPy，跳过")
+        return
+    db = make_database(directory, 10000, 100)
+    sql = f'SELECT {db._record_columns(DeductionRecord)} FROM deduction_records'
+
+    def python_student_medians():
+        points = defaultdict(list)
+        for record in db._fetch_records(DeductionRecord, '扣分', sql):
+            points[record.student_name].append(record.points)
+        return {name: (statistics.mean(values), statistics.median(values)) for name, values in points.items()}
+
+    start = time.perf_counter()
+    expected = python_student_medians()
+    print(f"  每个学生的平均/中位扣分 记录对象 + statistics {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+    start = time.perf_counter()
+    stats = score_statistics.ScoreStatistics(db)
+    print(f"  ScoreStatistics 读取 {len(stats.deduction_points)} 条扣分、{len(stats.addition_points)} 条加分 "
+          f"{(time.perf_counter() - start) * 1000:9.2f} ms")
+    cases = (
+        ("student_summary", stats.student_summary),
+        ("class_summary", stats.class_summary),
+        ("time_series (按日, 7天)", lambda: stats.time_series('day', 7)),
+        ("time_series (按周, 4周)", lambda: stats.time_series('week', 4)),
+        ("time_series (按月, 3月)", lambda: stats.time_series('month', 3)),
+        ("violation_categories", stats.violation_categories),
+    )
+    results = {}
+    for label, func in cases:
+        start = time.perf_counter()
+        results[label] = func()
+        print(f"    {label:<24} {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+    for student in results["student_summary"]:
+        mean, median = expected[student['student_name']]
+        assert abs(student['deduction_mean'] - mean) < 1e-9 and student['deduction_median'] == median
+    weekly = results["time_series (按周, 4周)"]
+    assert sum(entry['deduction_count'] for entry in weekly) == len(stats.deduction_points)
+    db.close()
+
+
+def bench_date_cache(directory: str):
+    """日期缓存: 200000条扣分记录的搜索结果中构造和格式化日期，按值缓存 vs 每行重新计算"""
+    print("日期缓存 (search_deduction_records + 日期列格式化)")
+    db = make_database(directory, 10000, 20)
+    functions = (models.parse_date, models.format_date)
+    variants = (
+        ("每行重新计算", tuple(function.__wrapped__ for function in functions)),
+        ("按值缓存", functions),
+    )
+    try:
+        for label, (parse_date, format_date) in variants:
+            models.parse_date, models.format_date = parse_date, format_date
+            functions[0].cache_clear()
+            functions[1].cache_clear()
+            db.clear_query_cache()
+            start = time.perf_counter()
+            records = db.search_deduction_records()
+            search = time.perf_counter() - start
+            start = time.perf_counter()
+            texts = [models.format_date(record.date) for record in records]
+            formatting = time.perf_counter() - start
+            dates = len({id(record.date) for record in records})
+            del records, texts
+            # tracemalloc会拖慢执行，另外搜索一次统计结果占用的内存
+            db.clear_query_cache()
+            records, allocated = allocated_bytes(db.search_deduction_records)
+            print(f"  {label}: {len(records)} 条, 搜索 {search * 1000:8.2f} ms, 格式化日期 {formatting * 1000:7.2f} ms, "
+                  f"datetime对象 {dates} 个, 结果占用 {allocated / 1024 / 1024:6.1f} MB")
+            del records
+        print(f"  parse_date: {functions[0].cache_info()}")
+        print(f"  format_date: {functions[1].cache_info()}")
+    finally:
+        models.parse_date, models.format_date = functions
+        db.close()
+
+
+def bench_startup(directory: str):
+    """启动: 已迁移数据库只检查版本号 vs 重新执行全部迁移检查"""
+    print("启动 (Database() 构造)")
+    db = make_database(directory, 5000)
+    db_path = db.db_path
+    db.close()
+    size_mb = os.path.getsize(db_path) / 1024 / 1024
+
+    repeat = 20
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Database(db_path).close()
+    migrated = (time.perf_counter() - start) / repeat
+
+    # 迁移8重建记录表，不能重复执行；在迁移8之前的结构上测量重新执行前7个迁移检查的耗时
+    db = make_database(directory, 5000, database_class=NameKeyedDatabase)
+    db_path = db.db_path
+    db.close()
+    timings = []
+    for _ in range(repeat):
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA user_version = 0')
+        conn.close()
+        start = time.perf_counter()
+        NameKeyedDatabase(db_path).close()
+        timings.append(time.perf_counter() - start)
+    unversioned = sum(timings) / repeat
+    print(f"  数据库 {size_mb:.1f} MB, 已迁移: {migrated * 1000:8.2f} ms")
+    size_mb = os.path.getsize(db_path) / 1024 / 1024
+    print(f"  数据库 {size_mb:.1f} MB, 无版本号(执行迁移1-7的检查): {unversioned * 1000:8.2f} ms")
+
+
+def bench_concurrent_reads(directory: str):
+    """WAL只读连接: 另一线程持续批量写入时的读取延迟"""
+    print("并发读取 (get_total_score_ranking, 另一线程 bulk_add_deduction_records)")
+    db = make_database(directory, 5000)
+    db_path = db.db_path
+
+    def measure(seconds: float):
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            db.clear_query_cache()
+            start = time.perf_counter()
+            db.get_total_score_ranking()
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        return latencies
+
+    def report(label: str, latencies: list):
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[int(len(latencies) * 0.95)]
+        print(f"  {label}: {len(latencies)} 次读取, p50 {p50 * 1000:7.2f} ms, "
+              f"p95 {p95 * 1000:7.2f} ms, 最大 {latencies[-1] * 1000:7.2f} ms")
+
+    report("无写入", measure(1.0))
+
+    stop = threading.Event()
+    batches = []
+
+    def writer():
+        writer_db = Database(db_path)
+        records = [
+            DeductionRecord(f"学生{i % 5000:05d}", 1.0, datetime(2025, 1, 6), DeductionType.VIOLATION,
+                            violation_type=ViolationType.课堂违纪)
+            for i in range(2000)
+        ]
+        while not stop.is_set():
+            writer_db.bulk_add_deduction_records(records)
+            batches.append(len(records))
+        writer_db.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        latencies = measure(2.0)
+    finally:
+        stop.set()
+        thread.join()
+    report(f"并发写入 {len(batches)} 批 {sum(batches)} 条", latencies)
+    db.close()
+
+
+def bench_search_pagination(directory: str):
+    """搜索扣分记录: 一次取回全部 vs 分批遍历 vs 键集分页首页"""
+    print("搜索扣分记录 (search_deduction_records / iter_deduction_records / search_deduction_records_page)")
+    db = make_database(directory, 5000)
+
+    start = time.perf_counter()
+    records = db.search_deduction_records()
+    full = time.perf_counter() - start
+    print(f"  一次取回全部 {len(records)} 条: {full * 1000:8.2f} ms")
+    del records
+
+    start = time.perf_counter()
+    batches = db.iter_deduction_records()
+    first_batch = next(batches)
+    first = time.perf_counter() - start
+    total = len(first_batch) + sum(len(batch) for batch in batches)
+    streamed = time.perf_counter() - start
+    print(f"  分批遍历 {total} 条: 首批 {first * 1000:8.2f} ms, 全部 {streamed * 1000:8.2f} ms")
+
+    cursor = None
+    for page_number in range(1, 501):
+        start = time.perf_counter()
+        page = db.search_deduction_records_page(after=cursor)
+        elapsed = time.perf_counter() - start
+        if page_number in (1, 500):
+            print(f"  第{page_number}页 ({len(page['records'])} 条): {elapsed * 1000:8.2f} ms")
+        cursor = page['next_cursor']
+    db.close()
+
+
+def bench_text_search(directory: str):
+    """关键词搜索: FTS5 trigram全文索引 vs LIKE '%…%' 扫描"""
+    print("关键词搜索 (search_deduction_records(text=...))")
+    db = make_database(directory, 5000)
+    rng = random.Random(0)
+    behaviors = ["上课玩手机", "课间追逐打闹", "迟到早退", "作业未按时提交", "自习课讲话", "未穿校服", "午休期间离开教室"]
+    measures = ["口头警告", "没收手机一周", "通知家长", "写检讨书", "打扫教室一周"]
+    db.cursor.execute('SELECT id FROM deduction_records')
+    ids = [row['id'] for row in db.cursor.fetchall()]
+    db.cursor.executemany(
+        'UPDATE deduction_records SET violation_behavior = ?, treatment_measures = ?, reason = ? WHERE id = ?',
+        [(rng.choice(behaviors), rng.choice(measures), f"第{rng.randrange(1, 20)}周检查记录", record_id)
+         for record_id in ids]
+    )
+    # 少量罕见记录，考察选择性高的关键词
+    db.cursor.executemany(
+        'UPDATE deduction_records SET violation_behavior = ? WHERE id = ?',
+        [("打碎教室窗户玻璃", record_id) for record_id in rng.sample(ids, 20)]
+    )
+    db.conn.commit()
+
+    def like_search(text: str):
+        pattern = f"%{text}%"
+        return db._fetch_records(
+            DeductionRecord, '扣分',
+            f'SELECT {db._record_columns(DeductionRecord)} FROM deduction_records '
+            'WHERE violation_behavior LIKE ? OR reason LIKE ? OR treatment_measures LIKE ? '
+            'ORDER BY date DESC, id DESC',
+            (pattern, pattern, pattern)
+        )
+
+    repeat = 5
+    for text in ("窗户玻璃", "第19周", "没收手机一周"):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fts_records = db.search_deduction_records(text=text)
+        fts = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            like_records = like_search(text)
+        like = (time.perf_counter() - start) / repeat
+        assert [r.id for r in fts_records] == [r.id for r in like_records]
+        print(f"  '{text}' ({len(fts_records)} 条): 全文索引 {fts * 1000:8.2f} ms, LIKE {like * 1000:8.2f} ms")
+    db.close()
+
+
+def export_per_student(db: Database, file_path: str):
+    """原导出方式: 按学生逐个查询三类记录，组装成一个字典后整体写入"""
+    students = db.get_students()
+    export = {
+        "students": [student.to_dict() for student in students],
+        "deduction_records": [],
+        "compensation_records": [],
+        "addition_records": [],
+    }
+    for student in students:
+        export["deduction_records"].extend(r.to_dict() for r in db.get_deduction_records(student.name))
+        export["compensation_records"].extend(
+            r.to_dict() for r in db.get_student_compensation_records(student.name))
+        export["addition_records"].extend(r.to_dict() for r in db.get_addition_records(student.name))
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(export, f, ensure_ascii=False, indent=2)
+
+
+def bench_export(directory: str):
+    """导出JSON: 按学生查询后整体写入 vs 每表一次查询流式写入"""
+    print("导出JSON (export_per_student vs data_export.export_json)")
+    db = make_database(directory, 5000)
+    file_path = os.path.join(directory, "export.json")
+    for label, export in (("按学生查询", export_per_student), ("流式导出", export_json)):
+        db.clear_query_cache()
+        queries, elapsed, _ = count_queries(db, export, db, file_path)
+        # tracemalloc会显著拖慢执行，单独再运行一次统计内存峰值
+        db.clear_query_cache()
+        tracemalloc.start()
+        export(db, file_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size_mb = os.path.getsize(file_path) / 1024 / 1024
+        print(f"  {label}: 语句 {queries} 条, 耗时 {elapsed * 1000:8.2f} ms, "
+              f"内存峰值 {peak / 1024 / 1024:6.1f} MB, 文件 {size_mb:.1f} MB")
+    db.close()
+
+
+def import_per_record(db: Database, file_path: str):
+    """原导入方式: 逐条调用add_*方法，每条记录单独提交"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for record_data in data["deduction_records"]:
+        db.add_deduction_record(DeductionRecord.from_dict(record_data))
+    for record_data in data["compensation_records"]:
+        db.add_compensation_record(CompensationRecord.from_dict(record_data))
+    for record_data in data["addition_records"]:
+        db.add_addition_record(AdditionRecord.from_dict(record_data))
+
+
+def bench_import(directory: str):
+    """导入JSON: 逐条添加并提交 vs 一个事务内executemany、延后建索引"""
+    print("导入JSON (import_per_record vs data_import.import_json)")
+    source = make_database(directory, 1000)
+    file_path = os.path.join(directory, "import.json")
+    export_json(source, file_path)
+    source.close()
+
+    for label, load in (("逐条添加", import_per_record), ("批量导入", import_json)):
+        db_path = os.path.join(directory, "import.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        db = Database(db_path)
+        db.cursor.executemany('INSERT INTO students (name) VALUES (?)',
+                              [(f"学生{i:05d}",) for i in range(1000)])
+        db.conn.commit()
+        start = time.perf_counter()
+        result = load(db, file_path)
+        elapsed = time.perf_counter() - start
+        db.read_cursor.execute('SELECT COUNT(*) FROM deduction_records')
+        deductions = db.read_cursor.fetchone()[0]
+        db.read_cursor.execute('SELECT COUNT(*) FROM addition_records')
+        additions = db.read_cursor.fetchone()[0]
+        rows = deductions + additions
+        detail = f", 写入 {result['rows_per_second']:.0f} 条/秒" if result else ""
+        print(f"  {label}: {rows} 条记录, 耗时 {elapsed * 1000:8.2f} ms ({rows / elapsed:.0f} 条/秒{detail})")
+        db.close()
+
+
+def load_archive(file_path: str):
+    with ArchiveReader(file_path) as archive:
+        return load_archive_rows(archive)
+
+
+def bench_archive(directory: str):
+    """JSON与列式归档: 文件大小、导出、读取校验、导入和按列统计的耗时"""
+    print("JSON vs 列式归档 (data_export/data_import vs data_archive)")
+    db = make_database(directory, 5000)
+    json_path = os.path.join(directory, "semester.json")
+    archive_path = os.path.join(directory, "semester" + ARCHIVE_SUFFIX)
+    formats = (
+        ("JSON", json_path, export_json, load_import_file, import_json),
+        ("归档", archive_path, export_archive, load_archive, import_archive),
+    )
+    for label, path, export, load, load_into in formats:
+        start = time.perf_counter()
+        export(db, path)
+        export_time = time.perf_counter() - start
+        start = time.perf_counter()
+        load(path)
+        load_time = time.perf_counter() - start
+        target = Database(os.path.join(directory, f"restored_{label}.db"))
+        start = time.perf_counter()
+        load_into(target, path)
+        import_time = time.perf_counter() - start
+        target.close()
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"  {label}: 文件 {size_mb:6.1f} MB, 导出 {export_time * 1000:8.2f} ms, "
+              f"读取校验 {load_time * 1000:8.2f} ms, 导入 {import_time * 1000:8.2f} ms")
+
+    # 只读分析: 归档映射到内存后直接按列求和，不需要解析整个文件
+    start = time.perf_counter()
+    with open(json_path, encoding="utf-8") as f:
+        json_total = sum(record["points"] for record in json.load(f)["deduction_records"])
+    json_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with ArchiveReader(archive_path) as archive:
+        archive_total = sum(archive.column("deduction_records", "points"))
+    archive_time = time.perf_counter() - start
+    assert abs(json_total - archive_total) < 1e-6
+    print(f"  扣分总和: JSON {json_time * 1000:8.2f} ms, 归档 {archive_time * 1000:8.2f} ms")
+    db.close()
+
+
+def bench_snapshot(directory: str):
+    """数据库快照: 复制文件 vs 在线备份(一次复制/逐步复制)，以及从快照恢复"""
+    print("数据库快照 (shutil.copy2 vs Database.create_snapshot / restore_snapshot)")
+    db = make_database(directory, 5000)
+    snapshot_dir = os.path.join(directory, "snapshots")
+    size_mb = os.path.getsize(db.db_path) / 1024 / 1024
+
+    start = time.perf_counter()
+    shutil.copy2(db.db_path, os.path.join(directory, "copy.db"))
+    print(f"  复制文件: {(time.perf_counter() - start) * 1000:8.2f} ms ({size_mb:.1f} MB, 不包括WAL中的数据)")
+
+    for label, pages in (("一次复制", -1), ("逐步复制", Database.SNAPSHOT_PAGES_PER_STEP)):
+        # 每步之间其他连接可以写入，最长一步的耗时即写入最多等待的时间
+        step_times = [time.perf_counter()]
+        path = db.create_snapshot(snapshot_dir, pages=pages,
+                                  progress=lambda status, remaining, total: step_times.append(time.perf_counter()))
+        elapsed = step_times[-1] - step_times[0]
+        longest = max(b - a for a, b in zip(step_times, step_times[1:]))
+        print(f"  {label}: {len(step_times) - 1} 步, 耗时 {elapsed * 1000:8.2f} ms, 最长一步 {longest * 1000:6.2f} ms")
+
+    start = time.perf_counter()
+    db.restore_snapshot(path)
+    print(f"  恢复快照: {(time.perf_counter() - start) * 1000:8.2f} ms")
+    db.close()
+
+
+# (说明, 以学生姓名联结的查询, 以student_id联结的查询)，参数相同
+STUDENT_KEY_QUERIES = (
+    ("小组成员 (get_group_members)", '''
+        SELECT sg.student_name, s.id AS student_id, sg.join_date
+        FROM student_groups sg JOIN students s ON sg.student_name = s.name
+        WHERE sg.group_id = ? ORDER BY sg.student_name
+    ''', '''
+        SELECT s.name AS student_name, sg.student_id, sg.join_date
+        FROM student_groups sg JOIN students s ON s.id = sg.student_id
+        WHERE sg.group_id = ? ORDER BY s.name
+    '''),
+    ("学生补偿记录 (get_student_compensation_records)", '''
+        SELECT c.* FROM compensation_records c JOIN deduction_records d ON c.deduction_record_id = d.id
+        WHERE d.student_name = (SELECT name FROM students WHERE id = ?) ORDER BY c.date DESC
+    ''', '''
+        SELECT c.* FROM compensation_records c JOIN deduction_records d ON c.deduction_record_id = d.id
+        WHERE d.student_id = ? ORDER BY c.date DESC
+    '''),
+)
+
+# 全表联结的查询，无参数
+STUDENT_KEY_REPORTS = (
+    ("总分排名 (students JOIN student_score_summary)", '''
+        SELECT s.name, s.initial_score + COALESCE(ss.addition_total, 0.0)
+            - COALESCE(ss.violation_total + ss.non_violation_total, 0.0) AS total_score
+        FROM students s LEFT JOIN student_score_summary ss ON ss.student_name = s.name
+        ORDER BY total_score DESC
+    ''', '''
+        SELECT s.name, s.initial_score + COALESCE(ss.addition_total, 0.0)
+            - COALESCE(ss.violation_total + ss.non_violation_total, 0.0) AS total_score
+        FROM students s LEFT JOIN student_score_summary ss ON ss.student_id = s.id
+        ORDER BY total_score DESC
+    '''),
+    ("小组排名 (get_group_ranking)", '''
+        SELECT g.id, COUNT(sg.id), COALESCE(SUM(ss.addition_total), 0.0) AS total_points
+        FROM groups g LEFT JOIN student_groups sg ON sg.group_id = g.id
+        LEFT JOIN student_score_summary ss ON ss.student_name = sg.student_name
+        GROUP BY g.id ORDER BY total_points DESC, g.id
+    ''', '''
+        SELECT g.id, COUNT(sg.id), COALESCE(SUM(ss.addition_total), 0.0) AS total_points
+        FROM groups g LEFT JOIN student_groups sg ON sg.group_id = g.id
+        LEFT JOIN student_score_summary ss ON ss.student_id = sg.student_id
+        GROUP BY g.id ORDER BY total_points DESC, g.id
+    '''),
+    ("违规次数统计 (count_violations_by_date_range)", f'''
+        SELECT student_name, COUNT(*) FROM deduction_records
+        WHERE date BETWEEN {date_to_day('2024-10-01')} AND {date_to_day('2024-12-31')} AND deduction_type = 1
+        GROUP BY student_name
+    ''', f'''
+        SELECT {Database.STUDENT_NAME_COLUMN}, COUNT(*) FROM deduction_records
+        WHERE date BETWEEN {date_to_day('2024-10-01')} AND {date_to_day('2024-12-31')} AND deduction_type = 1
+        GROUP BY student_id ORDER BY student_name
+    '''),
+)
+
+# 比较大小的表和索引
+STUDENT_KEY_OBJECTS = (
+    'deduction_records', 'idx_deduction_student_date', 'idx_deduction_type_date',
+    'addition_records', 'idx_addition_student_period', 'idx_addition_period',
+    'student_groups', 'idx_student_groups_group', 'idx_student_groups_student',
+    'student_score_summary',
+)
+
+
+def bench_student_id_keys(directory: str):
+    """以学生姓名 vs 整数student_id引用学生: 表和索引大小、联结查询耗时"""
+    print("学生引用 (student_name TEXT vs student_id INTEGER 外键)")
+    student_count = 5000
+    group_size = 10
+    databases = []
+    for database_class in (NameKeyedDatabase, Database):
+        db = make_database(directory, student_count, database_class=database_class)
+        student_column, student_value = student_key(db)
+        db.cursor.executemany(
+            "INSERT INTO groups (name, description, created_at) VALUES (?, '', '2024-09-01')",
+            [(f"第{i + 1}组",) for i in range(student_count // group_size)]
+        )
+        db.cursor.executemany(
+            f"INSERT INTO student_groups ({student_column}, group_id, join_date) VALUES ({student_value}, ?, '2024-09-01')",
+            [(f"学生{i:05d}", i // group_size + 1) for i in range(student_count)]
+        )
+        # 每10条扣分记录有一条补偿记录
+        db.cursor.execute('''
+            INSERT INTO compensation_records (deduction_record_id, old_points, new_points, reason, date)
+            SELECT id, points, points / 2, '表现良好', '2025-01-20' FROM deduction_records WHERE id % 10 = 0
+        ''')
+        db.conn.commit()
+        db.cursor.execute('VACUUM')
+        db.cursor.execute('ANALYZE')
+        databases.append(db)
+
+    def object_size(db: Database, name: str) -> int:
+        db.read_cursor.execute('SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = ?', (name,))
+        return db.read_cursor.fetchone()[0]
+
+    print(f"  学生 {student_count} 人, 扣分记录 {student_count * 20} 条, 加分记录 {student_count * 10} 条")
+    print(f"    {'':<28} {'student_name':>12} {'student_id':>12}")
+    for name in STUDENT_KEY_OBJECTS:
+        sizes = [object_size(db, name) / 1024 for db in databases]
+        print(f"    {name:<28} {sizes[0]:>9.0f} KB {sizes[1]:>9.0f} KB")
+    sizes = [os.path.getsize(db.db_path) / 1024 / 1024 for db in databases]
+    print(f"    {'数据库文件':<23} {sizes[0]:>9.1f} MB {sizes[1]:>9.1f} MB")
+
+    repeat = 5
+    student_ids = range(1, student_count + 1, 10)
+    group_ids = range(1, student_count // group_size + 1)
+    cases = [
+        (label, queries, [(group_id,) for group_id in group_ids] if "小组" in label else [(i,) for i in student_ids])
+        for label, *queries in STUDENT_KEY_QUERIES
+    ] + [(label, queries, [()]) for label, *queries in STUDENT_KEY_REPORTS]
+    for label, queries, params_list in cases:
+        timings = []
+        results = []
+        for db, sql in zip(databases, queries):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                rows = [tuple(row) for params in params_list for row in db.read_conn.execute(sql, params)]
+            timings.append((time.perf_counter() - start) / repeat)
+            results.append(sorted(rows, key=repr))
+        assert results[0] == results[1], label
+        print(f"  {label}: {len(params_list)} 次查询, 姓名 {timings[0] * 1000:8.2f} ms, "
+              f"ID {timings[1] * 1000:8.2f} ms")
+    for db in databases:
+        db.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        bench_total_score_ranking(directory)
+        bench_deduction_ranking(directory)
+        bench_score_summary(directory)
+        bench_query_cache(directory)
+        bench_bulk_deductions(directory)
+        bench_batch_additions(directory)
+        bench_addition_interval_index(directory)
+        bench_date_decode(directory)
+        bench_record_construction(directory)
+        bench_record_batch(directory)
+        bench_score_statistics(directory)
+        bench_date_cache(directory)
+        bench_startup(directory)
+        bench_concurrent_reads(directory)
+        bench_search_pagination(directory)
+        bench_text_search(directory)
+        bench_export(directory)
+        bench_import(directory)
+        bench_archive(directory)
+        bench_snapshot(directory)
+        bench_student_id_keys(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from data_archive import ArchiveReader, export_archive, import_archive
+from data_export import export_json
+from data_import import import_json
+from database import Database
+from models import (
+    DeductionRecord, CompensationRecord, AdditionRecord, DeductionType, ViolationType
+)
+
+
+def make_sample_database(db_path: str) -> Database:
+    """创建包含各类记录(含空值、重复文本和非ASCII文本)的小数据库"""
+    db = Database(db_path)
+    db.cursor.executemany('INSERT INTO students (name, initial_score) VALUES (?, ?)',
+                          [('张三', 100.0), ('李四', 95.5), ('王五', 0.0)])
+    db.conn.commit()
+
+    db.add_deduction_record(DeductionRecord(
+        '张三', 2.0, datetime(2024, 10, 8), DeductionType.VIOLATION,
+        violation_behavior='上课玩手机', treatment_measures='没收手机', violation_type=ViolationType.课堂违纪
+    ))
+    db.add_deduction_record(DeductionRecord(
+        '李四', 1.5, datetime(2024, 10, 9), DeductionType.VIOLATION,
+        violation_behavior='上课玩手机', violation_type=ViolationType.课堂违纪
+    ))
+    db.add_deduction_record(DeductionRecord(
+        '李四', 1.0, datetime(2024, 10, 10), DeductionType.NON_VIOLATION,
+        reason='兑换奖励', non_violation_type='福利卷'
+    ))
+    db.read_cursor.execute('SELECT id FROM deduction_records ORDER BY id LIMIT 1')
+    deduction_id = db.read_cursor.fetchone()['id']
+    db.add_compensation_record(CompensationRecord(deduction_id, 2.0, 1.0, '表现良好', datetime(2024, 10, 20)))
+    db.add_addition_record(AdditionRecord('张三', 2.0, '竞赛获奖', datetime(2024, 10, 1), datetime(2024, 10, 7)))
+    db.add_addition_record(AdditionRecord('王五', 0.5, None, datetime(2024, 10, 1), datetime(2024, 10, 7)))
+    db.create_group('第一组', '示例小组')
+    group_id = db.get_groups()[0]['id']
+    db.add_student_to_group(db.get_student('张三').id, group_id)
+    db.add_locked_time_period('期中考试', '2024-11-01', '2024-11-03')
+    db.cursor.execute("INSERT INTO config (key, value) VALUES ('school', '第一中学')")
+    db.conn.commit()
+    return db
+
+
+def check_archive() -> bool:
+    """检查归档格式与JSON格式的往返一致性
+
+    数据库 -> 归档 -> 新数据库导出的JSON，应与原数据库导出的JSON完全相同；
+    JSON导入的数据库再导出归档，两份归档中的各列也应相同。
+
+    用法:
+        python check_archive.py
+    """
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        source = make_sample_database(os.path.join(directory, 'source.db'))
+        source_json = os.path.join(directory, 'source.json')
+        archive_path = os.path.join(directory, 'source.cmsa')
+        export_json(source, source_json)
+        export_archive(source, archive_path)
+        source.close()
+
+        # 归档 -> 数据库 -> JSON
+        restored = Database(os.path.join(directory, 'restored.db'))
+        import_archive(restored, archive_path)
+        restored_json = os.path.join(directory, 'restored.json')
+        export_json(restored, restored_json)
+        mismatches = restored.verify_score_summary()
+        restored.close()
+        if mismatches:
+            print(f"从归档导入后学生积分汇总表不一致: {mismatches[:3]}")
+            ok = False
+        with open(source_json, encoding='utf-8') as f:
+            expected = json.load(f)
+        with open(restored_json, encoding='utf-8') as f:
+            actual = json.load(f)
+        for key in expected:
+            if expected[key] != actual.get(key):
+                print(f"{key}: 从归档导入后导出的JSON与原数据不同")
+                ok = False
+
+        # JSON -> 数据库 -> 归档
+        from_json = Database(os.path.join(directory, 'from_json.db'))
+        import_json(from_json, source_json)
+        json_archive_path = os.path.join(directory, 'from_json.cmsa')
+        export_archive(from_json, json_archive_path)
+        from_json.close()
+        with ArchiveReader(archive_path) as original, ArchiveReader(json_archive_path) as converted:
+            for table in original.tables():
+                if original.rows(table) != converted.rows(table):
+                    print(f"{table}: 从JSON导入后导出的归档与原归档不同")
+                    ok = False
+
+    if ok:
+        print("归档与JSON格式往返一致")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_archive() else 1)
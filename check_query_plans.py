@@ -0,0 +1,245 @@
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+from database import Database
+from models import (
+    DeductionRecord, CompensationRecord, AdditionRecord, DeductionType, ViolationType
+)
+
+
+# Database中不执行数据查询的公开方法，不需要检查
+NON_QUERY_METHODS = {
+    'connect', 'clone', 'close', 'init_db', 'run_migration',
+    'invalidate_tables', 'clear_query_cache', 'get_cache_stats',
+    'snapshot_dir', 'create_snapshot', 'list_snapshots', 'prune_snapshots', 'auto_snapshot', 'restore_snapshot',
+}
+
+SCAN_PATTERN = re.compile(r'^SCAN (\S+)')
+
+
+def make_sample_database(db_path: str) -> Database:
+    """创建包含各类记录的小数据库，使每个方法都能执行到其中的全部查询"""
+    db = Database(db_path)
+    db.cursor.executemany('INSERT INTO students (name) VALUES (?)', [('张三',), ('李四',)])
+    db.conn.commit()
+
+    db.add_deduction_record(DeductionRecord(
+        '张三', 2.0, datetime(2024, 10, 8), DeductionType.VIOLATION,
+        violation_behavior='上课玩手机', violation_type=ViolationType.课堂违纪
+    ))
+    db.add_deduction_record(DeductionRecord(
+        '李四', 1.0, datetime(2024, 10, 9), DeductionType.NON_VIOLATION, non_violation_type='福利卷'
+    ))
+    db.add_addition_record(AdditionRecord('张三', 2.0, '竞赛获奖', datetime(2024, 10, 1), datetime(2024, 10, 7)))
+    db.create_group('第一组', '示例小组')
+    db.add_locked_time_period('期中考试', '2024-11-01', '2024-11-03')
+    return db
+
+
+def query_workload(db: Database) -> list:
+    """需要检查的方法调用
+
+    返回:
+        (方法名, 调用函数, 允许全表扫描的表名或别名)元组列表。
+        本就需要读取整张表的查询(排名、列表、校验等)在第三项中列出允许扫描的表，
+        其他查询出现全表扫描即视为缺少索引。
+    """
+    student = db.get_student('张三')
+    group_id = db.get_groups()[0]['id']
+    db.read_cursor.execute('SELECT id FROM deduction_records ORDER BY id LIMIT 1')
+    deduction_id = db.read_cursor.fetchone()['id']
+    db.read_cursor.execute('SELECT id FROM locked_time_periods ORDER BY id LIMIT 1')
+    period_id = db.read_cursor.fetchone()['id']
+
+    def deduction(day: int) -> DeductionRecord:
+        return DeductionRecord('李四', 1.0, datetime(2024, 10, day), DeductionType.VIOLATION,
+                               violation_type=ViolationType.未交作业)
+
+    date_range = ('2024-10-01', '2024-10-31')
+    return [
+        ('get_students', db.get_students, {'students'}),
+        ('get_student', lambda: db.get_student('张三'), set()),
+        ('get_student_by_id', lambda: db.get_student_by_id(student.id), set()),
+        ('get_student_score_summary', lambda: db.get_student_score_summary('张三'), set()),
+        ('update_student_initial_score', lambda: db.update_student_initial_score('张三', 100.0), set()),
+        ('add_deduction_record', lambda: db.add_deduction_record(deduction(10)), set()),
+        # 批量添加时一次读取全部学生的姓名和ID
+        ('add_batch_deduction_records', lambda: db.add_batch_deduction_records([deduction(11)]), {'students'}),
+        ('bulk_add_deduction_records', lambda: db.bulk_add_deduction_records([deduction(12)]), {'students'}),
+        ('get_deduction_records', lambda: db.get_deduction_records('张三'), set()),
+        ('get_deduction_records_by_student_id', lambda: db.get_deduction_records_by_student_id(student.id), set()),
+        ('update_deduction_record_points_and_treatment',
+         lambda: db.update_deduction_record_points_and_treatment(deduction_id, 1.0, '口头警告'), set()),
+        ('add_compensation_record', lambda: db.add_compensation_record(
+            CompensationRecord(deduction_id, 1.0, 0.5, '表现良好', datetime(2024, 10, 20))), set()),
+        ('get_compensation_records', lambda: db.get_compensation_records(deduction_id), set()),
+        ('get_deduction_record_modifications', lambda: db.get_deduction_record_modifications(deduction_id), set()),
+        ('get_student_compensation_records', lambda: db.get_student_compensation_records('张三'), set()),
+        ('get_compensation_records_by_student_id',
+         lambda: db.get_compensation_records_by_student_id(student.id), set()),
+        ('add_addition_record', lambda: db.add_addition_record(
+            AdditionRecord('李四', 1.0, '值日', datetime(2024, 10, 14), datetime(2024, 10, 20))), set()),
+        ('add_batch_addition_records', lambda: db.add_batch_addition_records(
+            [AdditionRecord('李四', 1.0, '值日', datetime(2024, 10, 21), datetime(2024, 10, 27))]), {'p', 'students'}),
+        ('get_addition_records', lambda: db.get_addition_records('张三'), set()),
+        ('get_addition_records_by_student_id', lambda: db.get_addition_records_by_student_id(student.id), set()),
+        ('count_violations_by_date_range', lambda: db.count_violations_by_date_range(None, *date_range), set()),
+        ('add_student_to_group', lambda: db.add_student_to_group(student.id, group_id), set()),
+        ('get_group_members', lambda: db.get_group_members(group_id), set()),
+        # 小组排名需要读取全部小组和学生积分汇总
+        ('get_group_ranking', db.get_group_ranking, {'g'}),
+        ('get_group_ranking_by_date_range', lambda: db.get_group_ranking_by_date_range(*date_range), {'g'}),
+        ('get_group_addition_records', lambda: db.get_group_addition_records(group_id, *date_range), set()),
+        ('get_student_addition_records', lambda: db.get_student_addition_records(student.id, *date_range), set()),
+        ('get_deduction_batch', lambda: [
+            db.get_deduction_batch(*date_range),
+            db.get_deduction_batch(*date_range, student_ids=[student.id]),
+        ], set()),
+        ('get_addition_batch', lambda: [
+            db.get_addition_batch(*date_range),
+            db.get_addition_batch(*date_range, student_ids=[student.id]),
+        ], set()),
+        ('remove_student_from_group', lambda: db.remove_student_from_group(group_id, student.id), set()),
+        ('get_groups', db.get_groups, {'groups'}),
+        ('create_group', lambda: db.create_group('第二组'), set()),
+        ('get_locked_time_periods', db.get_locked_time_periods, {'locked_time_periods'}),
+        ('get_locked_date_ranges', db.get_locked_date_ranges, {'locked_time_periods'}),
+        ('is_date_range_in_locked_period', lambda: db.is_date_range_in_locked_period(*date_range),
+         {'locked_time_periods'}),
+        ('add_locked_time_period', lambda: db.add_locked_time_period('运动会', '2024-12-01', '2024-12-02'), set()),
+        ('delete_locked_time_period', lambda: db.delete_locked_time_period(period_id), set()),
+        # 时间段列表对全部加分记录分组
+        ('get_addition_time_periods', db.get_addition_time_periods, {'addition_records'}),
+        ('get_non_violation_types', db.get_non_violation_types, set()),
+        # 搜索对话框的各种条件组合
+        ('search_deduction_records', lambda: [
+            db.search_deduction_records(start_date=date_range[0], end_date=date_range[1]),
+            db.search_deduction_records(name='张三', start_date=date_range[0], end_date=date_range[1]),
+            db.search_deduction_records(start_date=date_range[0], end_date=date_range[1], deduction_type=1),
+            db.search_deduction_records(start_date=date_range[0], end_date=date_range[1],
+                                        deduction_type=1, violation_type=5),
+            db.search_deduction_records(start_date=date_range[0], end_date=date_range[1],
+                                        deduction_type=2, non_violation_type='福利卷'),
+            db.search_deduction_records(start_date=date_range[0], end_date=date_range[1],
+                                        min_points=1.0, max_points=5.0),
+            db.search_deduction_records(start_date=date_range[0], end_date=date_range[1], text='玩手机'),
+        ], set()),
+        ('iter_deduction_records', lambda: list(db.iter_deduction_records(start_date=date_range[0])), set()),
+        ('search_deduction_records_page', lambda: db.search_deduction_records_page(
+            after=(20000, 100), start_date=date_range[0], end_date=date_range[1]), set()),
+        ('search_addition_records', lambda: [
+            db.search_addition_records(start_date=date_range[0], end_date=date_range[1]),
+            db.search_addition_records(student_name='张三', start_date=date_range[0], end_date=date_range[1]),
+            db.search_addition_records(start_date=date_range[0], end_date=date_range[1], text='竞赛获奖'),
+        ], set()),
+        ('iter_addition_records', lambda: list(db.iter_addition_records(start_date=date_range[0])), set()),
+        ('search_addition_records_page', lambda: db.search_addition_records_page(
+            after=(20000, 100), start_date=date_range[0], end_date=date_range[1]), set()),
+        # 排名、汇总校验本就读取全部学生和记录
+        ('get_addition_ranking', db.get_addition_ranking, {'ss'}),
+        ('get_deduction_ranking', db.get_deduction_ranking, {'ss'}),
+        ('get_total_score_ranking', db.get_total_score_ranking, {'s'}),
+        ('verify_score_summary', db.verify_score_summary,
+         {'student_score_summary', 'deduction_records', 'addition_records', 'students'}),
+        ('rebuild_score_summary', db.rebuild_score_summary, {'deduction_records', 'addition_records'}),
+        ('rebuild_full_text_index', db.rebuild_full_text_index, set()),
+        # 清空数据的方法放在最后
+        # 小组加分记录很少，没有按小组的索引
+        ('delete_group', lambda: db.delete_group(group_id), {'group_addition_records'}),
+        ('clear_group_data', db.clear_group_data, set()),
+        ('clear_addition_records', db.clear_addition_records, {'addition_records'}),
+        ('clear_deduction_records', db.clear_deduction_records, {'deduction_records'}),
+        ('delete_all_data', db.delete_all_data, {
+            'student_groups', 'group_addition_records', 'groups', 'compensation_records', 'deduction_records',
+            'addition_records', 'students', 'locked_time_periods', 'config', 'student_score_summary',
+            'sqlite_sequence',
+        }),
+    ]
+
+
+def trace_statements(db: Database, func) -> list:
+    """执行func，返回其间在写连接和只读连接上执行的SQL语句(参数已代入)"""
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    db.read_conn.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        db.conn.set_trace_callback(None)
+        db.read_conn.set_trace_callback(None)
+    return statements
+
+
+def find_full_scans(conn: sqlite3.Connection, statements: list, allowed: set) -> list:
+    """对每条语句执行EXPLAIN QUERY PLAN，返回(语句, 计划明细)形式的意外全表扫描
+
+    不检查SQLite内部表(sqlite_sequence等)、FTS5内部语句('main'.'xxx_fts_config'等)
+    和子查询结果的扫描。
+    """
+    scans = []
+    for sql in dict.fromkeys(statements):
+        keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+        if keyword not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'):
+            continue
+        for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}'):
+            detail = row[3]
+            match = SCAN_PATTERN.match(detail)
+            if match is None or 'VIRTUAL TABLE' in detail or 'CONSTANT ROW' in detail:
+                continue
+            name = match.group(1)
+            if name.startswith(('sqlite_', 'main.', '(')) or name in allowed:
+                continue
+            scan = (' '.join(sql.split()), detail)
+            if scan not in scans:
+                scans.append(scan)
+    return scans
+
+
+def check_query_plans() -> bool:
+    """检查database.py中每条查询的执行计划，发现意外的全表扫描时返回False
+
+    用法:
+        python check_query_plans.py
+    """
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'check_query_plans.db')
+        db = make_sample_database(db_path)
+        # 在新连接上解释: 同一连接缓存的语句不会因索引变化重新生成计划
+        explain_conn = sqlite3.connect(db_path)
+        try:
+            workload = query_workload(db)
+            for method_name, func, allowed in workload:
+                db.clear_query_cache()
+                statements = trace_statements(db, func)
+                if not statements:
+                    print(f"{method_name}: 未执行任何查询，请检查调用参数")
+                    ok = False
+                for sql, detail in find_full_scans(explain_conn, statements, allowed):
+                    print(f"{method_name}: {detail}\n    {sql}")
+                    ok = False
+
+            checked = {method_name for method_name, _, _ in workload}
+            public_methods = {
+                name for name in dir(Database)
+                if not name.startswith('_') and callable(getattr(Database, name))
+            }
+            unchecked = public_methods - checked - NON_QUERY_METHODS - set(Database.MIGRATIONS)
+            for method_name in sorted(unchecked):
+                print(f"{method_name}: 未加入检查，请在query_workload中添加调用")
+                ok = False
+        finally:
+            explain_conn.close()
+            db.close()
+
+    if ok:
+        print("所有查询均使用索引，没有意外的全表扫描")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_plans() else 1)
@@ -0,0 +1,35 @@
+import sys
+
+from database import Database
+
+
+def check_score_summary(rebuild: bool = False):
+    """校验学生积分汇总表，可选择根据原始记录重建
+
+    用法:
+        python check_score_summary.py            # 只校验
+        python check_score_summary.py --rebuild  # 重建后再校验
+    """
+    db = Database()
+
+    if rebuild:
+        db.rebuild_score_summary()
+        print("已根据扣分记录和加分记录重建学生积分汇总表")
+
+    mismatches = db.verify_score_summary()
+    db.close()
+
+    if not mismatches:
+        print("学生积分汇总表与原始记录一致")
+        return True
+
+    print(f"发现{len(mismatches)}处不一致:")
+    for item in mismatches:
+        print(f"  {item['student_name']} {item['field']}: 汇总表 {item['actual']}, 原始记录 {item['expected']}")
+    print("\n可使用 --rebuild 参数重建汇总表")
+    return False
+
+
+if __name__ == "__main__":
+    ok = check_score_summary(rebuild="--rebuild" in sys.argv[1:])
+    sys.exit(0 if ok else 1)
@@ -17,7 +17,8 @@ for row in cursor.fetchall():
 
 # 检查student_groups表
 print("\nStudent_groups表前5条记录:")
-cursor.execute("SELECT DISTINCT student_name FROM student_groups LIMIT 5")
+cursor.execute("SELECT DISTINCT sg.student_id, s.name FROM student_groups sg "
+               "JOIN students s ON s.id = sg.student_id LIMIT 5")
 for row in cursor.fetchall():
     print(row)
 
@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional
+
+from data_import import check_references, format_errors, import_rows
+from database import Database
+from models import DeductionType, ViolationType
+
+ARCHIVE_MAGIC = b'CMSARCH\x00'
+ARCHIVE_VERSION = 1
+ARCHIVE_SUFFIX = '.cmsa'
+
+NULL_INT = -2 ** 63  # 可为空的整数列中表示空值
+
+# 各列类型对应的array类型码
+TYPECODES = {'i': 'q', 'i?': 'q', 'f': 'd', 's': 'i'}
+
+# 归档的表及各列(列名, 类型)。列的顺序与data_import.IMPORT_SECTIONS中INSERT语句的参数顺序一致，
+# 各列按顺序组合即为导入时的参数；数据按数据库中的原值保存，不做格式转换
+ARCHIVE_TABLES = (
+    ('students', (('id', 'i'), ('name', 's'), ('initial_score', 'f'))),
+    ('groups', (('id', 'i'), ('name', 's'), ('description', 's'), ('created_at', 's'))),
+    ('deduction_records', (
+        ('id', 'i'), ('student_name', 's'), ('points', 'f'), ('violation_behavior', 's'),
+        ('treatment_measures', 's'), ('date', 'i'), ('deduction_type', 'i'), ('violation_type', 'i?'),
+        ('reason', 's'), ('non_violation_type', 's'),
+    )),
+    ('compensation_records', (
+        ('id', 'i'), ('deduction_record_id', 'i'), ('old_points', 'f'), ('new_points', 'f'),
+        ('reason', 's'), ('date', 's'),
+    )),
+    ('addition_records', (
+        ('id', 'i'), ('student_name', 's'), ('points', 'f'), ('reason', 's'),
+        ('start_date', 'i'), ('end_date', 'i'),
+    )),
+    ('student_groups', (('id', 'i'), ('student_name', 's'), ('group_id', 'i'), ('join_date', 's'))),
+    ('group_addition_records', (
+        ('id', 'i'), ('group_id', 'i'), ('points', 'f'), ('reason', 's'), ('date', 's'),
+    )),
+    ('locked_time_periods', (
+        ('id', 'i'), ('name', 's'), ('start_date', 's'), ('end_date', 's'), ('created_at', 's'),
+    )),
+    ('config', (('key', 's'), ('value', 's'))),
+)
+
+ARCHIVE_BATCH_SIZE = 1000  # 每次从数据库读取的行数
+
+
+def _align(offset: int) -> int:
+    """向上对齐到8字节，使每列都能直接转换为memoryview"""
+    return (offset + 7) & ~7
+
+
+def export_archive(db: Database, file_path: str, batch_size: int = ARCHIVE_BATCH_SIZE) -> Dict[str, int]:
+    """把数据库中的全部数据导出为按列存储的二进制归档文件
+
+    文件由魔数、头部长度、JSON头部和按8字节对齐的数据区组成。每张表的每一列是一段连续的数组:
+    整数列(id、日期天数、枚举值)为64位整数，可为空的整数列以NULL_INT表示空值；分数为64位浮点数；
+    文本列为32位编号，指向全部表共用的字符串表(0表示空值)，重复的姓名、违规行为等只保存一次。
+    头部记录各列的位置和写入时的字节序，读取时可把文件映射到内存直接访问各列。
+    与export_json相同，全部查询在同一个读事务中执行，先写入临时文件，成功后再替换目标文件。
+
+    参数:
+        db: 数据库对象，可以在后台线程中使用clone()得到的对象
+        file_path: 归档文件路径
+        batch_size: 每次从数据库读取的行数
+
+    返回:
+        各表导出的条数
+    """
+    strings = {None: 0}  # 字符串 -> 编号，0表示空值
+    columns = {}         # 表名 -> {列名: array}
+    counts = {}
+    conn = db.read_conn
+    cursor = conn.cursor()
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        cursor.execute('BEGIN')
+    try:
+        for table, table_columns in ARCHIVE_TABLES:
+            names = [name for name, _ in table_columns]
+            arrays = [array(TYPECODES[kind]) for _, kind in table_columns]
+            # 记录表中按student_id保存学生，归档中与JSON一样保存学生姓名
+            select_list = [Database.STUDENT_NAME_COLUMN if name == 'student_name' else name for name in names]
+            cursor.execute(f'SELECT {", ".join(select_list)} FROM {table} ORDER BY {names[0]}')
+            count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for values, (_, kind), buffer in zip(zip(*rows), table_columns, arrays):
+                    if kind == 's':
+                        buffer.extend([strings.setdefault(value, len(strings)) for value in values])
+                    elif kind == 'i?':
+                        buffer.extend([NULL_INT if value is None else value for value in values])
+                    else:
+                        buffer.extend(values)
+                count += len(rows)
+            columns[table] = dict(zip(names, arrays))
+            counts[table] = count
+    finally:
+        if own_transaction:
+            conn.commit()
+        cursor.close()
+
+    # 字符串表: 编号1..n的字符串依次拼接，offsets[i - 1]:offsets[i]为第i个字符串
+    encoded = [value.encode('utf-8') for value in list(strings)[1:]]
+    offsets = array('q', [0])
+    position = 0
+    for value in encoded:
+        position += len(value)
+        offsets.append(position)
+
+    header = {
+        'version': ARCHIVE_VERSION,
+        'byteorder': sys.byteorder,
+        'strings': {'count': len(encoded)},
+        'tables': {},
+    }
+    buffers = []
+    offset = 0
+
+    def add_buffer(data) -> Dict[str, int]:
+        nonlocal offset
+        offset = _align(offset)
+        location = {'offset': offset, 'length': len(data) * getattr(data, 'itemsize', 1)}
+        buffers.append((offset, data))
+        offset += location['length']
+        return location
+
+    header['strings']['offsets'] = add_buffer(offsets)
+    header['strings']['data'] = add_buffer(b''.join(encoded))
+    for table, table_columns in ARCHIVE_TABLES:
+        header['tables'][table] = {
+            'rows': counts[table],
+            'columns': {
+                name: dict(kind=kind, **add_buffer(columns[table][name])) for name, kind in table_columns
+            },
+        }
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(ARCHIVE_MAGIC) + 8 + len(header_bytes))
+    temp_path = file_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(ARCHIVE_MAGIC)
+            f.write(struct.pack('<Q', len(header_bytes)))
+            f.write(header_bytes)
+            for buffer_offset, data in buffers:
+                f.write(b'\0' * (data_start + buffer_offset - f.tell()))
+                f.write(data)
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return counts
+
+
+class ArchiveReader:
+    """以内存映射方式读取归档文件
+
+    数值列以memoryview返回，直接引用映射的文件内容，不复制数据；
+    返回的视图在close()之后不能再使用。可以作为上下文管理器使用。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        参数:
+            file_path: 归档文件路径
+
+        异常:
+            ValueError: 不是有效的归档文件
+        """
+        self._file = open(file_path, 'rb')
+        self._mmap = None
+        self._views = []
+        self._strings = None
+        try:
+            if self._file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                raise ValueError("不是有效的归档文件")
+            (header_length,) = struct.unpack('<Q', self._file.read(8))
+            self.header = json.loads(self._file.read(header_length).decode('utf-8'))
+            if self.header.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f"不支持的归档版本: {self.header.get('version')}")
+            self._data_start = _align(len(ARCHIVE_MAGIC) + 8 + header_length)
+            self._swap_bytes = self.header['byteorder'] != sys.byteorder
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError, KeyError) as e:
+            self.close()
+            raise ValueError(f"归档文件已损坏: {e}")
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """释放返回过的视图并关闭文件"""
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def _buffer(self, location: Dict[str, int], typecode: str):
+        """数据区中的一段数组；字节序与本机不同时返回转换后的array副本"""
+        start = self._data_start + location['offset']
+        end = start + location['length']
+        if end > len(self._mmap):
+            raise ValueError("归档文件已损坏: 数据不完整")
+        if self._swap_bytes:
+            data = array(typecode, self._mmap[start:end])
+            data.byteswap()
+            return data
+        view = memoryview(self._mmap)[start:end]
+        self._views.append(view)
+        typed = view.cast(typecode)
+        self._views.append(typed)
+        return typed
+
+    def _column_info(self, table: str, name: str) -> Dict[str, Any]:
+        try:
+            return self.header['tables'][table]['columns'][name]
+        except KeyError:
+            raise ValueError(f"归档中没有{table}.{name}")
+
+    def tables(self) -> List[str]:
+        """归档中的表名"""
+        return list(self.header['tables'])
+
+    def row_count(self, table: str) -> int:
+        """表的行数"""
+        return self.header['tables'][table]['rows']
+
+    @property
+    def strings(self) -> List[Optional[str]]:
+        """字符串表，下标为编号，编号0为None；首次访问时解码"""
+        if self._strings is None:
+            info = self.header['strings']
+            offsets = self._buffer(info['offsets'], 'q')
+            start = self._data_start + info['data']['offset']
+            data = self._mmap[start:start + info['data']['length']]
+            self._strings = [None] + [
+                data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(info['count'])
+            ]
+        return self._strings
+
+    def codes(self, table: str, name: str):
+        """字符串列的编号数组(memoryview)，可用strings把编号转换为字符串"""
+        info = self._column_info(table, name)
+        if info['kind'] != 's':
+            raise ValueError(f"{table}.{name}不是字符串列")
+        return self._buffer(info, TYPECODES['s'])
+
+    def column(self, table: str, name: str):
+        """读取一列
+
+        返回:
+            数值列返回memoryview(可为空的整数列中空值为NULL_INT)，字符串列返回字符串列表
+        """
+        info = self._column_info(table, name)
+        values = self._buffer(info, TYPECODES[info['kind']])
+        if info['kind'] == 's':
+            return list(map(self.strings.__getitem__, values))
+        return values
+
+    def rows(self, table: str) -> List[tuple]:
+        """按列组合为行，空值为None，列的顺序与ARCHIVE_TABLES一致"""
+        table_columns = dict(ARCHIVE_TABLES)[table]
+        columns = []
+        for name, kind in table_columns:
+            values = self.column(table, name)
+            if kind == 'i?':
+                values = [None if value == NULL_INT else value for value in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+
+def load_archive_rows(archive: ArchiveReader) -> Dict[str, list]:
+    """读取并校验归档中的全部数据，转换为各表的INSERT参数
+
+    返回值与data_import.load_import_file相同，可交给import_rows写入数据库。
+
+    异常:
+        ValueError: 归档缺少数据或数据无效，错误信息中列出发现的问题
+    """
+    for table, table_columns in ARCHIVE_TABLES:
+        if table not in archive.header['tables']:
+            raise ValueError(f"归档缺少数据: {table}")
+        for name, kind in table_columns:
+            if archive._column_info(table, name)['kind'] != kind:
+                raise ValueError(f"归档中{table}.{name}的类型不正确")
+
+    rows = {table: archive.rows(table) for table, _ in ARCHIVE_TABLES}
+
+    errors = []
+    deduction_types = {item.value for item in DeductionType}
+    violation_types = {item.value for item in ViolationType} | {None}
+    for number, row in enumerate(rows['deduction_records'], 1):
+        if row[6] not in deduction_types or row[7] not in violation_types:
+            errors.append(f"deduction_records第{number}条: 扣分类型或违规类型无效")
+    for number, row in enumerate(rows['addition_records'], 1):
+        if row[4] > row[5]:
+            errors.append(f"addition_records第{number}条: 开始日期晚于结束日期")
+    if not errors:
+        errors = check_references(rows)
+    if errors:
+        raise ValueError(f"归档文件校验失败:\n{format_errors(errors)}")
+    return rows
+
+
+def import_archive(db: Database, file_path: str) -> Dict[str, Any]:
+    """校验归档文件，并在一个事务中用其中的数据替换数据库中的全部数据
+
+    参数:
+        db: 数据库对象
+        file_path: export_archive导出的归档文件
+
+    返回:
+        data_import.import_rows的返回值
+
+    异常:
+        ValueError: 文件校验失败，此时数据库未被修改
+    """
+    with ArchiveReader(file_path) as archive:
+        rows = load_archive_rows(archive)
+    return import_rows(db, rows)
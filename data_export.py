@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from database import Database
+from models import day_to_str
+
+
+def _date_text(value: Optional[str]) -> Optional[str]:
+    """把ISO格式的日期时间文本截取为'YYYY-MM-DD'"""
+    return value[:10] if value else value
+
+
+def _deduction_row(row) -> Dict[str, Any]:
+    record = dict(row)
+    record['date'] = day_to_str(record['date'])
+    return record
+
+
+def _compensation_row(row) -> Dict[str, Any]:
+    record = dict(row)
+    record['date'] = _date_text(record['date'])
+    return record
+
+
+def _addition_row(row) -> Dict[str, Any]:
+    record = dict(row)
+    record['start_date'] = day_to_str(record['start_date'])
+    record['end_date'] = day_to_str(record['end_date'])
+    return record
+
+
+# 导出的列表数据: (键名, 查询语句, 行转换函数)。
+# 学生和各类记录的字段、日期格式与模型类的to_dict()一致，导入时可直接使用from_dict()；
+# 记录表按student_id引用学生，导出时换成学生姓名
+EXPORT_SECTIONS = (
+    ('students', 'SELECT id, name, initial_score FROM students ORDER BY id', dict),
+    ('deduction_records', f'''
+        SELECT id, {Database.STUDENT_NAME_COLUMN}, points, violation_behavior, treatment_measures,
+               date, deduction_type, violation_type, non_violation_type, reason
+        FROM deduction_records ORDER BY id
+    ''', _deduction_row),
+    ('compensation_records', '''
+        SELECT id, deduction_record_id, old_points, new_points, reason, date
+        FROM compensation_records ORDER BY id
+    ''', _compensation_row),
+    ('addition_records', f'''
+        SELECT id, {Database.STUDENT_NAME_COLUMN}, points, reason, start_date, end_date
+        FROM addition_records ORDER BY id
+    ''', _addition_row),
+    ('groups', 'SELECT id, name, description, created_at FROM groups ORDER BY id', dict),
+    ('student_groups', f'''
+        SELECT id, {Database.STUDENT_NAME_COLUMN}, group_id, join_date FROM student_groups ORDER BY id
+    ''', dict),
+    ('group_addition_records', '''
+        SELECT id, group_id, points, reason, date FROM group_addition_records ORDER BY id
+    ''', dict),
+    ('locked_time_periods', '''
+        SELECT id, name, start_date, end_date, created_at FROM locked_time_periods ORDER BY id
+    ''', dict),
+)
+
+EXPORT_BATCH_SIZE = 1000  # 每次从数据库读取的行数
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def export_json(db: Database, file_path: str, batch_size: int = EXPORT_BATCH_SIZE) -> Dict[str, int]:
+    """把数据库中的全部数据导出为JSON文件
+
+    每张表只查询一次，逐批读取并写入文件，内存占用与记录总数无关。
+    全部查询在同一个读事务中执行，导出的是同一时刻的数据快照。
+    先写入临时文件，成功后再替换目标文件，导出失败不会留下不完整的文件。
+
+    参数:
+        db: 数据库对象，可以在后台线程中使用clone()得到的对象
+        file_path: 导出文件路径
+        batch_size: 每次从数据库读取的行数
+
+    返回:
+        各部分导出的条数，如{'students': 50, 'deduction_records': 1200, ...}
+    """
+    counts = {}
+    temp_path = file_path + '.tmp'
+    conn = db.read_conn
+    cursor = conn.cursor()
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        cursor.execute('BEGIN')
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            for key, query, convert in EXPORT_SECTIONS:
+                cursor.execute(query)
+                counts[key] = _write_array(f, key, cursor, convert, batch_size)
+                f.write(',\n')
+
+            cursor.execute('SELECT key, value FROM config ORDER BY key')
+            counts['config'] = _write_object(f, 'config', cursor, batch_size)
+            f.write('\n}\n')
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        if own_transaction:
+            conn.commit()
+        cursor.close()
+    return counts
+
+
+def _write_array(f, key: str, cursor, convert: Callable, batch_size: int) -> int:
+    """把查询结果写成JSON数组，每行一条记录，返回记录数"""
+    f.write(f'  {_encode(key)}: [')
+    count = 0
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        # 每批拼接成一个字符串再写入
+        f.write(('\n    ' if count == 0 else ',\n    ')
+                + ',\n    '.join([_encode(convert(row)) for row in rows]))
+        count += len(rows)
+    f.write('\n  ]' if count else ']')
+    return count
+
+
+def _write_object(f, key: str, cursor, batch_size: int) -> int:
+    """把(key, value)查询结果写成JSON对象，返回键值对数"""
+    f.write(f'  {_encode(key)}: {{')
+    count = 0
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        f.write(('\n    ' if count == 0 else ',\n    ')
+                + ',\n    '.join([f'{_encode(name)}: {_encode(value)}' for name, value in rows]))
+        count += len(rows)
+    f.write('\n  }' if count else '}')
+    return count
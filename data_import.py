@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from database import Database
+from models import DeductionType, ViolationType, date_to_day, parse_date
+
+
+# 导入文件必须包含的部分；小组、成员、锁定时间段等是后来加入导出的，旧文件中可以没有
+REQUIRED_SECTIONS = ("students", "deduction_records", "compensation_records", "addition_records", "config")
+
+MAX_REPORTED_ERRORS = 20  # 校验失败时最多列出的错误数
+
+
+def _record_id(data: Dict[str, Any]):
+    """记录的原id，没有id时由数据库分配"""
+    record_id = data.get("id")
+    if record_id is not None and (not isinstance(record_id, int) or isinstance(record_id, bool)):
+        raise ValueError(f"id无效: {record_id!r}")
+    return record_id
+
+
+def _number(data: Dict[str, Any], key: str) -> float:
+    value = data.get(key)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError(f"{key}不是有效的数字: {value!r}")
+    return value
+
+
+def _text(data: Dict[str, Any], key: str, required: bool = True):
+    value = data.get(key)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value):
+        raise ValueError(f"{key}不能为空")
+    return value
+
+
+def _day(data: Dict[str, Any], key: str) -> int:
+    value = data.get(key)
+    try:
+        return date_to_day(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key}不是有效的日期: {value!r}")
+
+
+def _student_row(data: Dict[str, Any]) -> tuple:
+    return (_record_id(data), _text(data, "name"), _number(data, "initial_score"))
+
+
+def _deduction_row(data: Dict[str, Any]) -> tuple:
+    deduction_type = DeductionType(data.get("deduction_type")).value
+    violation_type = data.get("violation_type")
+    if violation_type is not None:
+        violation_type = ViolationType(violation_type).value
+    return (
+        _record_id(data), _text(data, "student_name"), _number(data, "points"),
+        _text(data, "violation_behavior", False), _text(data, "treatment_measures", False),
+        _day(data, "date"), deduction_type, violation_type,
+        _text(data, "reason", False), _text(data, "non_violation_type", False)
+    )
+
+
+def _compensation_row(data: Dict[str, Any]) -> tuple:
+    deduction_record_id = data.get("deduction_record_id")
+    if not isinstance(deduction_record_id, int):
+        raise ValueError(f"deduction_record_id无效: {deduction_record_id!r}")
+    return (
+        _record_id(data), deduction_record_id, _number(data, "old_points"), _number(data, "new_points"),
+        _text(data, "reason"), parse_date(_text(data, "date")).isoformat()
+    )
+
+
+def _addition_row(data: Dict[str, Any]) -> tuple:
+    start_date, end_date = _day(data, "start_date"), _day(data, "end_date")
+    if start_date > end_date:
+        raise ValueError("开始日期晚于结束日期")
+    return (
+        _record_id(data), _text(data, "student_name"), _number(data, "points"),
+        _text(data, "reason", False), start_date, end_date
+    )
+
+
+def _group_row(data: Dict[str, Any]) -> tuple:
+    return (_record_id(data), _text(data, "name"), _text(data, "description", False), _text(data, "created_at"))
+
+
+def _student_group_row(data: Dict[str, Any]) -> tuple:
+    group_id = data.get("group_id")
+    if not isinstance(group_id, int):
+        raise ValueError(f"group_id无效: {group_id!r}")
+    return (_record_id(data), _text(data, "student_name"), group_id, _text(data, "join_date"))
+
+
+def _group_addition_row(data: Dict[str, Any]) -> tuple:
+    group_id = data.get("group_id")
+    if not isinstance(group_id, int):
+        raise ValueError(f"group_id无效: {group_id!r}")
+    return (_record_id(data), group_id, _number(data, "points"), _text(data, "reason", False), _text(data, "date"))
+
+
+def _locked_period_row(data: Dict[str, Any]) -> tuple:
+    return (
+        _record_id(data), _text(data, "name"), _text(data, "start_date"),
+        _text(data, "end_date"), _text(data, "created_at")
+    )
+
+
+# 导入的列表数据: (键名/表名, INSERT语句, 把一条记录转换为INSERT参数的函数)。
+# 按外键依赖排列: 被引用的表在前；清空时按相反顺序。
+# 导入文件中记录按学生姓名引用学生，插入时在students表中查出student_id
+IMPORT_SECTIONS = (
+    ("students", "INSERT INTO students (id, name, initial_score) VALUES (?, ?, ?)", _student_row),
+    ("groups", "INSERT INTO groups (id, name, description, created_at) VALUES (?, ?, ?, ?)", _group_row),
+    ("deduction_records", '''
+        INSERT INTO deduction_records
+        (id, student_id, points, violation_behavior, treatment_measures, date,
+         deduction_type, violation_type, reason, non_violation_type)
+        VALUES (?, (SELECT id FROM students WHERE name = ?), ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', _deduction_row),
+    ("compensation_records", '''
+        INSERT INTO compensation_records (id, deduction_record_id, old_points, new_points, reason, date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', _compensation_row),
+    ("addition_records", '''
+        INSERT INTO addition_records (id, student_id, points, reason, start_date, end_date)
+        VALUES (?, (SELECT id FROM students WHERE name = ?), ?, ?, ?, ?)
+    ''', _addition_row),
+    ("student_groups", '''
+        INSERT INTO student_groups (id, student_id, group_id, join_date)
+        VALUES (?, (SELECT id FROM students WHERE name = ?), ?, ?)
+    ''', _student_group_row),
+    ("group_addition_records", '''
+        INSERT INTO group_addition_records (id, group_id, points, reason, date) VALUES (?, ?, ?, ?, ?)
+    ''', _group_addition_row),
+    ("locked_time_periods", '''
+        INSERT INTO locked_time_periods (id, name, start_date, end_date, created_at) VALUES (?, ?, ?, ?, ?)
+    ''', _locked_period_row),
+)
+
+
+def load_import_file(file_path: str) -> Dict[str, list]:
+    """读取并校验导入文件，转换为各表的INSERT参数
+
+    校验在写入数据库之前全部完成: 字段类型、日期格式、枚举值、id是否重复、
+    补偿记录和小组成员引用的记录是否存在、同一学生的加分时间段是否重叠。
+
+    参数:
+        file_path: export_json导出的JSON文件
+
+    返回:
+        {表名: INSERT参数列表}，config对应(key, value)列表
+
+    异常:
+        ValueError: 文件格式错误，错误信息中列出发现的问题
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("导入文件格式错误")
+    for key in REQUIRED_SECTIONS:
+        if key not in data:
+            raise ValueError(f"导入文件缺少必要的数据: {key}")
+
+    errors = []
+    rows = {}
+    for table, _, convert in IMPORT_SECTIONS:
+        items = data.get(table, [])
+        if not isinstance(items, list):
+            errors.append(f"{table}: 应为列表")
+            items = []
+        rows[table] = []
+        for number, item in enumerate(items, 1):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("应为对象")
+                rows[table].append(convert(item))
+            except (TypeError, ValueError) as e:
+                errors.append(f"{table}第{number}条: {e}")
+
+    config = data["config"]
+    if isinstance(config, dict) and all(isinstance(value, str) for value in config.values()):
+        rows["config"] = list(config.items())
+    else:
+        errors.append("config: 应为字符串键值对")
+
+    if not errors:
+        errors = check_references(rows)
+    if errors:
+        raise ValueError(f"导入文件校验失败:\n{format_errors(errors)}")
+    return rows
+
+
+def format_errors(errors: List[str]) -> str:
+    """把校验错误列表整理为错误信息，最多列出MAX_REPORTED_ERRORS处"""
+    shown = "\n".join(errors[:MAX_REPORTED_ERRORS])
+    more = f"\n……共{len(errors)}处错误" if len(errors) > MAX_REPORTED_ERRORS else ""
+    return shown + more
+
+
+def check_references(rows: Dict[str, list]) -> List[str]:
+    """检查id唯一、记录之间的引用和加分时间段重叠，返回错误列表"""
+    errors = []
+    for table, _, _ in IMPORT_SECTIONS:
+        ids = [row[0] for row in rows[table] if row[0] is not None]
+        if len(ids) != len(set(ids)):
+            errors.append(f"{table}: id重复")
+
+    student_names = {row[1] for row in rows["students"]}
+    if len(student_names) != len(rows["students"]):
+        errors.append("students: 学生姓名重复")
+    deduction_ids = {row[0] for row in rows["deduction_records"]}
+    group_ids = {row[0] for row in rows["groups"]}
+
+    references = (
+        ("deduction_records", 1, student_names, "学生"),
+        ("addition_records", 1, student_names, "学生"),
+        ("student_groups", 1, student_names, "学生"),
+        ("compensation_records", 1, deduction_ids, "扣分记录"),
+        ("student_groups", 2, group_ids, "小组"),
+        ("group_addition_records", 1, group_ids, "小组"),
+    )
+    for table, column, existing, label in references:
+        for number, row in enumerate(rows[table], 1):
+            if row[column] not in existing:
+                errors.append(f"{table}第{number}条: 引用的{label}不存在: {row[column]!r}")
+
+    # 同一学生的加分时间段按开始日期排序后，只需比较相邻的两段
+    periods = defaultdict(list)
+    for row in rows["addition_records"]:
+        periods[row[1]].append((row[4], row[5]))
+    for student_name, student_periods in periods.items():
+        student_periods.sort()
+        for (_, previous_end), (start, _) in zip(student_periods, student_periods[1:]):
+            if start <= previous_end:
+                errors.append(f"addition_records: {student_name}的加分时间段重叠")
+                break
+    return errors
+
+
+def import_rows(db: Database, rows: Dict[str, list]) -> Dict[str, Any]:
+    """在一个事务中用导入数据替换数据库中的全部数据
+
+    先删除导入表上的索引和触发器，用executemany按原id插入全部记录，
+    再重建索引、触发器、学生积分汇总表和全文索引。任何一步失败都会回滚，数据库保持导入前的状态。
+
+    参数:
+        db: 数据库对象
+        rows: load_import_file返回的数据
+
+    返回:
+        字典，包含:
+        - counts: 各表导入的条数
+        - total: 导入的总条数
+        - seconds: 写入数据库的耗时
+        - rows_per_second: 每秒导入的条数
+    """
+    tables = [table for table, _, _ in IMPORT_SECTIONS] + ["config"]
+    counts = {}
+    start = time.perf_counter()
+    cursor = db.cursor
+    try:
+        if not db.conn.in_transaction:
+            cursor.execute('BEGIN IMMEDIATE')
+        # 索引和触发器在全部插入后再创建，避免逐行维护
+        placeholders = ', '.join('?' * len(tables))
+        cursor.execute(f'''
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        ''', tables)
+        deferred = [tuple(row) for row in cursor.fetchall()]
+        for object_type, name, _ in deferred:
+            cursor.execute(f'DROP {object_type.upper()} {name}')
+
+        for table in reversed(tables):
+            cursor.execute(f'DELETE FROM {table}')
+        for table, insert_sql, _ in IMPORT_SECTIONS:
+            cursor.executemany(insert_sql, rows[table])
+            counts[table] = len(rows[table])
+        cursor.executemany('INSERT INTO config (key, value) VALUES (?, ?)', rows["config"])
+        counts["config"] = len(rows["config"])
+
+        for _, _, sql in deferred:
+            cursor.execute(sql)
+        db.rebuild_score_summary(commit=False)
+        db.rebuild_full_text_index(commit=False)
+        db.conn.commit()
+    except Exception:
+        db.conn.rollback()
+        raise
+    finally:
+        # 导入期间在其他线程中完成的查询按旧版本号缓存，递增版本号使其失效
+        db.invalidate_tables(*tables)
+        db.clear_query_cache()
+
+    seconds = time.perf_counter() - start
+    total = sum(counts.values())
+    return {
+        'counts': counts,
+        'total': total,
+        'seconds': seconds,
+        'rows_per_second': total / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def import_json(db: Database, file_path: str) -> Dict[str, Any]:
+    """校验导入文件，并在一个事务中用其中的数据替换数据库中的全部数据
+
+    参数:
+        db: 数据库对象
+        file_path: export_json导出的JSON文件
+
+    返回:
+        import_rows的返回值
+
+    异常:
+        ValueError: 文件校验失败，此时数据库未被修改
+    """
+    return import_rows(db, load_import_file(file_path))
@@ -1,22 +1,166 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
 import os
 import sqlite3
+import threading
+import weakref
 import json
+import functools
+from array import array
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from models import (
+    Student, DeductionRecord, CompensationRecord, AdditionRecord, DeductionType, STUDENT_LIST,
+    date_to_day, day_to_str
+)
+from record_batch import RecordBatch
+
+
+def cached_query(*tables: str):
+    """读取方法的缓存装饰器
+    
+    以方法名和参数为键缓存查询结果，并记录查询时所依赖的各表的版本号；
+    任一依赖表的版本号变化后，缓存项即失效，下次调用重新查询。
+    返回的列表/字典是缓存值的浅拷贝，调用方不应修改其中的元素。
+    
+    参数:
+        tables: 查询所依赖的表名
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                # 参数不可哈希时不缓存
+                return method(self, *args, **kwargs)
+                
+            with self._cache_lock:
+                generations = tuple(self._table_generations[table] for table in tables)
+                entry = self._query_cache.get(key)
+                if entry is not None and entry[0] == generations:
+                    self._query_cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return _copy_result(entry[1])
+                self.cache_misses += 1
+                
+            # 查询期间不持有锁；若其间有写入，按查询前的版本号保存的结果会在下次读取时失效
+            result = method(self, *args, **kwargs)
+            with self._cache_lock:
+                self._query_cache[key] = (generations, result)
+                self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.cache_max_size:
+                    self._query_cache.popitem(last=False)  # 淘汰最久未使用的缓存项
+            return _copy_result(result)
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables: str):
+    """写入方法的装饰器，方法执行后递增所修改表的版本号，使相关缓存失效
+    
+    参数:
+        tables: 方法会修改的表名
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.invalidate_tables(*tables)
+        return wrapper
+    return decorator
+
+
+def _copy_result(result):
+    """复制缓存结果的外层容器，避免调用方排序/增删元素时改动缓存"""
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, dict):
+        return dict(result)
+    return result
 
-from models import Student, DeductionRecord, CompensationRecord, AdditionRecord, DeductionType, STUDENT_LIST
 
 class Database:
     """数据库类"""
     
-    def __init__(self, db_path: str = "student_score.db"):
-        """初始化数据库"""
+    # 数据库结构迁移，按顺序执行，PRAGMA user_version记录已执行的迁移数。
+    # 迁移只能追加，不能修改或调整顺序；每个迁移都需兼容引入版本号之前的旧数据库
+    MIGRATIONS = (
+        'create_tables',
+        'migrate_deduction_columns',
+        'migrate_day_number_dates',
+        'create_indexes',
+        'init_score_summary',
+        'init_full_text_search',
+        'create_search_indexes',
+        'migrate_student_id_keys',
+    )
+    
+    # 每个连接打开后设置的PRAGMA
+    CONNECTION_PRAGMAS = (
+        ('synchronous', 'NORMAL'),          # WAL模式下只在检查点时同步，断电最多丢失最近的事务，不会损坏数据库
+        ('cache_size', -16000),             # 页缓存16MB(负数表示以KB为单位)
+        ('mmap_size', 64 * 1024 * 1024),    # 以内存映射方式读取数据库文件的前64MB
+        ('temp_store', 'MEMORY'),           # 排序、分组使用的临时B树放在内存中
+        ('foreign_keys', 'ON'),             # 检查外键约束，不能删除仍有记录引用的学生、小组和扣分记录
+    )
+    
+    # 查询记录时按student_id取得学生姓名的列表达式，结果中的student_name列与迁移8之前相同
+    STUDENT_NAME_COLUMN = '(SELECT name FROM students WHERE students.id = student_id) AS student_name'
+    
+    # RecordBatch中的学生不超过此人数时按ID逐个查姓名，否则读取全部学生
+    BATCH_NAME_LOOKUP_LIMIT = 500
+    
+    # 扣分排名可用的排序方式及对应的排序列
+    DEDUCTION_RANKING_ORDER = {
+        "total": "total_points",
+        "violation": "violation_points",
+        "non_violation": "non_violation_points",
+    }
+    
+    # 分批/分页搜索记录时每批、每页的默认记录数
+    SEARCH_BATCH_SIZE = 500
+    SEARCH_PAGE_SIZE = 100
+    
+    # 数据库快照: 每步复制的页数(两步之间其他连接可以写入)、数据库被锁定时重试前等待的秒数、
+    # 自动快照的最短间隔秒数和保留的快照数
+    SNAPSHOT_PAGES_PER_STEP = 256
+    SNAPSHOT_STEP_SLEEP = 0.005
+    SNAPSHOT_INTERVAL = 60 * 60
+    SNAPSHOT_KEEP = 10
+    SNAPSHOT_TIME_FORMAT = '%Y%m%d_%H%M%S_%f'
+    
+    def __init__(self, db_path: str = "student_score.db", cache_max_size: int = 256):
+        """初始化数据库
+        
+        参数:
+            db_path: 数据库文件路径
+            cache_max_size: 查询缓存最多保存的结果数
+        """
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.read_conn = None
+        self.read_cursor = None
+        
+        # 查询缓存: 每张表一个版本号，写入时递增
+        self._table_generations = defaultdict(int)
+        self._query_cache = OrderedDict()
+        self._cache_lock = threading.Lock()  # clone()得到的对象在其他线程中共享缓存
+        self._clones = weakref.WeakSet()
+        self._clones_lock = threading.Lock()  # clone()可能在后台线程中调用，close()在GUI线程中遍历_clones
+        self.cache_max_size = cache_max_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._full_text_search = None  # 是否有全文索引，首次按关键词搜索时检查
         
         # 连接数据库
         self.connect()
@@ -25,18 +169,154 @@ class Database:
         self.init_db()
         
     def connect(self):
-        """连接数据库"""
-        self.conn = sqlite3.connect(self.db_path)
+        """连接数据库
+        
+        写连接(conn/cursor)启用WAL日志，查询方法使用单独的只读连接(read_conn/read_cursor)。
+        WAL模式下读取不会被写事务阻塞，长时间的读取也不会阻塞写入。
+        """
+        self._open_connections()
+        
+        # 重新连接后数据库文件可能已被替换
+        self.clear_query_cache()
+        self._full_text_search = None
+        
+    def _open_connections(self, check_same_thread: bool = True):
+        """打开写连接和只读连接
+        
+        参数:
+            check_same_thread: 是否只允许在创建连接的线程中使用连接
+        """
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
         self.conn.row_factory = sqlite3.Row  # 使查询结果可以通过列名访问
         self.cursor = self.conn.cursor()
+        self.cursor.execute('PRAGMA journal_mode = WAL')
+        self.cursor.fetchone()
+        self._configure_connection(self.conn)
+        
+        self.read_conn = self._open_read_connection(check_same_thread)
+        self.read_cursor = self.read_conn.cursor()
+        
+    def clone(self) -> 'Database':
+        """创建连接到同一数据库文件的Database对象，供其他线程使用
+        
+        sqlite3连接不能跨线程使用，新对象打开自己的连接，但与原对象共享查询缓存和表版本号，
+        任一对象的写入都会使双方相关的缓存失效。数据库结构已由原对象初始化，不再执行迁移。
+        原对象close()时一并关闭其创建的对象的连接，以便随后删除或替换数据库文件。
+        """
+        if self.db_path == ':memory:':
+            raise ValueError("内存数据库无法在其他连接中打开")
+        clone = copy.copy(self)
+        clone._clones = weakref.WeakSet()
+        clone._clones_lock = threading.Lock()
+        # 在锁内打开连接并登记，close()不会遗漏正在创建的对象
+        with self._clones_lock:
+            clone._open_connections(check_same_thread=False)
+            self._clones.add(clone)
+        return clone
+        
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """为连接设置CONNECTION_PRAGMAS"""
+        for name, value in self.CONNECTION_PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
+            
+    def _open_read_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """以只读模式打开数据库文件的第二个连接
+        
+        内存数据库无法被另一个连接打开，此时直接使用写连接
+        """
+        if self.db_path == ':memory:':
+            return self.conn
+        uri = Path(os.path.abspath(self.db_path)).as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        return conn
+        
+    def invalidate_tables(self, *tables: str):
+        """递增指定表的版本号，使依赖这些表的缓存失效
+        
+        直接通过cursor修改数据后应调用此方法
+        """
+        with self._cache_lock:
+            for table in tables:
+                self._table_generations[table] += 1
+                
+    def clear_query_cache(self):
+        """清空查询缓存"""
+        with self._cache_lock:
+            self._query_cache.clear()
+        
+    def get_cache_stats(self) -> Dict[str, int]:
+        """获取查询缓存统计
+        
+        返回:
+            包含hits(命中次数)、misses(未命中次数)、size(当前缓存项数)、
+            max_size(最大缓存项数)的字典
+        """
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': len(self._query_cache),
+            'max_size': self.cache_max_size
+        }
         
     def close(self):
-        """关闭数据库连接"""
+        """关闭数据库连接，包括clone()创建的对象的连接"""
+        with self._clones_lock:
+            clones = list(self._clones)
+            self._clones.clear()
+        for clone in clones:
+            clone.close()
+        if self.read_conn and self.read_conn is not self.conn:
+            self.read_conn.close()
         if self.conn:
             self.conn.close()
+        self.conn = self.read_conn = None
             
     def init_db(self):
-        """初始化数据库"""
+        """初始化数据库
+        
+        PRAGMA user_version记录已执行的迁移数，只执行尚未执行的迁移；
+        已是最新结构的数据库只需读取一次版本号。
+        """
+        self.cursor.execute('PRAGMA user_version')
+        version = self.cursor.fetchone()[0]
+        pending = range(version + 1, len(self.MIGRATIONS) + 1)
+        if pending:
+            # 迁移中重建被引用的表时需暂时关闭外键检查，该设置只能在事务之外修改
+            self.cursor.execute('PRAGMA foreign_keys = OFF')
+            try:
+                for number in pending:
+                    self.run_migration(number)
+            finally:
+                self.cursor.execute('PRAGMA foreign_keys = ON')
+            
+        # 初始化学生数据
+        if STUDENT_LIST:
+            self.cursor.executemany(
+                'INSERT OR IGNORE INTO students (name) VALUES (?)',
+                [(student_name,) for student_name in STUDENT_LIST]
+            )
+            self.conn.commit()
+            
+    def run_migration(self, number: int):
+        """在一个事务中执行第number个迁移并更新PRAGMA user_version
+        
+        参数:
+            number: 迁移编号，从1开始
+        """
+        migration = getattr(self, self.MIGRATIONS[number - 1])
+        self.cursor.execute('BEGIN')
+        try:
+            migration()
+            self.cursor.execute(f'PRAGMA user_version = {number}')
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+            
+    def create_tables(self):
+        """迁移1: 创建数据表"""
         # 创建学生表
         self.cursor.execute('''
         CREATE TABLE IF NOT EXISTS students (
@@ -54,17 +334,94 @@ class Database:
             points REAL NOT NULL,
             violation_behavior TEXT,
             treatment_measures TEXT,
-            date TEXT NOT NULL,
+            date INTEGER NOT NULL,
             deduction_type INTEGER NOT NULL,
             violation_type INTEGER,
             FOREIGN KEY (student_name) REFERENCES students (name)
         )
         ''')
         
-        # 创建索引
-        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_deduction_student_name ON deduction_records(student_name)')
-        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_deduction_date ON deduction_records(date)')
+        # 创建补偿记录表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS compensation_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deduction_record_id INTEGER NOT NULL,
+            old_points REAL NOT NULL,
+            new_points REAL NOT NULL,
+            reason TEXT NOT NULL,
+            date TEXT NOT NULL,
+            FOREIGN KEY (deduction_record_id) REFERENCES deduction_records (id)
+        )
+        ''')
         
+        # 创建加分记录表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS addition_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT NOT NULL,
+            points REAL NOT NULL,
+            reason TEXT,
+            start_date INTEGER NOT NULL,
+            end_date INTEGER NOT NULL,
+            FOREIGN KEY (student_name) REFERENCES students (name)
+        )
+        ''')
+        
+        # 创建小组表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_at TEXT NOT NULL
+        )
+        ''')
+        
+        # 创建学生分组表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS student_groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT NOT NULL,
+            group_id INTEGER NOT NULL,
+            join_date TEXT NOT NULL,
+            FOREIGN KEY (student_name) REFERENCES students (name),
+            FOREIGN KEY (group_id) REFERENCES groups (id)
+        )
+        ''')
+        
+        # 创建小组加分记录表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_addition_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_id INTEGER NOT NULL,
+            points REAL NOT NULL,
+            reason TEXT,
+            date TEXT NOT NULL,
+            FOREIGN KEY (group_id) REFERENCES groups (id)
+        )
+        ''')
+        
+        # 创建配置表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS config (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        ''')
+        
+        # 创建锁定时间段表
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS locked_time_periods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        ''')
+        
+    def migrate_deduction_columns(self):
+        """迁移2: 为旧数据库的扣分记录表补充字段，并允许reason为空"""
         # 检查deduction_records表的结构
         self.cursor.execute("PRAGMA table_info(deduction_records)")
         columns = {column[1]: column for column in self.cursor.fetchall()}
@@ -130,112 +487,668 @@ class Database:
             ALTER TABLE deduction_records ADD COLUMN non_violation_type TEXT
             ''')
         
-        # 创建补偿记录表
+    def migrate_day_number_dates(self):
+        """迁移3: 将扣分记录和加分记录中的ISO格式文本日期转换为自1970-01-01起的天数
+        
+        TEXT列会把写入的整数重新转换为文本，因此需要按新的列类型重建表并复制数据，
+        记录ID和自增序列保持不变。重建后的表上的索引和触发器由之后的迁移创建。
+        """
+        # julianday()返回当天0点的儒略日，减去1970-01-01的儒略日即为天数
+        to_day = "CAST(julianday(substr({0}, 1, 10)) - 2440587.5 AS INTEGER)"
+        
+        self.cursor.execute("PRAGMA table_info(deduction_records)")
+        columns = {column[1]: column for column in self.cursor.fetchall()}
+        if columns['date'][2].upper() == 'TEXT':
+            self.cursor.execute('''
+            CREATE TABLE deduction_records_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_name TEXT NOT NULL,
+                points REAL NOT NULL,
+                violation_behavior TEXT,
+                treatment_measures TEXT,
+                date INTEGER NOT NULL,
+                deduction_type INTEGER NOT NULL,
+                violation_type INTEGER,
+                reason TEXT,
+                non_violation_type TEXT,
+                FOREIGN KEY (student_name) REFERENCES students (name)
+            )
+            ''')
+            self.cursor.execute(f'''
+            INSERT INTO deduction_records_new
+            (id, student_name, points, violation_behavior, treatment_measures, date,
+             deduction_type, violation_type, reason, non_violation_type)
+            SELECT id, student_name, points, violation_behavior, treatment_measures, {to_day.format('date')},
+                   deduction_type, violation_type, reason, non_violation_type
+            FROM deduction_records
+            ''')
+            self._replace_table('deduction_records')
+            
+        self.cursor.execute("PRAGMA table_info(addition_records)")
+        columns = {column[1]: column for column in self.cursor.fetchall()}
+        if columns['start_date'][2].upper() == 'TEXT':
+            self.cursor.execute('''
+            CREATE TABLE addition_records_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_name TEXT NOT NULL,
+                points REAL NOT NULL,
+                reason TEXT,
+                start_date INTEGER NOT NULL,
+                end_date INTEGER NOT NULL,
+                FOREIGN KEY (student_name) REFERENCES students (name)
+            )
+            ''')
+            self.cursor.execute(f'''
+            INSERT INTO addition_records_new (id, student_name, points, reason, start_date, end_date)
+            SELECT id, student_name, points, reason, {to_day.format('start_date')}, {to_day.format('end_date')}
+            FROM addition_records
+            ''')
+            self._replace_table('addition_records')
+            
+    def _replace_table(self, table: str):
+        """用{table}_new替换table，并沿用原表的自增序列"""
+        self.cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,))
+        row = self.cursor.fetchone()
+        seq = row['seq'] if row else 0
+        
+        self.cursor.execute(f'DROP TABLE {table}')
+        self.cursor.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+        self.cursor.execute('UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?', (seq, table))
+        
+    def create_indexes(self):
+        """迁移4: 创建扣分记录和加分记录的索引"""
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_deduction_student_name ON deduction_records(student_name)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_deduction_date ON deduction_records(date)')
+        
+        # 加分时间段索引: 按学生检查重叠、按时间段筛选
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS compensation_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            deduction_record_id INTEGER NOT NULL,
-            old_points REAL NOT NULL,
-            new_points REAL NOT NULL,
-            reason TEXT NOT NULL,
-            date TEXT NOT NULL,
-            FOREIGN KEY (deduction_record_id) REFERENCES deduction_records (id)
+        CREATE INDEX IF NOT EXISTS idx_addition_student_period
+        ON addition_records(student_name, start_date, end_date)
+        ''')
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_addition_period
+        ON addition_records(end_date, start_date, student_name, points)
+        ''')
+        
+    def init_score_summary(self):
+        """迁移5: 创建学生积分汇总表及维护它的触发器
+        
+        student_score_summary保存每个学生的加分总和、违规扣分总和、
+        非违规扣分总和和违规次数，由扣分记录表和加分记录表上的触发器
+        在插入、修改(包括补偿修改扣分值)和删除时增量维护，
+        读取总分时无需再对原始记录求和。
+        汇总表首次创建时会根据已有记录重建一次。
+        """
+        self.cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'student_score_summary'"
+        )
+        summary_exists = self.cursor.fetchone() is not None
+        
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS student_score_summary (
+            student_name TEXT PRIMARY KEY,
+            addition_total REAL NOT NULL DEFAULT 0.0,
+            violation_total REAL NOT NULL DEFAULT 0.0,
+            non_violation_total REAL NOT NULL DEFAULT 0.0,
+            violation_count INTEGER NOT NULL DEFAULT 0
         )
         ''')
         
-        # 创建加分记录表
+        # 扣分记录: 按扣分类型累加到对应列
+        deduction_add = '''
+            INSERT INTO student_score_summary
+            (student_name, violation_total, non_violation_total, violation_count)
+            VALUES (
+                NEW.student_name,
+                CASE WHEN NEW.deduction_type = 1 THEN NEW.points ELSE 0.0 END,
+                CASE WHEN NEW.deduction_type = 2 THEN NEW.points ELSE 0.0 END,
+                CASE WHEN NEW.deduction_type = 1 THEN 1 ELSE 0 END
+            )
+            ON CONFLICT(student_name) DO UPDATE SET
+                violation_total = violation_total + excluded.violation_total,
+                non_violation_total = non_violation_total + excluded.non_violation_total,
+                violation_count = violation_count + excluded.violation_count;
+        '''
+        deduction_remove = '''
+            UPDATE student_score_summary SET
+                violation_total = violation_total - CASE WHEN OLD.deduction_type = 1 THEN OLD.points ELSE 0.0 END,
+                non_violation_total = non_violation_total - CASE WHEN OLD.deduction_type = 2 THEN OLD.points ELSE 0.0 END,
+                violation_count = violation_count - CASE WHEN OLD.deduction_type = 1 THEN 1 ELSE 0 END
+            WHERE student_name = OLD.student_name;
+        '''
+        
+        # 加分记录
+        addition_add = '''
+            INSERT INTO student_score_summary (student_name, addition_total)
+            VALUES (NEW.student_name, NEW.points)
+            ON CONFLICT(student_name) DO UPDATE SET
+                addition_total = addition_total + excluded.addition_total;
+        '''
+        addition_remove = '''
+            UPDATE student_score_summary SET addition_total = addition_total - OLD.points
+            WHERE student_name = OLD.student_name;
+        '''
+        
+        triggers = {
+            'trg_deduction_summary_insert': ('AFTER INSERT ON deduction_records', deduction_add),
+            'trg_deduction_summary_delete': ('AFTER DELETE ON deduction_records', deduction_remove),
+            'trg_deduction_summary_update': (
+                'AFTER UPDATE OF student_name, points, deduction_type ON deduction_records',
+                deduction_remove + deduction_add
+            ),
+            'trg_addition_summary_insert': ('AFTER INSERT ON addition_records', addition_add),
+            'trg_addition_summary_delete': ('AFTER DELETE ON addition_records', addition_remove),
+            'trg_addition_summary_update': (
+                'AFTER UPDATE OF student_name, points ON addition_records',
+                addition_remove + addition_add
+            ),
+        }
+        for trigger_name, (event, body) in triggers.items():
+            self.cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {trigger_name} {event} BEGIN {body} END')
+            
+        if not summary_exists:
+            # 按本迁移时的表结构(记录以student_name引用学生)汇总，rebuild_score_summary已随迁移8改为按student_id汇总
+            self.cursor.execute('''
+                INSERT INTO student_score_summary
+                (student_name, addition_total, violation_total, non_violation_total, violation_count)
+                SELECT
+                    student_name,
+                    SUM(addition_total),
+                    SUM(violation_total),
+                    SUM(non_violation_total),
+                    SUM(violation_count)
+                FROM (
+                    SELECT
+                        student_name,
+                        0.0 AS addition_total,
+                        COALESCE(SUM(CASE WHEN deduction_type = 1 THEN points END), 0.0) AS violation_total,
+                        COALESCE(SUM(CASE WHEN deduction_type = 2 THEN points END), 0.0) AS non_violation_total,
+                        COUNT(CASE WHEN deduction_type = 1 THEN 1 END) AS violation_count
+                    FROM deduction_records
+                    GROUP BY student_name
+                    UNION ALL
+                    SELECT student_name, SUM(points), 0.0, 0.0, 0
+                    FROM addition_records
+                    GROUP BY student_name
+                )
+                GROUP BY student_name
+            ''')
+        
+    def _create_score_summary_triggers(self):
+        """迁移8: 创建按student_id维护学生积分汇总表的触发器(与迁移5的触发器同名，改以student_id标识学生)"""
+        # 扣分记录: 按扣分类型累加到对应列
+        deduction_add = '''
+            INSERT INTO student_score_summary
+            (student_id, violation_total, non_violation_total, violation_count)
+            VALUES (
+                NEW.student_id,
+                CASE WHEN NEW.deduction_type = 1 THEN NEW.points ELSE 0.0 END,
+                CASE WHEN NEW.deduction_type = 2 THEN NEW.points ELSE 0.0 END,
+                CASE WHEN NEW.deduction_type = 1 THEN 1 ELSE 0 END
+            )
+            ON CONFLICT(student_id) DO UPDATE SET
+                violation_total = violation_total + excluded.violation_total,
+                non_violation_total = non_violation_total + excluded.non_violation_total,
+                violation_count = violation_count + excluded.violation_count;
+        '''
+        deduction_remove = '''
+            UPDATE student_score_summary SET
+                violation_total = violation_total - CASE WHEN OLD.deduction_type = 1 THEN OLD.points ELSE 0.0 END,
+                non_violation_total = non_violation_total - CASE WHEN OLD.deduction_type = 2 THEN OLD.points ELSE 0.0 END,
+                violation_count = violation_count - CASE WHEN OLD.deduction_type = 1 THEN 1 ELSE 0 END
+            WHERE student_id = OLD.student_id;
+        '''
+        
+        # 加分记录
+        addition_add = '''
+            INSERT INTO student_score_summary (student_id, addition_total)
+            VALUES (NEW.student_id, NEW.points)
+            ON CONFLICT(student_id) DO UPDATE SET
+                addition_total = addition_total + excluded.addition_total;
+        '''
+        addition_remove = '''
+            UPDATE student_score_summary SET addition_total = addition_total - OLD.points
+            WHERE student_id = OLD.student_id;
+        '''
+        
+        triggers = {
+            'trg_deduction_summary_insert': ('AFTER INSERT ON deduction_records', deduction_add),
+            'trg_deduction_summary_delete': ('AFTER DELETE ON deduction_records', deduction_remove),
+            'trg_deduction_summary_update': (
+                'AFTER UPDATE OF student_id, points, deduction_type ON deduction_records',
+                deduction_remove + deduction_add
+            ),
+            'trg_addition_summary_insert': ('AFTER INSERT ON addition_records', addition_add),
+            'trg_addition_summary_delete': ('AFTER DELETE ON addition_records', addition_remove),
+            'trg_addition_summary_update': (
+                'AFTER UPDATE OF student_id, points ON addition_records',
+                addition_remove + addition_add
+            ),
+        }
+        for trigger_name, (event, body) in triggers.items():
+            self.cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {trigger_name} {event} BEGIN {body} END')
+            
+    # 全文索引覆盖的列
+    FULL_TEXT_COLUMNS = {
+        'deduction_records': ('violation_behavior', 'reason', 'treatment_measures'),
+        'addition_records': ('reason',),
+    }
+    
+    def init_full_text_search(self):
+        """迁移6: 为扣分记录和加分记录的文本列创建FTS5全文索引及同步触发器
+        
+        使用trigram分词器，中文不需要分词即可按任意子串检索。索引表为外部内容表，
+        不重复保存文本，只保存索引；由记录表上的触发器在插入、修改和删除时同步。
+        SQLite版本低于3.34(不支持trigram)或未编译FTS5时跳过，按关键词搜索改用LIKE。
+        """
+        for table, columns in self.FULL_TEXT_COLUMNS.items():
+            fts_table = f'{table}_fts'
+            column_list = ', '.join(columns)
+            try:
+                self.cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                    {column_list}, content='{table}', content_rowid='id', tokenize='trigram'
+                )
+                ''')
+            except sqlite3.OperationalError as e:
+                print(f"创建全文索引失败，按关键词搜索将使用LIKE: {e}")
+                return
+            
+            new_values = ', '.join(f'NEW.{column}' for column in columns)
+            old_values = ', '.join(f'OLD.{column}' for column in columns)
+            fts_add = f'INSERT INTO {fts_table}(rowid, {column_list}) VALUES (NEW.id, {new_values});'
+            # 外部内容表需用'delete'命令并给出原文本才能删除索引条目
+            fts_remove = (f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                          f"VALUES ('delete', OLD.id, {old_values});")
+            triggers = {
+                f'trg_{table}_fts_insert': (f'AFTER INSERT ON {table}', fts_add),
+                f'trg_{table}_fts_delete': (f'AFTER DELETE ON {table}', fts_remove),
+                f'trg_{table}_fts_update': (f'AFTER UPDATE OF id, {column_list} ON {table}', fts_remove + fts_add),
+            }
+            for trigger_name, (event, body) in triggers.items():
+                self.cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {trigger_name} {event} BEGIN {body} END')
+                
+            # 为已有记录建立索引
+            self.cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+            
+    def _create_full_text_triggers(self, table: str):
+        """迁移8: 重建记录表后重新创建使table的全文索引与记录保持同步的触发器(同迁移6)"""
+        fts_table = f'{table}_fts'
+        columns = self.FULL_TEXT_COLUMNS[table]
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'NEW.{column}' for column in columns)
+        old_values = ', '.join(f'OLD.{column}' for column in columns)
+        fts_add = f'INSERT INTO {fts_table}(rowid, {column_list}) VALUES (NEW.id, {new_values});'
+        # 外部内容表需用'delete'命令并给出原文本才能删除索引条目
+        fts_remove = (f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                      f"VALUES ('delete', OLD.id, {old_values});")
+        triggers = {
+            f'trg_{table}_fts_insert': (f'AFTER INSERT ON {table}', fts_add),
+            f'trg_{table}_fts_delete': (f'AFTER DELETE ON {table}', fts_remove),
+            f'trg_{table}_fts_update': (f'AFTER UPDATE OF id, {column_list} ON {table}', fts_remove + fts_add),
+        }
+        for trigger_name, (event, body) in triggers.items():
+            self.cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {trigger_name} {event} BEGIN {body} END')
+            
+    def create_search_indexes(self):
+        """迁移7: 按查询条件的组合创建复合索引
+        
+        check_query_plans.py对database.py中的每条查询执行EXPLAIN QUERY PLAN，
+        新增查询后应运行该脚本确认没有意外的全表扫描。
+        """
+        indexes = {
+            # 按学生查询扣分记录并按日期排序；取代只有student_name的索引
+            'idx_deduction_student_date': 'deduction_records(student_name, date)',
+            # 按扣分类型和日期范围统计、搜索，附带student_name使违规次数统计只读索引
+            'idx_deduction_type_date': 'deduction_records(deduction_type, date, student_name)',
+            # 按违规类型/非违规类型和日期范围搜索；两列多为NULL，只索引有值的记录
+            'idx_deduction_violation_type_date':
+                'deduction_records(violation_type, date) WHERE violation_type IS NOT NULL',
+            'idx_deduction_non_violation_type_date':
+                'deduction_records(non_violation_type, date) WHERE non_violation_type IS NOT NULL',
+            # 查询扣分记录的补偿记录
+            'idx_compensation_deduction_date': 'compensation_records(deduction_record_id, date)',
+            # 查询小组成员，以及学生所在的小组
+            'idx_student_groups_group': 'student_groups(group_id, student_name)',
+            'idx_student_groups_student': 'student_groups(student_name, group_id)',
+        }
+        for index_name, definition in indexes.items():
+            self.cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {definition}')
+        self.cursor.execute('DROP INDEX IF EXISTS idx_deduction_student_name')
+        
+    def migrate_student_id_keys(self):
+        """迁移8: 扣分记录、加分记录和小组成员改为以整数student_id引用学生
+        
+        按学生查询、联结和索引比较整数而不是姓名字符串，索引也更小。
+        记录中出现但学生表中没有的姓名先补入学生表，重建后的表保留原记录ID和自增序列。
+        重建表时原表上的索引和触发器一并删除，此处按student_id重新创建，
+        学生积分汇总表也改为以student_id为主键并根据记录重建。
+        """
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS addition_records (
+        INSERT OR IGNORE INTO students (name)
+        SELECT student_name FROM deduction_records
+        UNION SELECT student_name FROM addition_records
+        UNION SELECT student_name FROM student_groups
+        ''')
+        student_id = '(SELECT id FROM students WHERE name = student_name)'
+        
+        self.cursor.execute('''
+        CREATE TABLE deduction_records_new (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_name TEXT NOT NULL,
+            student_id INTEGER NOT NULL,
             points REAL NOT NULL,
+            violation_behavior TEXT,
+            treatment_measures TEXT,
+            date INTEGER NOT NULL,
+            deduction_type INTEGER NOT NULL,
+            violation_type INTEGER,
             reason TEXT,
-            start_date TEXT NOT NULL,
-            end_date TEXT NOT NULL,
-            FOREIGN KEY (student_name) REFERENCES students (name)
+            non_violation_type TEXT,
+            FOREIGN KEY (student_id) REFERENCES students (id)
         )
         ''')
+        self.cursor.execute(f'''
+        INSERT INTO deduction_records_new
+        (id, student_id, points, violation_behavior, treatment_measures, date,
+         deduction_type, violation_type, reason, non_violation_type)
+        SELECT id, {student_id}, points, violation_behavior, treatment_measures, date,
+               deduction_type, violation_type, reason, non_violation_type
+        FROM deduction_records
+        ''')
+        self._replace_table('deduction_records')
         
-        # 创建小组表
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS groups (
+        CREATE TABLE addition_records_new (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            created_at TEXT NOT NULL
+            student_id INTEGER NOT NULL,
+            points REAL NOT NULL,
+            reason TEXT,
+            start_date INTEGER NOT NULL,
+            end_date INTEGER NOT NULL,
+            FOREIGN KEY (student_id) REFERENCES students (id)
         )
         ''')
+        self.cursor.execute(f'''
+        INSERT INTO addition_records_new (id, student_id, points, reason, start_date, end_date)
+        SELECT id, {student_id}, points, reason, start_date, end_date
+        FROM addition_records
+        ''')
+        self._replace_table('addition_records')
         
-        # 创建学生分组表
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS student_groups (
+        CREATE TABLE student_groups_new (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_name TEXT NOT NULL,
+            student_id INTEGER NOT NULL,
             group_id INTEGER NOT NULL,
             join_date TEXT NOT NULL,
-            FOREIGN KEY (student_name) REFERENCES students (name),
+            FOREIGN KEY (student_id) REFERENCES students (id),
             FOREIGN KEY (group_id) REFERENCES groups (id)
         )
         ''')
-        
-        # 创建小组加分记录表
+        self.cursor.execute(f'''
+        INSERT INTO student_groups_new (id, student_id, group_id, join_date)
+        SELECT id, {student_id}, group_id, join_date
+        FROM student_groups
+        ''')
+        self._replace_table('student_groups')
+        
+        indexes = {
+            'idx_deduction_date': 'deduction_records(date)',
+            'idx_deduction_student_date': 'deduction_records(student_id, date)',
+            'idx_deduction_type_date': 'deduction_records(deduction_type, date, student_id)',
+            'idx_deduction_violation_type_date':
+                'deduction_records(violation_type, date) WHERE violation_type IS NOT NULL',
+            'idx_deduction_non_violation_type_date':
+                'deduction_records(non_violation_type, date) WHERE non_violation_type IS NOT NULL',
+            'idx_addition_student_period': 'addition_records(student_id, start_date, end_date)',
+            'idx_addition_period': 'addition_records(end_date, start_date, student_id, points)',
+            'idx_student_groups_group': 'student_groups(group_id, student_id)',
+            'idx_student_groups_student': 'student_groups(student_id, group_id)',
+        }
+        for index_name, definition in indexes.items():
+            self.cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {definition}')
+            
+        self.cursor.execute('DROP TABLE student_score_summary')
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS group_addition_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            group_id INTEGER NOT NULL,
-            points REAL NOT NULL,
-            reason TEXT,
-            date TEXT NOT NULL,
-            FOREIGN KEY (group_id) REFERENCES groups (id)
+        CREATE TABLE student_score_summary (
+            student_id INTEGER PRIMARY KEY,
+            addition_total REAL NOT NULL DEFAULT 0.0,
+            violation_total REAL NOT NULL DEFAULT 0.0,
+            non_violation_total REAL NOT NULL DEFAULT 0.0,
+            violation_count INTEGER NOT NULL DEFAULT 0
         )
         ''')
+        self._create_score_summary_triggers()
+        self.rebuild_score_summary(commit=False)
         
-        # 创建配置表
+        if self._has_full_text_search():
+            for table in self.FULL_TEXT_COLUMNS:
+                self._create_full_text_triggers(table)
+                
+    def _has_full_text_search(self) -> bool:
+        """数据库中是否已创建全文索引"""
+        if self._full_text_search is None:
+            self.read_cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'deduction_records_fts'"
+            )
+            self._full_text_search = self.read_cursor.fetchone() is not None
+        return self._full_text_search
+        
+    def rebuild_full_text_index(self, commit: bool = True):
+        """根据记录表重建全文索引，未创建全文索引时不做任何操作
+        
+        参数:
+            commit: 是否在重建后提交事务
+        """
+        if not self._has_full_text_search():
+            return
+        for table in self.FULL_TEXT_COLUMNS:
+            self.cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+        if commit:
+            self.conn.commit()
+            
+    def _text_search_condition(self, table: str, text: str) -> Tuple[str, list]:
+        """构造按关键词搜索记录文本列的条件
+        
+        关键词按空白拆分，每个词都须出现在某个文本列中。不少于3个字的词通过全文索引查找；
+        trigram索引无法查找更短的词，改用LIKE扫描。
+        
+        参数:
+            table: 记录表名，见FULL_TEXT_COLUMNS
+            text: 关键词
+            
+        返回:
+            (以' AND'开头的条件, 参数列表)
+        """
+        columns = self.FULL_TEXT_COLUMNS[table]
+        query = ''
+        params = []
+        use_index = self._has_full_text_search()
+        for term in text.split():
+            if use_index and len(term) >= 3:
+                query += f' AND id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)'
+                # 作为短语查询，避免关键词中的引号、运算符被解释为FTS5查询语法
+                params.append('"' + term.replace('"', '""') + '"')
+            else:
+                pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                query += ' AND (' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in columns) + ')'
+                params.extend([pattern] * len(columns))
+        return query, params
+        
+    @invalidates('deduction_records', 'addition_records')
+    def rebuild_score_summary(self, commit: bool = True):
+        """根据扣分记录和加分记录重建学生积分汇总表
+        
+        参数:
+            commit: 是否在重建后提交事务
+        """
+        self.cursor.execute('DELETE FROM student_score_summary')
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS config (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL
-        )
+            INSERT INTO student_score_summary
+            (student_id, addition_total, violation_total, non_violation_total, violation_count)
+            SELECT
+                student_id,
+                SUM(addition_total),
+                SUM(violation_total),
+                SUM(non_violation_total),
+                SUM(violation_count)
+            FROM (
+                SELECT
+                    student_id,
+                    0.0 AS addition_total,
+                    COALESCE(SUM(CASE WHEN deduction_type = 1 THEN points END), 0.0) AS violation_total,
+                    COALESCE(SUM(CASE WHEN deduction_type = 2 THEN points END), 0.0) AS non_violation_total,
+                    COUNT(CASE WHEN deduction_type = 1 THEN 1 END) AS violation_count
+                FROM deduction_records
+                GROUP BY student_id
+                UNION ALL
+                SELECT student_id, SUM(points), 0.0, 0.0, 0
+                FROM addition_records
+                GROUP BY student_id
+            )
+            GROUP BY student_id
         ''')
+        if commit:
+            self.conn.commit()
+            
+    def verify_score_summary(self, tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+        """校验学生积分汇总表与原始记录是否一致
         
-        # 创建锁定时间段表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS locked_time_periods (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            start_date TEXT NOT NULL,
-            end_date TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        )
+        参数:
+            tolerance: 允许的浮点误差
+            
+        返回:
+            不一致的学生列表，每项包含:
+            - student_name: 学生姓名
+            - field: 不一致的字段
+            - expected: 根据原始记录计算出的值
+            - actual: 汇总表中的值
+            全部一致时返回空列表
+        """
+        fields = ['addition_total', 'violation_total', 'non_violation_total', 'violation_count']
+        
+        self.read_cursor.execute('''
+            SELECT student_id, addition_total, violation_total, non_violation_total, violation_count
+            FROM student_score_summary
+        ''')
+        actual = {row['student_id']: dict(row) for row in self.read_cursor.fetchall()}
+        
+        self.read_cursor.execute('''
+            SELECT
+                student_id,
+                COALESCE(SUM(CASE WHEN deduction_type = 1 THEN points END), 0.0) AS violation_total,
+                COALESCE(SUM(CASE WHEN deduction_type = 2 THEN points END), 0.0) AS non_violation_total,
+                COUNT(CASE WHEN deduction_type = 1 THEN 1 END) AS violation_count
+            FROM deduction_records
+            GROUP BY student_id
         ''')
+        expected = {
+            row['student_id']: {'addition_total': 0.0, **dict(row)}
+            for row in self.read_cursor.fetchall()
+        }
         
-        # 初始化学生数据
-        for student_name in STUDENT_LIST:
-            self.cursor.execute('SELECT * FROM students WHERE name = ?', (student_name,))
-            if not self.cursor.fetchone():
-                self.cursor.execute('INSERT INTO students (name) VALUES (?)', (student_name,))
-                
-        self.conn.commit()
+        self.read_cursor.execute('''
+            SELECT student_id, SUM(points) AS addition_total
+            FROM addition_records
+            GROUP BY student_id
+        ''')
+        for row in self.read_cursor.fetchall():
+            expected.setdefault(row['student_id'], {
+                'student_id': row['student_id'],
+                'violation_total': 0.0,
+                'non_violation_total': 0.0,
+                'violation_count': 0
+            })['addition_total'] = row['addition_total']
+            
+        self.read_cursor.execute('SELECT id, name FROM students')
+        names = {row['id']: row['name'] for row in self.read_cursor.fetchall()}
+        
+        mismatches = []
+        for student_id in sorted(set(actual) | set(expected), key=lambda key: names.get(key, '')):
+            for field in fields:
+                expected_value = expected.get(student_id, {}).get(field, 0)
+                actual_value = actual.get(student_id, {}).get(field, 0)
+                if abs(expected_value - actual_value) > tolerance:
+                    mismatches.append({
+                        'student_name': names.get(student_id, str(student_id)),
+                        'field': field,
+                        'expected': expected_value,
+                        'actual': actual_value
+                    })
+        return mismatches
         
     # 学生相关方法
+    @cached_query('students')
     def get_students(self) -> List[Student]:
         """获取所有学生"""
-        self.cursor.execute('SELECT * FROM students ORDER BY name')
-        rows = self.cursor.fetchall()
-        return [Student.from_dict(dict(row)) for row in rows]
+        return self._fetch_records(
+            Student, '学生', f'SELECT {self._record_columns(Student)} FROM students ORDER BY name'
+        )
         
+    @cached_query('students')
     def get_student(self, name: str) -> Optional[Student]:
         """获取指定学生"""
-        self.cursor.execute('SELECT * FROM students WHERE name = ?', (name,))
-        row = self.cursor.fetchone()
-        return Student.from_dict(dict(row)) if row else None
+        students = self._fetch_records(
+            Student, '学生', f'SELECT {self._record_columns(Student)} FROM students WHERE name = ?', (name,)
+        )
+        return students[0] if students else None
         
+    @cached_query('students')
     def get_student_by_id(self, student_id: int) -> Optional[Student]:
         """通过ID获取学生"""
-        self.cursor.execute('SELECT * FROM students WHERE id = ?', (student_id,))
+        students = self._fetch_records(
+            Student, '学生', f'SELECT {self._record_columns(Student)} FROM students WHERE id = ?', (student_id,)
+        )
+        return students[0] if students else None
+        
+    def _student_id(self, name: str) -> int:
+        """在写连接上按姓名查找学生ID，学生不存在时抛出ValueError"""
+        self.cursor.execute('SELECT id FROM students WHERE name = ?', (name,))
         row = self.cursor.fetchone()
-        return Student.from_dict(dict(row)) if row else None
+        if row is None:
+            raise ValueError(f"学生不存在: {name}")
+        return row['id']
+        
+    def _student_ids(self) -> Dict[str, int]:
+        """在写连接上读取全部学生的{姓名: ID}，供批量写入时按姓名查找"""
+        self.cursor.execute('SELECT id, name FROM students')
+        return {row['name']: row['id'] for row in self.cursor.fetchall()}
+        
+    @cached_query('students', 'deduction_records', 'addition_records')
+    def get_student_score_summary(self, name: str) -> Optional[Dict[str, Any]]:
+        """获取指定学生的积分汇总
         
+        返回:
+            学生不存在时返回None，否则返回字典，包含:
+            - name: 学生姓名
+            - initial_score: 初始分数
+            - addition_points: 加分总和
+            - violation_points: 违规扣分总和
+            - non_violation_points: 非违规扣分总和
+            - deduction_points: 扣分总和
+            - violation_count: 违规次数
+            - total_score: 总分(初始分数 + 加分总和 - 扣分总和)
+        """
+        self.read_cursor.execute('''
+            SELECT
+                s.name,
+                s.initial_score,
+                COALESCE(ss.addition_total, 0.0) AS addition_points,
+                COALESCE(ss.violation_total, 0.0) AS violation_points,
+                COALESCE(ss.non_violation_total, 0.0) AS non_violation_points,
+                COALESCE(ss.violation_total + ss.non_violation_total, 0.0) AS deduction_points,
+                COALESCE(ss.violation_count, 0) AS violation_count,
+                s.initial_score
+                    + COALESCE(ss.addition_total, 0.0)
+                    - COALESCE(ss.violation_total + ss.non_violation_total, 0.0) AS total_score
+            FROM students s
+            LEFT JOIN student_score_summary ss ON ss.student_id = s.id
+            WHERE s.name = ?
+        ''', (name,))
+        row = self.read_cursor.fetchone()
+        return dict(row) if row else None
+        
+    @invalidates('students')
     def update_student_initial_score(self, name: str, initial_score: float) -> bool:
         """更新学生初始分数"""
         try:
@@ -249,6 +1162,7 @@ class Database:
             return False
             
     # 扣分记录相关方法
+    @invalidates('deduction_records')
     def add_deduction_record(self, record: DeductionRecord) -> bool:
         """添加扣分记录
         
@@ -268,15 +1182,15 @@ class Database:
             self.cursor.execute(
                 '''
                 INSERT INTO deduction_records 
-                (student_name, points, violation_behavior, treatment_measures, date, deduction_type, violation_type, reason, non_violation_type) 
+                (student_id, points, violation_behavior, treatment_measures, date, deduction_type, violation_type, reason, non_violation_type) 
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''',
                 (
-                    record.student_name,
+                    self._student_id(record.student_name),
                     record.points,
                     record.violation_behavior,
                     record.treatment_measures,
-                    record.date.isoformat(),
+                    date_to_day(record.date),
                     record.deduction_type.value,
                     record.violation_type.value if record.violation_type else None,
                     record.reason,
@@ -304,43 +1218,191 @@ class Database:
                 - violation_type: 违规类型(可选)
                 - reason: 扣分原因(可选)
                 - non_violation_type: 非违规类型(可选)
+                
+        返回:
+            bool: 所有记录是否都添加成功，详细结果见bulk_add_deduction_records
         """
+        result = self.bulk_add_deduction_records(records)
+        return not result['failures']
+        
+    @invalidates('deduction_records')
+    def bulk_add_deduction_records(self, records: List[DeductionRecord]) -> Dict[str, Any]:
+        """在一个事务中批量插入扣分记录
+        
+        先逐条校验记录，有问题的记录单独报告而不影响其余记录；
+        通过校验的记录用executemany一次插入并只提交一次，
+        插入成功的记录会回填id。
+        
+        参数:
+            records: DeductionRecord对象列表
+            
+        返回:
+            字典，包含:
+            - inserted: 成功插入的记录数
+            - failures: 失败记录列表，每项包含index(在records中的位置)、
+              student_name和error(失败原因)
+        """
+        failures = []
+        candidates = []
+        student_ids = self._student_ids()
+        
+        for index, record in enumerate(records):
+            try:
+                candidates.append((index, record, self._deduction_record_params(record, student_ids)))
+            except (AttributeError, TypeError, ValueError) as e:
+                failures.append({
+                    'index': index,
+                    'student_name': getattr(record, 'student_name', None),
+                    'error': str(e)
+                })
+                
+        inserted = self._bulk_insert(
+            'deduction_records',
+            '''
+            INSERT INTO deduction_records 
+            (student_id, points, violation_behavior, treatment_measures, date, deduction_type, violation_type, reason, non_violation_type) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            candidates,
+            failures
+        )
+        return {'inserted': inserted, 'failures': failures}
+        
+    def _bulk_insert(self, table: str, insert_sql: str, candidates: list, failures: list, check=None) -> int:
+        """在一个事务中用executemany插入多行并回填id
+        
+        调用方已开启事务时在该事务的保存点内插入，由调用方决定提交或回滚
+        
+        参数:
+            table: 表名(须为AUTOINCREMENT表)
+            insert_sql: 单行INSERT语句
+            candidates: (在原列表中的位置, 记录对象, INSERT参数)元组列表
+            failures: 失败记录列表，失败项会追加到其中并按位置排序
+            check: 可选的校验函数，在写事务内、插入前以candidates为参数调用，
+                返回{位置: 失败原因}，这些记录不会被插入
+                
+        返回:
+            成功插入的行数
+        """
+        inserted = 0
+        # 调用方已开启事务时不提交也不回滚该事务，只在保存点内插入，出错时只撤销本次插入的行
+        own_transaction = bool(candidates) and not self.conn.in_transaction
+        in_savepoint = False
         try:
-            for record in records:
-                self.cursor.execute(
-                    '''
-                    INSERT INTO deduction_records 
-                    (student_name, points, violation_behavior, treatment_measures, date, deduction_type, violation_type, reason, non_violation_type) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''',
-                    (
-                        record.student_name,
-                        record.points,
-                        record.violation_behavior,
-                        record.treatment_measures,
-                        record.date.isoformat(),
-                        record.deduction_type.value,
-                        record.violation_type.value if record.violation_type else None,
-                        record.reason,
-                        record.non_violation_type
-                    )
-                )
-                record.id = self.cursor.lastrowid
-            self.conn.commit()
-            return True
+            # 先开启写事务，保证校验、读取起始id与插入在同一事务内
+            if own_transaction:
+                self.cursor.execute('BEGIN IMMEDIATE')
+            elif candidates:
+                self.cursor.execute('SAVEPOINT bulk_insert')
+                in_savepoint = True
+                
+            if candidates and check is not None:
+                rejected = check(candidates)
+                for index, record, _ in candidates:
+                    if index in rejected:
+                        failures.append({'index': index, 'student_name': record.student_name, 'error': rejected[index]})
+                candidates = [candidate for candidate in candidates if candidate[0] not in rejected]
+                
+            if candidates:
+                rows = [row for _, _, row in candidates]
+                first_id = self._next_autoincrement_id(table)
+                self.cursor.execute('SAVEPOINT bulk_insert_rows')
+                try:
+                    self.cursor.executemany(insert_sql, rows)
+                    self.cursor.execute('RELEASE bulk_insert_rows')
+                    # AUTOINCREMENT在同一事务中为连续插入的行分配连续的id
+                    if self._next_autoincrement_id(table) == first_id + len(rows):
+                        ids = range(first_id, first_id + len(rows))
+                    else:
+                        self.cursor.execute(f'SELECT id FROM {table} WHERE id >= ? ORDER BY id', (first_id,))
+                        ids = [row['id'] for row in self.cursor.fetchall()]
+                    for record_id, (_, record, _) in zip(ids, candidates):
+                        record.id = record_id
+                    inserted = len(rows)
+                except sqlite3.IntegrityError:
+                    # 批量插入被某一行中断，回滚到保存点撤销已插入的行后逐行插入，只跳过出错的行
+                    self.cursor.execute('ROLLBACK TO bulk_insert_rows')
+                    self.cursor.execute('RELEASE bulk_insert_rows')
+                    for index, record, row in candidates:
+                        try:
+                            self.cursor.execute(insert_sql, row)
+                            record.id = self.cursor.lastrowid
+                            inserted += 1
+                        except sqlite3.IntegrityError as e:
+                            failures.append({'index': index, 'student_name': record.student_name, 'error': str(e)})
+            if own_transaction:
+                self.conn.commit()
+            elif in_savepoint:
+                self.cursor.execute('RELEASE bulk_insert')
         except Exception as e:
-            print(f"批量添加扣分记录失败: {e}")
-            return False
+            if own_transaction:
+                self.conn.rollback()
+            elif in_savepoint:
+                self.cursor.execute('ROLLBACK TO bulk_insert')
+                self.cursor.execute('RELEASE bulk_insert')
+            print(f"批量插入{table}失败: {e}")
+            for index, record, _ in candidates:
+                record.id = None
+                failures.append({'index': index, 'student_name': record.student_name, 'error': str(e)})
+            inserted = 0
+            
+        failures.sort(key=lambda failure: failure['index'])
+        return inserted
+        
+    def _deduction_record_params(self, record: DeductionRecord, student_ids: Dict[str, int]) -> tuple:
+        """校验扣分记录并转换为INSERT参数
+        
+        参数:
+            record: 扣分记录
+            student_ids: _student_ids返回的{姓名: ID}
             
+        记录不完整或学生不存在时抛出ValueError
+        """
+        if not record.student_name:
+            raise ValueError("学生姓名不能为空")
+        if record.student_name not in student_ids:
+            raise ValueError(f"学生不存在: {record.student_name}")
+        if not isinstance(record.points, (int, float)):
+            raise ValueError(f"扣分分值无效: {record.points!r}")
+        if not isinstance(record.date, datetime):
+            raise ValueError(f"扣分日期无效: {record.date!r}")
+        if not isinstance(record.deduction_type, DeductionType):
+            raise ValueError(f"扣分类型无效: {record.deduction_type!r}")
+            
+        return (
+            student_ids[record.student_name],
+            record.points,
+            record.violation_behavior,
+            record.treatment_measures,
+            date_to_day(record.date),
+            record.deduction_type.value,
+            record.violation_type.value if record.violation_type else None,
+            record.reason,
+            record.non_violation_type
+        )
+        
+    def _next_autoincrement_id(self, table: str) -> int:
+        """获取AUTOINCREMENT表下一条插入记录将得到的id"""
+        self.cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,))
+        row = self.cursor.fetchone()
+        seq = row['seq'] if row else 0
+        self.cursor.execute(f'SELECT COALESCE(MAX(id), 0) AS max_id FROM {table}')
+        return max(seq, self.cursor.fetchone()['max_id']) + 1
+        
     def get_deduction_records(self, student_name: str) -> List[DeductionRecord]:
-        """获取指定学生的扣分记录"""
-        self.cursor.execute(
-            'SELECT * FROM deduction_records WHERE student_name = ? ORDER BY date DESC',
-            (student_name,)
+        """获取指定学生的扣分记录，学生不存在时返回空列表"""
+        student = self.get_student(student_name)
+        return self.get_deduction_records_by_student_id(student.id) if student else []
+        
+    def get_deduction_records_by_student_id(self, student_id: int) -> List[DeductionRecord]:
+        """获取指定学生ID的扣分记录"""
+        return self._fetch_records(
+            DeductionRecord, '扣分',
+            f'SELECT {self._record_columns(DeductionRecord)} FROM deduction_records WHERE student_id = ? ORDER BY date DESC',
+            (student_id,)
         )
-        rows = self.cursor.fetchall()
-        return [DeductionRecord.from_dict(dict(row)) for row in rows]
         
+    @invalidates('deduction_records', 'compensation_records')
     def update_deduction_record_points_and_treatment(self, record_id: int, new_points: float, treatment_measures: str, compensation_record: CompensationRecord = None) -> bool:
         """更新扣分记录的扣分值和处理措施
         
@@ -413,6 +1475,7 @@ class Database:
             return False
         
     # 补偿记录相关方法
+    @invalidates('compensation_records')
     def add_compensation_record(self, record: CompensationRecord) -> bool:
         """添加补偿记录"""
         try:
@@ -439,21 +1502,23 @@ class Database:
             
     def get_compensation_records(self, deduction_record_id: int) -> List[CompensationRecord]:
         """获取指定扣分记录的补偿记录"""
-        self.cursor.execute(
-            'SELECT * FROM compensation_records WHERE deduction_record_id = ? ORDER BY date DESC',
+        return self._fetch_records(
+            CompensationRecord, '补偿',
+            f'''
+            SELECT {self._record_columns(CompensationRecord)} FROM compensation_records
+            WHERE deduction_record_id = ? ORDER BY date DESC
+            ''',
             (deduction_record_id,)
         )
-        rows = self.cursor.fetchall()
-        return [CompensationRecord.from_dict(dict(row)) for row in rows]
         
     def get_deduction_record_modifications(self, deduction_record_id: int) -> List[Dict[str, Any]]:
         """获取扣分记录的修改历史"""
         # 获取扣分记录
-        self.cursor.execute(
+        self.read_cursor.execute(
             'SELECT * FROM deduction_records WHERE id = ?',
             (deduction_record_id,)
         )
-        deduction_record = self.cursor.fetchone()
+        deduction_record = self.read_cursor.fetchone()
         if not deduction_record:
             return []
             
@@ -474,20 +1539,25 @@ class Database:
         return modifications
         
     def get_student_compensation_records(self, student_name: str) -> List[CompensationRecord]:
-        """获取指定学生的所有补偿记录"""
-        self.cursor.execute(
-            '''
-            SELECT c.* FROM compensation_records c
+        """获取指定学生的所有补偿记录，学生不存在时返回空列表"""
+        student = self.get_student(student_name)
+        return self.get_compensation_records_by_student_id(student.id) if student else []
+        
+    def get_compensation_records_by_student_id(self, student_id: int) -> List[CompensationRecord]:
+        """获取指定学生ID的所有补偿记录"""
+        return self._fetch_records(
+            CompensationRecord, '补偿',
+            f'''
+            SELECT {self._record_columns(CompensationRecord, 'c')} FROM compensation_records c
             JOIN deduction_records d ON c.deduction_record_id = d.id
-            WHERE d.student_name = ?
+            WHERE d.student_id = ?
             ORDER BY c.date DESC
             ''',
-            (student_name,)
+            (student_id,)
         )
-        rows = self.cursor.fetchall()
-        return [CompensationRecord.from_dict(dict(row)) for row in rows]
         
     # 小组相关方法
+    @cached_query('groups', 'student_groups', 'addition_records')
     def get_group_ranking(self) -> List[Dict[str, Any]]:
         """获取小组排名，基于小组成员个人加分的总和
         
@@ -495,51 +1565,15 @@ class Database:
             按总分降序排序的小组列表，每个小组包含:
             - id: 小组ID
             - name: 小组名称
+            - description: 小组描述
+            - member_count: 成员数
             - total_points: 小组总分(成员个人加分总和)
         """
-        # 获取所有小组
-        self.cursor.execute('SELECT * FROM groups')
-        groups = [dict(row) for row in self.cursor.fetchall()]
-        
-        group_ranking = []
-        
-        for group in groups:
-            # 获取小组成员
-            self.cursor.execute(
-                '''
-                SELECT student_name FROM student_groups 
-                WHERE group_id = ?
-                ''',
-                (group['id'],)
-            )
-            members = [row['student_name'] for row in self.cursor.fetchall()]
-            
-            total_points = 0.0
-            
-            # 计算每个成员的加分总和
-            for member in members:
-                self.cursor.execute(
-                    '''
-                    SELECT COALESCE(SUM(points), 0) as sum_points 
-                    FROM addition_records 
-                    WHERE student_name = ?
-                    ''',
-                    (member,)
-                )
-                result = self.cursor.fetchone()
-                total_points += result['sum_points']
-            
-            group_ranking.append({
-                'id': group['id'],
-                'name': group['name'],
-                'total_points': total_points
-            })
-        
-        # 按总分降序排序
-        group_ranking.sort(key=lambda x: x['total_points'], reverse=True)
-        
-        return group_ranking
+        return self._query_group_ranking(
+            'SELECT student_id, addition_total AS sum_points FROM student_score_summary'
+        )
         
+    @cached_query('groups', 'student_groups', 'addition_records')
     def get_group_ranking_by_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """获取指定时间段内的小组排名，基于小组成员在该时间段内的个人加分总和
         
@@ -547,77 +1581,65 @@ class Database:
             start_date: 开始日期 (格式: 'YYYY-MM-DD')，包含当天
             end_date: 结束日期 (格式: 'YYYY-MM-DD')，包含当天
             
-        返回:
-            按总分降序排序的小组列表，每个小组包含:
-            - id: 小组ID
-            - name: 小组名称
-            - total_points: 小组在指定时间段内的总分(成员个人加分总和)
-        """
-        # 获取所有小组
-        self.cursor.execute('SELECT * FROM groups')
-        groups = [dict(row) for row in self.cursor.fetchall()]
-        
-        group_ranking = []
-        
-        for group in groups:
-            # 获取小组成员
-            self.cursor.execute(
-                '''
-                SELECT student_name FROM student_groups 
-                WHERE group_id = ?
-                ''',
-                (group['id'],)
-            )
-            members = [row['student_name'] for row in self.cursor.fetchall()]
-            
-            total_points = 0.0
-            
-            # 计算每个成员在指定时间段内的加分总和
-            for member in members:
-                self.cursor.execute(
-                    '''
-                    SELECT COALESCE(SUM(points), 0) as sum_points 
-                    FROM addition_records 
-                    WHERE student_name = ?
-                    AND start_date <= ?
-                    AND end_date >= ?
-                    ''',
-                    (member, end_date, start_date)
-                )
-                result = self.cursor.fetchone()
-                total_points += result['sum_points']
-            
-            group_ranking.append({
-                'id': group['id'],
-                'name': group['name'],
-                'total_points': total_points
-            })
+        返回:
+            按总分降序排序的小组列表，每个小组包含:
+            - id: 小组ID
+            - name: 小组名称
+            - description: 小组描述
+            - member_count: 成员数
+            - total_points: 小组在指定时间段内的总分(成员个人加分总和)
+        """
+        # GROUP BY +student_id 使查询按idx_addition_period做时间范围查找，
+        # 避免SQLite为省去分组排序而顺序扫描idx_addition_student_period全部条目
+        return self._query_group_ranking(
+            '''
+            SELECT student_id, SUM(points) AS sum_points
+            FROM addition_records
+            WHERE start_date <= ? AND end_date >= ?
+            GROUP BY +student_id
+            ''',
+            (date_to_day(end_date), date_to_day(start_date))
+        )
         
-        # 按总分降序排序
-        group_ranking.sort(key=lambda x: x['total_points'], reverse=True)
+    def _query_group_ranking(self, points_source: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """在一条语句中联结小组、成员和成员加分并聚合出小组排名
         
-        return group_ranking
+        参数:
+            points_source: 返回(student_id, sum_points)的子查询
+            params: points_source中的参数
+        """
+        self.read_cursor.execute(f'''
+            SELECT
+                g.id,
+                g.name,
+                g.description,
+                COUNT(sg.id) AS member_count,
+                COALESCE(SUM(a.sum_points), 0.0) AS total_points
+            FROM groups g
+            LEFT JOIN student_groups sg ON sg.group_id = g.id
+            LEFT JOIN ({points_source}) a ON a.student_id = sg.student_id
+            GROUP BY g.id
+            ORDER BY total_points DESC, g.id
+        ''', params)
+        return [dict(row) for row in self.read_cursor.fetchall()]
         
     # 加分记录相关方法
+    @invalidates('addition_records')
     def add_addition_record(self, record: AdditionRecord) -> bool:
         """添加加分记录"""
         try:
-            # 检查是否有重叠的时间段
+            student_id = self._student_id(record.student_name)
+            # 检查是否有重叠的时间段: 两个区间重叠当且仅当各自的开始都不晚于对方的结束
             self.cursor.execute(
                 '''
-                SELECT * FROM addition_records 
-                WHERE student_name = ? AND 
-                (
-                    (start_date <= ? AND end_date >= ?) OR
-                    (start_date <= ? AND end_date >= ?) OR
-                    (start_date >= ? AND end_date <= ?)
-                )
+                SELECT 1 FROM addition_records 
+                WHERE student_id = ? AND start_date <= ? AND end_date >= ?
+                LIMIT 1
                 ''',
                 (
-                    record.student_name,
-                    record.end_date.isoformat(), record.start_date.isoformat(),
-                    record.start_date.isoformat(), record.start_date.isoformat(),
-                    record.start_date.isoformat(), record.end_date.isoformat()
+                    student_id,
+                    date_to_day(record.end_date),
+                    date_to_day(record.start_date)
                 )
             )
             if self.cursor.fetchone():
@@ -626,15 +1648,15 @@ class Database:
             self.cursor.execute(
                 '''
                 INSERT INTO addition_records 
-                (student_name, points, reason, start_date, end_date) 
+                (student_id, points, reason, start_date, end_date) 
                 VALUES (?, ?, ?, ?, ?)
                 ''',
                 (
-                    record.student_name,
+                    student_id,
                     record.points,
                     record.reason,
-                    record.start_date.isoformat(),
-                    record.end_date.isoformat()
+                    date_to_day(record.start_date),
+                    date_to_day(record.end_date)
                 )
             )
             record.id = self.cursor.lastrowid
@@ -646,25 +1668,130 @@ class Database:
             print(f"添加加分记录失败: {e}")
             return False
             
+    @invalidates('addition_records')
+    def add_batch_addition_records(self, records: List[AdditionRecord]) -> Dict[str, Any]:
+        """在一个事务中批量添加加分记录
+        
+        所有记录与已有加分记录的时间段重叠检查合并为一次查询完成，
+        批次内同一学生的时间段也不能互相重叠；没有冲突的记录用
+        executemany一次插入并只提交一次，插入成功的记录会回填id。
+        
+        参数:
+            records: AdditionRecord对象列表
+            
+        返回:
+            字典，包含:
+            - inserted: 成功插入的记录数
+            - failures: 失败记录列表，每项包含index(在records中的位置)、
+              student_name和error(失败原因)
+        """
+        failures = []
+        candidates = []
+        accepted_periods = {}  # 批次内已接受的时间段，按学生分组
+        student_ids = self._student_ids()
+        
+        for index, record in enumerate(records):
+            try:
+                if not record.student_name:
+                    raise ValueError("学生姓名不能为空")
+                if record.student_name not in student_ids:
+                    raise ValueError(f"学生不存在: {record.student_name}")
+                if not isinstance(record.points, (int, float)):
+                    raise ValueError(f"加分分值无效: {record.points!r}")
+                if record.start_date > record.end_date:
+                    raise ValueError("开始日期不能晚于结束日期")
+                for start_date, end_date in accepted_periods.get(record.student_name, []):
+                    if start_date <= record.end_date and end_date >= record.start_date:
+                        raise ValueError("该时间段与本批次中的其他加分记录重叠")
+            except (AttributeError, TypeError, ValueError) as e:
+                failures.append({
+                    'index': index,
+                    'student_name': getattr(record, 'student_name', None),
+                    'error': str(e)
+                })
+                continue
+                
+            accepted_periods.setdefault(record.student_name, []).append((record.start_date, record.end_date))
+            candidates.append((index, record, (
+                student_ids[record.student_name],
+                record.points,
+                record.reason,
+                date_to_day(record.start_date),
+                date_to_day(record.end_date)
+            )))
+            
+        inserted = self._bulk_insert(
+            'addition_records',
+            '''
+            INSERT INTO addition_records 
+            (student_id, points, reason, start_date, end_date) 
+            VALUES (?, ?, ?, ?, ?)
+            ''',
+            candidates,
+            failures,
+            check=self._find_overlapping_additions
+        )
+        return {'inserted': inserted, 'failures': failures}
+        
+    def _find_overlapping_additions(self, candidates: list) -> Dict[int, str]:
+        """一次查询找出与已有加分记录时间段重叠的候选记录
+        
+        参数:
+            candidates: (位置, 记录对象, INSERT参数)元组列表
+            
+        返回:
+            {位置: 失败原因}
+        """
+        overlapping = {}
+        chunk_size = 1000  # 每行4个参数，控制在SQLite参数数量上限之内
+        for offset in range(0, len(candidates), chunk_size):
+            chunk = candidates[offset:offset + chunk_size]
+            params = []
+            for index, _, (student_id, _, _, start_date, end_date) in chunk:
+                params.extend((index, student_id, start_date, end_date))
+            self.cursor.execute(f'''
+                WITH proposed(idx, student_id, start_date, end_date) AS (
+                    VALUES {', '.join(['(?, ?, ?, ?)'] * len(chunk))}
+                )
+                SELECT DISTINCT p.idx
+                FROM proposed p
+                JOIN addition_records a ON a.student_id = p.student_id
+                WHERE a.start_date <= p.end_date AND a.end_date >= p.start_date
+            ''', params)
+            for row in self.cursor.fetchall():
+                overlapping[row['idx']] = "该时间段内已存在加分记录"
+        return overlapping
+        
     def get_addition_records(self, student_name: str) -> List[AdditionRecord]:
         """获取指定学生的加分记录
         
         参数:
             student_name: 学生姓名
             
+        返回:
+            按日期降序排序的AdditionRecord对象列表，学生不存在时返回空列表
+        """
+        student = self.get_student(student_name)
+        return self.get_addition_records_by_student_id(student.id) if student else []
+        
+    def get_addition_records_by_student_id(self, student_id: int) -> List[AdditionRecord]:
+        """获取指定学生ID的加分记录
+        
+        参数:
+            student_id: 学生ID
+            
         返回:
             按日期降序排序的AdditionRecord对象列表
         """
-        self.cursor.execute(
-            '''
-            SELECT * FROM addition_records 
-            WHERE student_name = ? 
+        return self._fetch_records(
+            AdditionRecord, '加分',
+            f'''
+            SELECT {self._record_columns(AdditionRecord)} FROM addition_records 
+            WHERE student_id = ? 
             ORDER BY start_date DESC
             ''',
-            (student_name,)
+            (student_id,)
         )
-        rows = self.cursor.fetchall()
-        return [AdditionRecord.from_dict(dict(row)) for row in rows]
     
     def count_violations_by_date_range(self, student_name: Optional[str], start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """统计指定日期范围内的违规次数
@@ -683,25 +1810,25 @@ class Database:
         results = []
         
         # 构建查询条件
-        query = '''
-            SELECT student_name, COUNT(*) as violation_count
+        query = f'''
+            SELECT {self.STUDENT_NAME_COLUMN}, COUNT(*) as violation_count
             FROM deduction_records
             WHERE date BETWEEN ? AND ?
             AND deduction_type = 1  -- 违规扣分类型
         '''
-        params = [start_date, end_date]
+        params = [date_to_day(start_date), date_to_day(end_date)]
         
         # 如果指定了学生，添加学生筛选条件
         if student_name:
-            query += ' AND student_name = ?'
+            query += ' AND student_id = (SELECT id FROM students WHERE name = ?)'
             params.append(student_name)
             
         # 按学生分组
-        query += ' GROUP BY student_name'
+        query += ' GROUP BY student_id ORDER BY student_name'
         
         # 执行查询
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
+        self.read_cursor.execute(query, params)
+        rows = self.read_cursor.fetchall()
         
         # 格式化时间段描述
         period = f"{start_date} 至 {end_date}"
@@ -717,6 +1844,7 @@ class Database:
         return results
         
     # 小组成员管理方法
+    @invalidates('student_groups')
     def add_student_to_group(self, student_id: int, group_id: int) -> bool:
         """将学生添加到小组
         
@@ -731,26 +1859,23 @@ class Database:
             一个学生只能加入一个小组，如果学生已经在其他小组中，将返回False
         """
         try:
-            # 获取学生姓名
-            self.cursor.execute('SELECT name FROM students WHERE id = ?', (student_id,))
-            student = self.cursor.fetchone()
-            if not student:
+            # 检查学生是否存在
+            self.cursor.execute('SELECT 1 FROM students WHERE id = ?', (student_id,))
+            if not self.cursor.fetchone():
                 return False
                 
-            student_name = student['name']
-            
             # 检查学生是否已在该小组
             self.cursor.execute(
-                'SELECT * FROM student_groups WHERE student_name = ? AND group_id = ?',
-                (student_name, group_id)
+                'SELECT * FROM student_groups WHERE student_id = ? AND group_id = ?',
+                (student_id, group_id)
             )
             if self.cursor.fetchone():
                 return False  # 学生已在小组中
                 
             # 检查学生是否已在其他小组中
             self.cursor.execute(
-                'SELECT * FROM student_groups WHERE student_name = ?',
-                (student_name,)
+                'SELECT * FROM student_groups WHERE student_id = ?',
+                (student_id,)
             )
             if self.cursor.fetchone():
                 return False  # 学生已在其他小组中
@@ -758,8 +1883,8 @@ class Database:
             # 添加学生到小组
             current_date = datetime.now().strftime('%Y-%m-%d')
             self.cursor.execute(
-                'INSERT INTO student_groups (student_name, group_id, join_date) VALUES (?, ?, ?)',
-                (student_name, group_id, current_date)
+                'INSERT INTO student_groups (student_id, group_id, join_date) VALUES (?, ?, ?)',
+                (student_id, group_id, current_date)
             )
             self.conn.commit()
             return True
@@ -767,6 +1892,7 @@ class Database:
             print(f"添加学生到小组失败: {e}")
             return False
             
+    @invalidates('student_groups')
     def remove_student_from_group(self, group_id: int, student_id: int) -> bool:
         """从小组中移除学生
         
@@ -778,18 +1904,10 @@ class Database:
             bool: 操作是否成功
         """
         try:
-            # 获取学生姓名
-            self.cursor.execute('SELECT name FROM students WHERE id = ?', (student_id,))
-            student = self.cursor.fetchone()
-            if not student:
-                return False
-                
-            student_name = student['name']
-            
             # 从小组中移除学生
             self.cursor.execute(
-                'DELETE FROM student_groups WHERE student_name = ? AND group_id = ?',
-                (student_name, group_id)
+                'DELETE FROM student_groups WHERE student_id = ? AND group_id = ?',
+                (student_id, group_id)
             )
             self.conn.commit()
             return True
@@ -797,6 +1915,7 @@ class Database:
             print(f"从小组中移除学生失败: {e}")
             return False
             
+    @cached_query('groups')
     def get_groups(self) -> List[Dict[str, Any]]:
         """获取所有小组列表
         
@@ -807,9 +1926,10 @@ class Database:
             - description: 小组描述
             - created_at: 创建时间
         """
-        self.cursor.execute('SELECT * FROM groups ORDER BY name')
-        return [dict(row) for row in self.cursor.fetchall()]
+        self.read_cursor.execute('SELECT * FROM groups ORDER BY name')
+        return [dict(row) for row in self.read_cursor.fetchall()]
         
+    @cached_query('locked_time_periods')
     def get_locked_time_periods(self) -> List[Dict[str, Any]]:
         """获取所有锁定时间段
         
@@ -821,9 +1941,10 @@ class Database:
             - end_date: 结束日期
             - created_at: 创建时间
         """
-        self.cursor.execute('SELECT * FROM locked_time_periods ORDER BY start_date DESC')
-        return [dict(row) for row in self.cursor.fetchall()]
+        self.read_cursor.execute('SELECT * FROM locked_time_periods ORDER BY start_date DESC')
+        return [dict(row) for row in self.read_cursor.fetchall()]
         
+    @cached_query('locked_time_periods')
     def get_locked_date_ranges(self) -> List[Dict[str, Any]]:
         """获取所有锁定的日期范围
         
@@ -832,9 +1953,10 @@ class Database:
             - start_date: 开始日期
             - end_date: 结束日期
         """
-        self.cursor.execute('SELECT start_date, end_date FROM locked_time_periods ORDER BY start_date DESC')
-        return [dict(row) for row in self.cursor.fetchall()]
+        self.read_cursor.execute('SELECT start_date, end_date FROM locked_time_periods ORDER BY start_date DESC')
+        return [dict(row) for row in self.read_cursor.fetchall()]
     
+    @invalidates('locked_time_periods')
     def add_locked_time_period(self, name: str, start_date: str, end_date: str) -> bool:
         """添加锁定时间段
         
@@ -858,6 +1980,7 @@ class Database:
             print(f"添加锁定时间段失败: {e}")
             return False
     
+    @invalidates('locked_time_periods')
     def delete_locked_time_period(self, period_id: int) -> bool:
         """删除锁定时间段
         
@@ -894,6 +2017,7 @@ class Database:
                 
         return False
         
+    @invalidates('groups')
     def create_group(self, name: str, description: str = None) -> bool:
         """创建新的小组
         
@@ -916,6 +2040,7 @@ class Database:
             print(f"创建小组失败: {e}")
             return False
         
+    @cached_query('addition_records')
     def get_addition_time_periods(self) -> List[Dict[str, Any]]:
         """从加分记录中提取时间段
         
@@ -926,7 +2051,7 @@ class Database:
             - start_date: 开始日期
             - end_date: 结束日期
         """
-        self.cursor.execute('''
+        self.read_cursor.execute('''
             SELECT 
                 id,
                 COALESCE(reason, '未命名时间段') as name,
@@ -936,7 +2061,11 @@ class Database:
             GROUP BY start_date, end_date
             ORDER BY start_date DESC
         ''')
-        return [dict(row) for row in self.cursor.fetchall()]
+        periods = [dict(row) for row in self.read_cursor.fetchall()]
+        for period in periods:
+            period['start_date'] = day_to_str(period['start_date'])
+            period['end_date'] = day_to_str(period['end_date'])
+        return periods
         
     def get_group_addition_records(self, group_id: int, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """获取小组在指定时间段内的加分记录
@@ -954,29 +2083,29 @@ class Database:
             - date: 加分日期
         """
         # 获取小组成员
-        self.cursor.execute('SELECT student_name FROM student_groups WHERE group_id = ?', (group_id,))
-        members = [row['student_name'] for row in self.cursor.fetchall()]
+        self.read_cursor.execute('SELECT student_id FROM student_groups WHERE group_id = ?', (group_id,))
+        members = [row['student_id'] for row in self.read_cursor.fetchall()]
         
         if not members:
             return []
             
         # 获取小组成员的加分记录
         # 修改查询条件，确保包含开始日期和结束日期当天的记录
-        self.cursor.execute('''
+        self.read_cursor.execute('''
             SELECT 
                 id,
                 points,
                 reason,
                 start_date as date
             FROM addition_records
-            WHERE student_name IN ({})
+            WHERE student_id IN ({})
             AND start_date <= ?
             AND end_date >= ?
             ORDER BY start_date DESC
         '''.format(','.join(['?'] * len(members))), 
-        members + [end_date, start_date])
+        members + [date_to_day(end_date), date_to_day(start_date)])
         
-        return [dict(row) for row in self.cursor.fetchall()]
+        return self._dated_rows()
 
     def get_student_addition_records(self, student_id: int, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """获取学生在指定时间段内的加分记录
@@ -993,30 +2122,30 @@ class Database:
             - reason: 加分原因
             - date: 加分日期
         """
-        # 获取学生姓名
-        self.cursor.execute('SELECT name FROM students WHERE id = ?', (student_id,))
-        student = self.cursor.fetchone()
-        if not student:
-            return []
-            
-        student_name = student['name']
-        
         # 获取学生的加分记录
-        self.cursor.execute('''
+        self.read_cursor.execute('''
             SELECT 
                 id,
                 points,
                 reason,
                 start_date as date
             FROM addition_records
-            WHERE student_name = ?
+            WHERE student_id = ?
             AND start_date <= ?
             AND end_date >= ?
             ORDER BY start_date DESC
-        ''', (student_name, end_date, start_date))
+        ''', (student_id, date_to_day(end_date), date_to_day(start_date)))
+        
+        return self._dated_rows()
         
-        return [dict(row) for row in self.cursor.fetchall()]
+    def _dated_rows(self) -> List[Dict[str, Any]]:
+        """读取查询结果并将date列的天数转换为'YYYY-MM-DD'格式的字符串"""
+        rows = [dict(row) for row in self.read_cursor.fetchall()]
+        for row in rows:
+            row['date'] = day_to_str(row['date'])
+        return rows
         
+    @cached_query('student_groups', 'students')
     def get_group_members(self, group_id: int) -> List[Dict[str, Any]]:
         """获取小组成员列表
         
@@ -1026,28 +2155,30 @@ class Database:
         返回:
             包含小组成员信息的列表，每个成员是一个字典，包含:
             - student_name: 学生姓名
+            - student_id: 学生ID
             - join_date: 加入日期
         """
-        self.cursor.execute('''
+        self.read_cursor.execute('''
             SELECT 
-                sg.student_name,
-                s.id as student_id,
+                s.name as student_name,
+                sg.student_id,
                 sg.join_date
             FROM student_groups sg
-            JOIN students s ON sg.student_name = s.name
+            JOIN students s ON s.id = sg.student_id
             WHERE sg.group_id = ?
-            ORDER BY sg.student_name
+            ORDER BY s.name
         ''', (group_id,))
         
-        return [dict(row) for row in self.cursor.fetchall()]
+        return [dict(row) for row in self.read_cursor.fetchall()]
     
+    @cached_query('deduction_records')
     def get_non_violation_types(self) -> List[str]:
         """获取所有非违规类型列表
         
         返回:
             包含所有不同非违规类型的字符串列表
         """
-        self.cursor.execute('''
+        self.read_cursor.execute('''
             SELECT DISTINCT non_violation_type 
             FROM deduction_records 
             WHERE non_violation_type IS NOT NULL 
@@ -1056,7 +2187,7 @@ class Database:
         ''')
         
         # 提取结果并过滤掉None值
-        types = [row['non_violation_type'] for row in self.cursor.fetchall() if row['non_violation_type']]
+        types = [row['non_violation_type'] for row in self.read_cursor.fetchall() if row['non_violation_type']]
         return types
     
     def search_deduction_records(self, student_name: Optional[str] = None, 
@@ -1067,7 +2198,8 @@ class Database:
                                 non_violation_type: Optional[str] = None,
                                 min_points: Optional[float] = None,
                                 max_points: Optional[float] = None,
-                                name: Optional[str] = None) -> List[DeductionRecord]:
+                                name: Optional[str] = None,
+                                text: Optional[str] = None) -> List[DeductionRecord]:
         """搜索扣分记录
         
         参数:
@@ -1080,11 +2212,97 @@ class Database:
             min_points: 最小分数，如果为None则不限制最小分数
             max_points: 最大分数，如果为None则不限制最大分数
             name: 学生姓名的别名，与student_name参数功能相同
+            text: 关键词，在违规行为、扣分原因和处理措施中查找，多个词以空格分隔，如果为None则不限制
+            
+        返回:
+            符合条件的扣分记录列表，按日期降序排列
+        """
+        records = []
+        for batch in self.iter_deduction_records(
+                student_name=student_name, start_date=start_date, end_date=end_date,
+                deduction_type=deduction_type, violation_type=violation_type,
+                non_violation_type=non_violation_type, min_points=min_points,
+                max_points=max_points, name=name, text=text):
+            records.extend(batch)
+        return records
+    
+    def iter_deduction_records(self, batch_size: int = SEARCH_BATCH_SIZE, **filters) -> Iterator[List[DeductionRecord]]:
+        """分批搜索扣分记录，每批最多batch_size条，内存占用与结果总数无关
+        
+        参数:
+            batch_size: 每批记录数
+            filters: 查询条件，与search_deduction_records的参数相同
+            
+        返回:
+            按日期降序逐批产生扣分记录列表的生成器
+        """
+        where, params = self._deduction_search_conditions(**filters)
+        # 使用单独的游标，遍历期间仍可在read_cursor上执行其他查询
+        cursor = self._record_cursor(DeductionRecord, '扣分')
+        try:
+            cursor.execute(
+                f'SELECT {self._record_columns(DeductionRecord)} FROM deduction_records {where} '
+                'ORDER BY date DESC, id DESC',
+                params
+            )
+            while True:
+                records = cursor.fetchmany(batch_size)
+                if not records:
+                    break
+                yield [record for record in records if record is not None]
+        finally:
+            cursor.close()
+            
+    def search_deduction_records_page(self, after: Optional[Tuple[int, int]] = None,
+                                      limit: int = SEARCH_PAGE_SIZE, **filters) -> Dict[str, Any]:
+        """按页搜索扣分记录，以(日期, ID)为游标，翻页耗时与页码和结果总数无关
+        
+        参数:
+            after: 上一页返回的next_cursor，为None时返回第一页
+            limit: 每页记录数
+            filters: 查询条件，与search_deduction_records的参数相同
             
         返回:
-            符合条件的扣分记录列表
+            包含以下字段的字典:
+            - records: 本页的扣分记录列表，按日期降序排列
+            - next_cursor: 下一页的游标，没有更多记录时为None
         """
-        query = 'SELECT * FROM deduction_records WHERE 1=1'
+        where, params = self._deduction_search_conditions(**filters)
+        if after is not None:
+            # 等价于 (date, id) < (?, ?)，拆开写以便按idx_deduction_date做范围查找
+            where += ' AND date <= ? AND (date < ? OR id < ?)'
+            params += [after[0], after[0], after[1]]
+        # 多取一条，用于判断是否还有下一页
+        records = self._fetch_records(
+            DeductionRecord, '扣分',
+            f'SELECT {self._record_columns(DeductionRecord)} FROM deduction_records {where} '
+            'ORDER BY date DESC, id DESC LIMIT ?',
+            params + [limit + 1], skip_invalid=False
+        )
+        
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            last = next((record for record in reversed(records) if record is not None), None)
+            if last is not None:
+                next_cursor = (date_to_day(last.date), last.id)
+        return {
+            'records': [record for record in records if record is not None],
+            'next_cursor': next_cursor
+        }
+        
+    def _deduction_search_conditions(self, student_name: Optional[str] = None, 
+                                     start_date: Optional[str] = None, 
+                                     end_date: Optional[str] = None,
+                                     deduction_type: Optional[int] = None,
+                                     violation_type: Optional[int] = None,
+                                     non_violation_type: Optional[str] = None,
+                                     min_points: Optional[float] = None,
+                                     max_points: Optional[float] = None,
+                                     name: Optional[str] = None,
+                                     text: Optional[str] = None) -> Tuple[str, list]:
+        """构造搜索扣分记录的WHERE子句和参数，参数含义见search_deduction_records"""
+        query = 'WHERE 1=1'
         params = []
         
         # 处理name参数（作为student_name的别名）
@@ -1093,16 +2311,16 @@ class Database:
         
         # 添加查询条件
         if student_name:
-            query += ' AND student_name = ?'
+            query += ' AND student_id = (SELECT id FROM students WHERE name = ?)'
             params.append(student_name)
             
         if start_date:
             query += ' AND date >= ?'
-            params.append(start_date)
+            params.append(date_to_day(start_date))
             
         if end_date:
             query += ' AND date <= ?'
-            params.append(end_date)
+            params.append(date_to_day(end_date))
             
         if deduction_type is not None:
             query += ' AND deduction_type = ?'
@@ -1124,25 +2342,166 @@ class Database:
             query += ' AND points <= ?'
             params.append(max_points)
             
-        # 按日期降序排序
-        query += ' ORDER BY date DESC'
+        if text:
+            text_query, text_params = self._text_search_condition('deduction_records', text)
+            query += text_query
+            params += text_params
+            
+        return query, params
         
-        # 执行查询
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
+    def _record_columns(self, record_class, alias: str = '') -> str:
+        """按record_class.COLUMNS的顺序构造SELECT列表，供from_row按位置读取
         
-        # 转换为DeductionRecord对象列表
-        records = []
-        for row in rows:
-            row_dict = dict(row)
+        参数:
+            record_class: 模型类，需提供COLUMNS和from_row
+            alias: 查询中记录表的别名
+            
+        student_name列换成按student_id取学生姓名的表达式
+        """
+        prefix = f'{alias}.' if alias else ''
+        return ', '.join(
+            self.STUDENT_NAME_COLUMN if column == 'student_name' else prefix + column
+            for column in record_class.COLUMNS
+        )
+        
+    def _record_cursor(self, record_class, label: str) -> sqlite3.Cursor:
+        """创建只读连接上的游标，查询结果行直接由record_class.from_row构造为对象
+        
+        不经过sqlite3.Row和字典；无法转换的行打印错误并返回None
+        
+        参数:
+            record_class: 模型类，查询须按其COLUMNS的顺序选择列
+            label: 出错时提示的记录类型，如'扣分'
+        """
+        from_row = record_class.from_row
+        
+        def row_factory(cursor, row):
             try:
-                record = DeductionRecord.from_dict(row_dict)
-                records.append(record)
+                return from_row(row)
             except Exception as e:
-                print(f"转换扣分记录时出错: {str(e)}, 记录: {row_dict}")
+                print(f"转换{label}记录时出错: {str(e)}, 记录: {row}")
+                return None
                 
+        cursor = self.read_conn.cursor()
+        cursor.row_factory = row_factory
+        return cursor
+        
+    def _fetch_records(self, record_class, label: str, sql: str, params=(), skip_invalid: bool = True) -> list:
+        """执行查询并返回全部记录对象，参数含义见_record_cursor
+        
+        skip_invalid为False时无法转换的行以None保留在结果中
+        """
+        cursor = self._record_cursor(record_class, label)
+        try:
+            cursor.execute(sql, params)
+            records = cursor.fetchall()
+        finally:
+            cursor.close()
+        if skip_invalid:
+            records = [record for record in records if record is not None]
         return records
     
+    def _fetch_batch(self, sql: str, params, schema) -> RecordBatch:
+        """在只读连接上执行查询，按列读入RecordBatch，schema含义见RecordBatch.from_cursor"""
+        cursor = self.read_conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return RecordBatch.from_cursor(cursor, schema)
+        finally:
+            cursor.close()
+            
+    def _add_student_names(self, batch: RecordBatch) -> RecordBatch:
+        """按student_id列为RecordBatch加入字典编码的student_name列
+        
+        姓名在读取后按ID查出，比在查询中逐行用子查询取姓名快得多
+        """
+        index = {}  # 学生ID -> 编号
+        batch.columns['student_name'] = array(
+            'i', [index.setdefault(student_id, len(index)) for student_id in batch.column('student_id')]
+        )
+        if len(index) <= self.BATCH_NAME_LOOKUP_LIMIT:
+            self.read_cursor.execute(
+                f"SELECT id, name FROM students WHERE id IN ({','.join(['?'] * len(index))})", list(index)
+            )
+        else:
+            self.read_cursor.execute('SELECT id, name FROM students')
+        names = dict(self.read_cursor.fetchall())
+        batch.dictionaries['student_name'] = [names[student_id] for student_id in index]
+        return batch
+            
+    def _batch_conditions(self, conditions: List[str], params: list,
+                          student_ids: Optional[List[int]]) -> str:
+        """在条件列表中加入学生ID筛选，返回WHERE子句"""
+        if student_ids is not None:
+            conditions.append(f"student_id IN ({','.join(['?'] * len(student_ids))})")
+            params.extend(student_ids)
+        return f"WHERE {' AND '.join(conditions)}" if conditions else ''
+            
+    def get_deduction_batch(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                            student_ids: Optional[List[int]] = None) -> RecordBatch:
+        """按列读取扣分记录，供排名、统计等只需要少数几列的场合使用
+        
+        参数:
+            start_date: 开始日期 (格式: 'YYYY-MM-DD')，包含当天，None表示不限
+            end_date: 结束日期 (格式: 'YYYY-MM-DD')，包含当天，None表示不限
+            student_ids: 只读取这些学生的记录，None表示全部学生
+            
+        返回:
+            RecordBatch(行的顺序不固定)，包含列:
+            - student_id: 学生ID
+            - student_name: 学生姓名(字典编码)
+            - points: 扣分分值
+            - date: 扣分日期(天数，见models.date_to_day)
+            - deduction_type: 扣分类型(DeductionType的值)
+            - violation_type: 违规类型(ViolationType的值)，非违规扣分为0
+        """
+        conditions, params = [], []
+        if start_date:
+            conditions.append('date >= ?')
+            params.append(date_to_day(start_date))
+        if end_date:
+            conditions.append('date <= ?')
+            params.append(date_to_day(end_date))
+        where = self._batch_conditions(conditions, params, student_ids)
+        return self._add_student_names(self._fetch_batch(f'''
+            SELECT student_id, points, date, deduction_type, COALESCE(violation_type, 0)
+            FROM deduction_records
+            {where}
+        ''', params, (
+            ('student_id', 'i'), ('points', 'f'), ('date', 'i'), ('deduction_type', 'i'), ('violation_type', 'i'),
+        )))
+        
+    def get_addition_batch(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                           student_ids: Optional[List[int]] = None) -> RecordBatch:
+        """按列读取加分记录，参数含义同get_deduction_batch
+        
+        加分时间段与[start_date, end_date]有重叠的记录都会被读取(包含边界当天)
+        
+        返回:
+            RecordBatch(行的顺序不固定)，包含列:
+            - student_id: 学生ID
+            - student_name: 学生姓名(字典编码)
+            - points: 加分分值
+            - start_date: 开始日期(天数)
+            - end_date: 结束日期(天数)
+        """
+        conditions, params = [], []
+        if end_date:
+            conditions.append('start_date <= ?')
+            params.append(date_to_day(end_date))
+        if start_date:
+            conditions.append('end_date >= ?')
+            params.append(date_to_day(start_date))
+        where = self._batch_conditions(conditions, params, student_ids)
+        return self._add_student_names(self._fetch_batch(f'''
+            SELECT student_id, points, start_date, end_date
+            FROM addition_records
+            {where}
+        ''', params, (
+            ('student_id', 'i'), ('points', 'f'), ('start_date', 'i'), ('end_date', 'i'),
+        )))
+    
+    @invalidates('deduction_records', 'compensation_records')
     def clear_deduction_records(self) -> bool:
         """清除所有扣分记录
         
@@ -1150,8 +2509,9 @@ class Database:
             bool: 操作是否成功
         """
         try:
-            self.cursor.execute('DELETE FROM deduction_records')
+            # 补偿记录引用扣分记录，先删除
             self.cursor.execute('DELETE FROM compensation_records')
+            self.cursor.execute('DELETE FROM deduction_records')
             self.conn.commit()
             return True
         except Exception as e:
@@ -1159,6 +2519,7 @@ class Database:
             print(f"清除扣分记录失败: {e}")
             return False
             
+    @invalidates('addition_records')
     def clear_addition_records(self) -> bool:
         """清除所有加分记录
         
@@ -1174,6 +2535,7 @@ class Database:
             print(f"清除加分记录失败: {e}")
             return False
             
+    @invalidates('groups', 'student_groups', 'group_addition_records')
     def clear_group_data(self) -> bool:
         """清除所有小组相关数据
         
@@ -1192,48 +2554,224 @@ class Database:
             self.conn.rollback()
             print(f"清除小组数据失败: {e}")
             return False
-
-    def get_addition_ranking(self) -> List[Dict[str, Any]]:
-        """获取学生加分排名
+            
+    @invalidates('groups', 'student_groups', 'group_addition_records')
+    def delete_group(self, group_id: int) -> bool:
+        """删除小组及其成员关系和小组加分记录
+        
+        参数:
+            group_id: 小组ID
+            
+        返回:
+            bool: 操作是否成功
+        """
+        try:
+            self.cursor.execute('DELETE FROM student_groups WHERE group_id = ?', (group_id,))
+            self.cursor.execute('DELETE FROM group_addition_records WHERE group_id = ?', (group_id,))
+            self.cursor.execute('DELETE FROM groups WHERE id = ?', (group_id,))
+            self.conn.commit()
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            print(f"删除小组失败: {e}")
+            return False
+            
+    @invalidates('students', 'deduction_records', 'compensation_records', 'addition_records',
+                 'groups', 'student_groups', 'group_addition_records', 'locked_time_periods', 'config')
+    def delete_all_data(self) -> bool:
+        """删除所有数据，恢复为新建数据库的状态
+        
+        在一个事务中清空全部数据表并重新添加学生名单，表结构、索引和触发器保持不变，
+        不需要关闭连接或删除数据库文件。
         
         返回:
-            按加分总和降序排序的学生列表，每个学生包含:
-            - name: 学生姓名
-            - addition_points: 加分总和
+            bool: 操作是否成功
         """
-        # 获取所有学生
-        self.cursor.execute('SELECT name FROM students')
-        students = [row['name'] for row in self.cursor.fetchall()]
+        tables = (
+            'student_groups', 'group_addition_records', 'groups', 'compensation_records',
+            'deduction_records', 'addition_records', 'students', 'locked_time_periods',
+            'config', 'student_score_summary',
+        )
+        try:
+            for table in tables:
+                self.cursor.execute(f'DELETE FROM {table}')
+            self.cursor.execute('DELETE FROM sqlite_sequence')
+            if STUDENT_LIST:
+                self.cursor.executemany(
+                    'INSERT INTO students (name) VALUES (?)',
+                    [(student_name,) for student_name in STUDENT_LIST]
+                )
+            self.conn.commit()
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            print(f"删除所有数据失败: {e}")
+            return False
+            
+    def snapshot_dir(self) -> str:
+        """快照的默认保存目录: 数据库文件所在目录下的snapshots目录"""
+        if self.db_path == ':memory:':
+            raise ValueError("内存数据库无法创建快照")
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'snapshots')
         
-        ranking = []
+    def _snapshot_prefix(self) -> str:
+        return Path(self.db_path).stem + '_'
         
-        for student_name in students:
-            # 获取加分总和
-            self.cursor.execute(
-                '''
-                SELECT COALESCE(SUM(points), 0) as sum_points 
-                FROM addition_records 
-                WHERE student_name = ?
-                ''',
-                (student_name,)
-            )
-            addition_points = self.cursor.fetchone()['sum_points']
+    def create_snapshot(self, snapshot_dir: Optional[str] = None,
+                        pages: int = SNAPSHOT_PAGES_PER_STEP, progress=None) -> str:
+        """使用SQLite在线备份创建数据库快照
+        
+        从只读连接逐步复制数据页，每步之间释放读锁，其他连接可以继续写入；
+        复制期间数据库被其他连接修改时备份自动重新开始，得到的总是某一时刻的完整数据。
+        快照先写入临时文件，完成后再改名，不会留下不完整的快照。
+        
+        参数:
+            snapshot_dir: 快照保存目录，默认为snapshot_dir()
+            pages: 每步复制的页数，-1表示一次复制全部
+            progress: 每步完成后调用的函数，参数为(status, remaining, total)
             
-            # 只包含有加分记录的学生
-            if addition_points > 0:
-                ranking.append({
-                    'name': student_name,
-                    'addition_points': addition_points
-                })
+        返回:
+            快照文件路径
+        """
+        snapshot_dir = snapshot_dir or self.snapshot_dir()
+        os.makedirs(snapshot_dir, exist_ok=True)
+        file_name = f"{self._snapshot_prefix()}{datetime.now().strftime(self.SNAPSHOT_TIME_FORMAT)}.db"
+        path = os.path.join(snapshot_dir, file_name)
+        temp_path = path + '.tmp'
+        target = sqlite3.connect(temp_path)
+        try:
+            self.read_conn.backup(target, pages=pages, progress=progress, sleep=self.SNAPSHOT_STEP_SLEEP)
+            # 快照不使用WAL，单个文件即是完整的数据库
+            target.execute('PRAGMA journal_mode = DELETE')
+            target.close()
+            os.replace(temp_path, path)
+        except Exception:
+            target.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
+        
+    def list_snapshots(self, snapshot_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出快照，最新的在前
+        
+        参数:
+            snapshot_dir: 快照保存目录，默认为snapshot_dir()
+            
+        返回:
+            快照列表，每个快照包含:
+            - path: 快照文件路径
+            - created_at: 创建时间(datetime)
+            - size: 文件大小(字节)
+        """
+        snapshot_dir = snapshot_dir or self.snapshot_dir()
+        if not os.path.isdir(snapshot_dir):
+            return []
+        prefix = self._snapshot_prefix()
+        snapshots = []
+        for file_name in os.listdir(snapshot_dir):
+            if not (file_name.startswith(prefix) and file_name.endswith('.db')):
+                continue
+            try:
+                created_at = datetime.strptime(file_name[len(prefix):-3], self.SNAPSHOT_TIME_FORMAT)
+            except ValueError:
+                continue  # 不是create_snapshot创建的文件
+            path = os.path.join(snapshot_dir, file_name)
+            snapshots.append({'path': path, 'created_at': created_at, 'size': os.path.getsize(path)})
+        snapshots.sort(key=lambda snapshot: snapshot['created_at'], reverse=True)
+        return snapshots
+        
+    def prune_snapshots(self, keep: int = SNAPSHOT_KEEP, snapshot_dir: Optional[str] = None) -> int:
+        """只保留最新的keep个快照，删除其余的快照
+        
+        返回:
+            删除的快照数
+        """
+        removed = 0
+        for snapshot in self.list_snapshots(snapshot_dir)[keep:]:
+            try:
+                os.remove(snapshot['path'])
+                removed += 1
+            except OSError as e:
+                print(f"删除快照失败: {e}")
+        return removed
+        
+    def auto_snapshot(self, interval: float = SNAPSHOT_INTERVAL, keep: int = SNAPSHOT_KEEP,
+                      snapshot_dir: Optional[str] = None) -> Optional[str]:
+        """定时自动快照: 距最新的快照已超过interval秒时创建快照，并只保留最新的keep个
+        
+        返回:
+            新快照的路径，未到时间时返回None
+        """
+        snapshots = self.list_snapshots(snapshot_dir)
+        if snapshots and (datetime.now() - snapshots[0]['created_at']).total_seconds() < interval:
+            return None
+        path = self.create_snapshot(snapshot_dir)
+        self.prune_snapshots(keep, snapshot_dir)
+        return path
+        
+    def restore_snapshot(self, path: str, pages: int = SNAPSHOT_PAGES_PER_STEP, progress=None):
+        """用快照替换当前数据库的全部数据
         
-        # 按加分总和降序排序
-        ranking.sort(key=lambda x: x['addition_points'], reverse=True)
+        通过写连接把快照备份回当前数据库，连接保持打开，不需要删除或复制数据库文件；
+        其他连接(只读连接、clone()的对象)随后的查询即读取到恢复后的数据。
+        逐步复制时写连接在整个恢复期间持有写锁，其他连接的写入等待恢复完成。
+        旧版本程序创建的快照恢复后执行尚未执行的迁移。
+        
+        参数:
+            path: 快照文件路径
+            pages: 每步复制的页数，-1表示一次复制全部
+            progress: 每步完成后调用的函数，参数为(status, remaining, total)
+            
+        异常:
+            ValueError: 快照文件不存在或已损坏，此时当前数据库未被修改
+        """
+        if not os.path.isfile(path):
+            raise ValueError(f"快照文件不存在: {path}")
+        uri = Path(os.path.abspath(path)).as_uri() + '?mode=ro'
+        source = sqlite3.connect(uri, uri=True)
+        try:
+            try:
+                result = source.execute('PRAGMA quick_check').fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"快照文件已损坏: {e}")
+            if result != 'ok':
+                raise ValueError(f"快照文件已损坏: {result}")
+            source.backup(self.conn, pages=pages, progress=progress, sleep=self.SNAPSHOT_STEP_SLEEP)
+        finally:
+            source.close()
+            
+        # 恢复期间在其他线程中完成的查询按旧版本号缓存，递增版本号使其失效
+        self.invalidate_tables(*list(self._table_generations))
+        self.clear_query_cache()
+        self._full_text_search = None
+        self.init_db()
+
+    @cached_query('students', 'addition_records')
+    def get_addition_ranking(self) -> List[Dict[str, Any]]:
+        """获取学生加分排名(读取学生积分汇总表)
         
-        return ranking
+        返回:
+            按加分总和降序排序的学生列表，每个学生包含:
+            - name: 学生姓名
+            - addition_points: 加分总和
+        """
+        self.read_cursor.execute('''
+            SELECT s.name, ss.addition_total AS addition_points
+            FROM students s
+            JOIN student_score_summary ss ON ss.student_id = s.id
+            WHERE ROUND(ss.addition_total, 6) > 0
+            ORDER BY ss.addition_total DESC, s.name
+        ''')
+        return [dict(row) for row in self.read_cursor.fetchall()]
     
+    @cached_query('students', 'deduction_records')
     def get_deduction_ranking(self, sort_by: str = "total") -> List[Tuple[str, float, float, float]]:
         """获取学生扣分排名
         
+        违规扣分、非违规扣分和总扣分直接从学生积分汇总表读取，
+        排序也在数据库中完成。
+        
         参数:
             sort_by: 排序方式，可选值:
                 - "total": 按总扣分排序（默认）
@@ -1247,55 +2785,32 @@ class Database:
             - 非违规扣分
             - 总扣分
         """
-        # 获取所有学生
-        self.cursor.execute('SELECT name FROM students')
-        students = [row['name'] for row in self.cursor.fetchall()]
-        
-        ranking = []
-        
-        for student_name in students:
-            # 获取违规扣分总和
-            self.cursor.execute(
-                '''
-                SELECT COALESCE(SUM(points), 0) as sum_points 
-                FROM deduction_records 
-                WHERE student_name = ? AND deduction_type = 1
-                ''',
-                (student_name,)
-            )
-            violation_points = self.cursor.fetchone()['sum_points']
-            
-            # 获取非违规扣分总和
-            self.cursor.execute(
-                '''
-                SELECT COALESCE(SUM(points), 0) as sum_points 
-                FROM deduction_records 
-                WHERE student_name = ? AND deduction_type = 2
-                ''',
-                (student_name,)
-            )
-            non_violation_points = self.cursor.fetchone()['sum_points']
-            
-            # 计算总扣分
-            total_points = violation_points + non_violation_points
-            
-            # 只包含有扣分记录的学生
-            if total_points > 0:
-                ranking.append((student_name, violation_points, non_violation_points, total_points))
-        
-        # 根据sort_by参数排序
-        if sort_by == "violation":
-            ranking.sort(key=lambda x: x[1], reverse=True)  # 按违规扣分降序排序
-        elif sort_by == "non_violation":
-            ranking.sort(key=lambda x: x[2], reverse=True)  # 按非违规扣分降序排序
-        else:  # "total" 或其他值
-            ranking.sort(key=lambda x: x[3], reverse=True)  # 按总扣分降序排序
+        order_column = self.DEDUCTION_RANKING_ORDER.get(sort_by, "total_points")
+        
+        self.read_cursor.execute(f'''
+            SELECT
+                s.name AS student_name,
+                ss.violation_total AS violation_points,
+                ss.non_violation_total AS non_violation_points,
+                ss.violation_total + ss.non_violation_total AS total_points
+            FROM students s
+            JOIN student_score_summary ss ON ss.student_id = s.id
+            WHERE ROUND(ss.violation_total + ss.non_violation_total, 6) > 0
+            ORDER BY {order_column} DESC, s.name
+        ''')
         
-        return ranking
+        return [
+            (row['student_name'], row['violation_points'], row['non_violation_points'], row['total_points'])
+            for row in self.read_cursor.fetchall()
+        ]
     
+    @cached_query('students', 'deduction_records', 'addition_records')
     def get_total_score_ranking(self) -> List[Dict[str, Any]]:
         """获取学生总分排名
         
+        所有学生的加分总和、扣分总和直接从学生积分汇总表读取，
+        查询次数与学生人数和记录数量无关。
+        
         返回:
             按总分降序排序的学生列表，每个学生包含:
             - id: 学生ID
@@ -1304,58 +2819,40 @@ class Database:
             - addition_points: 加分总和
             - deduction_points: 扣分总和
             - total_score: 总分(初始分数 + 加分总和 - 扣分总和)
+            - rank: 名次(总分相同的学生名次相同)
         """
-        # 获取所有学生
-        self.cursor.execute('SELECT * FROM students')
-        students = [dict(row) for row in self.cursor.fetchall()]
-        
-        ranking = []
-        
-        for student in students:
-            # 获取加分总和
-            self.cursor.execute(
-                '''
-                SELECT COALESCE(SUM(points), 0) as sum_points 
-                FROM addition_records 
-                WHERE student_name = ?
-                ''',
-                (student['name'],)
-            )
-            addition_points = self.cursor.fetchone()['sum_points']
-            
-            # 获取扣分总和
-            self.cursor.execute(
-                '''
-                SELECT COALESCE(SUM(points), 0) as sum_points 
-                FROM deduction_records 
-                WHERE student_name = ?
-                ''',
-                (student['name'],)
+        self.read_cursor.execute('''
+            SELECT
+                id,
+                name,
+                initial_score,
+                addition_points,
+                deduction_points,
+                total_score,
+                RANK() OVER (ORDER BY ROUND(total_score, 2) DESC) AS rank
+            FROM (
+                SELECT
+                    s.id,
+                    s.name,
+                    s.initial_score,
+                    COALESCE(ss.addition_total, 0.0) AS addition_points,
+                    COALESCE(ss.violation_total + ss.non_violation_total, 0.0) AS deduction_points,
+                    s.initial_score
+                        + COALESCE(ss.addition_total, 0.0)
+                        - COALESCE(ss.violation_total + ss.non_violation_total, 0.0) AS total_score
+                FROM students s
+                LEFT JOIN student_score_summary ss ON ss.student_id = s.id
             )
-            deduction_points = self.cursor.fetchone()['sum_points']
-            
-            # 计算总分
-            total_score = student['initial_score'] + addition_points - deduction_points
-            
-            ranking.append({
-                'id': student['id'],
-                'name': student['name'],
-                'initial_score': student['initial_score'],
-                'addition_points': addition_points,
-                'deduction_points': deduction_points,
-                'total_score': total_score
-            })
-        
-        # 按总分降序排序
-        ranking.sort(key=lambda x: x['total_score'], reverse=True)
-        
-        return ranking
+            ORDER BY rank, name
+        ''')
+        return [dict(row) for row in self.read_cursor.fetchall()]
     
     def search_addition_records(self, student_name: Optional[str] = None,
                                start_date: Optional[str] = None,
                                end_date: Optional[str] = None,
                                min_points: Optional[float] = None,
-                               max_points: Optional[float] = None) -> List[AdditionRecord]:
+                               max_points: Optional[float] = None,
+                               text: Optional[str] = None) -> List[AdditionRecord]:
         """搜索加分记录
         
         参数:
@@ -1364,27 +2861,104 @@ class Database:
             end_date: 结束日期，格式为'yyyy-MM-dd'，如果为None则不限制结束日期
             min_points: 最小分数，如果为None则不限制最小分数
             max_points: 最大分数，如果为None则不限制最大分数
+            text: 关键词，在加分原因中查找，多个词以空格分隔，如果为None则不限制
+            
+        返回:
+            符合条件的加分记录列表，按开始日期降序排列
+        """
+        records = []
+        for batch in self.iter_addition_records(
+                student_name=student_name, start_date=start_date, end_date=end_date,
+                min_points=min_points, max_points=max_points, text=text):
+            records.extend(batch)
+        return records
+    
+    def iter_addition_records(self, batch_size: int = SEARCH_BATCH_SIZE, **filters) -> Iterator[List[AdditionRecord]]:
+        """分批搜索加分记录，每批最多batch_size条，内存占用与结果总数无关
+        
+        参数:
+            batch_size: 每批记录数
+            filters: 查询条件，与search_addition_records的参数相同
+            
+        返回:
+            按开始日期降序逐批产生加分记录列表的生成器
+        """
+        where, params = self._addition_search_conditions(**filters)
+        cursor = self._record_cursor(AdditionRecord, '加分')
+        try:
+            cursor.execute(
+                f'SELECT {self._record_columns(AdditionRecord)} FROM addition_records {where} '
+                'ORDER BY start_date DESC, id DESC',
+                params
+            )
+            while True:
+                records = cursor.fetchmany(batch_size)
+                if not records:
+                    break
+                yield [record for record in records if record is not None]
+        finally:
+            cursor.close()
+            
+    def search_addition_records_page(self, after: Optional[Tuple[int, int]] = None,
+                                     limit: int = SEARCH_PAGE_SIZE, **filters) -> Dict[str, Any]:
+        """按页搜索加分记录，以(开始日期, ID)为游标
+        
+        参数:
+            after: 上一页返回的next_cursor，为None时返回第一页
+            limit: 每页记录数
+            filters: 查询条件，与search_addition_records的参数相同
             
         返回:
-            符合条件的加分记录列表
+            包含以下字段的字典:
+            - records: 本页的加分记录列表，按开始日期降序排列
+            - next_cursor: 下一页的游标，没有更多记录时为None
         """
-        query = 'SELECT * FROM addition_records WHERE 1=1'
+        where, params = self._addition_search_conditions(**filters)
+        if after is not None:
+            where += ' AND start_date <= ? AND (start_date < ? OR id < ?)'
+            params += [after[0], after[0], after[1]]
+        records = self._fetch_records(
+            AdditionRecord, '加分',
+            f'SELECT {self._record_columns(AdditionRecord)} FROM addition_records {where} '
+            'ORDER BY start_date DESC, id DESC LIMIT ?',
+            params + [limit + 1], skip_invalid=False
+        )
+        
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            last = next((record for record in reversed(records) if record is not None), None)
+            if last is not None:
+                next_cursor = (date_to_day(last.start_date), last.id)
+        return {
+            'records': [record for record in records if record is not None],
+            'next_cursor': next_cursor
+        }
+        
+    def _addition_search_conditions(self, student_name: Optional[str] = None,
+                                    start_date: Optional[str] = None,
+                                    end_date: Optional[str] = None,
+                                    min_points: Optional[float] = None,
+                                    max_points: Optional[float] = None,
+                                    text: Optional[str] = None) -> Tuple[str, list]:
+        """构造搜索加分记录的WHERE子句和参数，参数含义见search_addition_records"""
+        query = 'WHERE 1=1'
         params = []
         
         # 添加查询条件
         if student_name:
-            query += ' AND student_name = ?'
+            query += ' AND student_id = (SELECT id FROM students WHERE name = ?)'
             params.append(student_name)
             
         if start_date:
             # 查找与指定时间段有重叠的记录
             query += ' AND end_date >= ?'
-            params.append(start_date)
+            params.append(date_to_day(start_date))
             
         if end_date:
             # 查找与指定时间段有重叠的记录
             query += ' AND start_date <= ?'
-            params.append(end_date)
+            params.append(date_to_day(end_date))
             
         if min_points is not None:
             query += ' AND points >= ?'
@@ -1394,22 +2968,10 @@ class Database:
             query += ' AND points <= ?'
             params.append(max_points)
             
-        # 按开始日期降序排序
-        query += ' ORDER BY start_date DESC'
-        
-        # 执行查询
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
-        
-        # 转换为AdditionRecord对象列表
-        records = []
-        for row in rows:
-            row_dict = dict(row)
-            try:
-                record = AdditionRecord.from_dict(row_dict)
-                records.append(record)
-            except Exception as e:
-                print(f"转换加分记录时出错: {str(e)}, 记录: {row_dict}")
-                
-        return records
+        if text:
+            text_query, text_params = self._text_search_condition('addition_records', text)
+            query += text_query
+            params += text_params
+            
+        return query, params
                    
\ No newline at end of file
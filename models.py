@@ -1,13 +1,77 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Union
 
 # 学生列表
 STUDENT_LIST = []
 
+# 数据库中的日期以自1970-01-01起的天数保存
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# 日期转换结果的缓存条数。一个班级的记录集中在几百个不同的日期上，
+# 按值缓存后每个日期只解析/格式化一次；datetime和字符串都不可变，可以安全共享
+DATE_CACHE_SIZE = 4096
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def date_to_day(value: Union[date, datetime, str, int]) -> int:
+    """将日期转换为数据库中保存的天数
+    
+    参数:
+        value: date/datetime对象、天数，或以'YYYY-MM-DD'开头的字符串(可带时间部分)
+        
+    返回:
+        自1970-01-01起的天数
+    """
+    if isinstance(value, date):
+        return value.toordinal() - EPOCH_ORDINAL
+    if isinstance(value, int):
+        return value
+    return datetime.strptime(value[:10], "%Y-%m-%d").toordinal() - EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def day_to_str(day: int) -> str:
+    """将数据库中的天数转换为'YYYY-MM-DD'格式的字符串"""
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value: Union[int, str]) -> datetime:
+    """解析数据库中的日期值
+    
+    整数天数直接换算；旧数据库中的ISO格式字符串(可能包含T00:00:00这样的时间部分)
+    仍按原方式解析。相同的值只解析一次，返回同一个datetime对象。
+    """
+    if isinstance(value, int):
+        return datetime.fromordinal(value + EPOCH_ORDINAL)
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # 尝试处理其他格式的日期字符串
+        try:
+            return datetime.strptime(value.split("T")[0], "%Y-%m-%d")
+        except Exception as e:
+            raise ValueError(f"无法解析日期格式: {value}, 错误: {str(e)}")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_date(value: datetime, fmt: str = DATE_FORMAT) -> str:
+    """把日期格式化为字符串，相同的日期和格式只调用一次strftime
+    
+    参数:
+        value: date/datetime对象
+        fmt: strftime格式，默认为'YYYY-MM-DD'
+    """
+    return value.strftime(fmt)
+
+
 class DeductionType(Enum):
     """扣分类型"""
     VIOLATION = 1      # 违规扣分
@@ -42,9 +106,18 @@ class ViolationType(Enum):
         return category_map.get(category, [])
 
 
+# 按数据库中保存的值查找枚举成员，比调用枚举类构造快
+_DEDUCTION_TYPES = {member.value: member for member in DeductionType}
+_VIOLATION_TYPES = {member.value: member for member in ViolationType}
+
+
 class Student:
     """学生模型"""
     
+    __slots__ = ('id', 'name', 'initial_score')
+    # from_row按此顺序读取查询结果中的列
+    COLUMNS = ('id', 'name', 'initial_score')
+    
     def __init__(self, name: str, initial_score: float = 0.0):
         self.id: Optional[int] = None  # 数据库ID
         self.name: str = name
@@ -64,11 +137,25 @@ class Student:
         student = cls(data["name"], data["initial_score"])
         student.id = data["id"]
         return student
+        
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Student':
+        """从按COLUMNS顺序排列的查询结果行创建对象，不经过字典和__init__"""
+        student = cls.__new__(cls)
+        student.id, student.name, student.initial_score = row
+        return student
 
 
 class DeductionRecord:
     """扣分记录模型"""
     
+    __slots__ = (
+        'id', 'student_name', 'points', 'violation_behavior', 'treatment_measures', 'date',
+        'deduction_type', 'violation_type', 'non_violation_type', 'reason'
+    )
+    # from_row按此顺序读取查询结果中的列
+    COLUMNS = __slots__
+    
     def __init__(
         self, 
         student_name: str, 
@@ -100,7 +187,7 @@ class DeductionRecord:
             "points": self.points,
             "violation_behavior": self.violation_behavior,
             "treatment_measures": self.treatment_measures,
-            "date": self.date.strftime("%Y-%m-%d"),  # 统一使用年月日格式
+            "date": format_date(self.date),  # 统一使用年月日格式
             "deduction_type": self.deduction_type.value,
             "violation_type": self.violation_type.value if self.violation_type else None,
             "non_violation_type": self.non_violation_type,
@@ -114,24 +201,12 @@ class DeductionRecord:
         if "violation_type" in data and data["violation_type"] is not None:
             violation_type = ViolationType(int(data["violation_type"]))
         
-        # 处理可能包含时间部分的ISO格式日期字符串
-        try:
-            date = datetime.fromisoformat(data["date"])
-        except ValueError:
-            # 尝试处理其他格式的日期字符串
-            try:
-                # 如果包含T00:00:00这样的时间部分，先分割只取日期部分
-                if "T" in data["date"]:
-                    date = datetime.strptime(data["date"].split("T")[0], "%Y-%m-%d")
-                else:
-                    date = datetime.strptime(data["date"], "%Y-%m-%d")
-            except Exception as e:
-                raise ValueError(f"无法解析日期格式: {data['date']}, 错误: {str(e)}")
+        record_date = parse_date(data["date"])
             
         record = cls(
             data["student_name"],
             data["points"],
-            date,
+            record_date,
             DeductionType(data["deduction_type"]),
             data.get("violation_behavior"),
             data.get("treatment_measures"),
@@ -141,11 +216,26 @@ class DeductionRecord:
         )
         record.id = data["id"]
         return record
+        
+    @classmethod
+    def from_row(cls, row: tuple) -> 'DeductionRecord':
+        """从按COLUMNS顺序排列的查询结果行创建对象，不经过字典和__init__"""
+        record = cls.__new__(cls)
+        (record.id, record.student_name, record.points, record.violation_behavior, record.treatment_measures,
+         day, deduction_type, violation_type, record.non_violation_type, record.reason) = row
+        record.date = parse_date(day)
+        record.deduction_type = _DEDUCTION_TYPES[deduction_type]
+        record.violation_type = None if violation_type is None else _VIOLATION_TYPES[violation_type]
+        return record
 
 
 class CompensationRecord:
     """补偿记录模型"""
     
+    __slots__ = ('id', 'deduction_record_id', 'old_points', 'new_points', 'reason', 'date')
+    # from_row按此顺序读取查询结果中的列
+    COLUMNS = __slots__
+    
     def __init__(
         self, 
         deduction_record_id: int, 
@@ -169,40 +259,40 @@ class CompensationRecord:
             "old_points": self.old_points,
             "new_points": self.new_points,
             "reason": self.reason,
-            "date": self.date.strftime("%Y-%m-%d")  # 统一使用年月日格式
+            "date": format_date(self.date)  # 统一使用年月日格式
         }
         
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CompensationRecord':
         """从字典创建对象"""
-        # 处理可能包含时间部分的ISO格式日期字符串
-        try:
-            date = datetime.fromisoformat(data["date"])
-        except ValueError:
-            # 尝试处理其他格式的日期字符串
-            try:
-                # 如果包含T00:00:00这样的时间部分，先分割只取日期部分
-                if "T" in data["date"]:
-                    date = datetime.strptime(data["date"].split("T")[0], "%Y-%m-%d")
-                else:
-                    date = datetime.strptime(data["date"], "%Y-%m-%d")
-            except Exception as e:
-                raise ValueError(f"无法解析日期格式: {data['date']}, 错误: {str(e)}")
+        record_date = parse_date(data["date"])
         
         record = cls(
             data["deduction_record_id"],
             data["old_points"],
             data["new_points"],
             data["reason"],
-            date
+            record_date
         )
         record.id = data["id"]
         return record
+        
+    @classmethod
+    def from_row(cls, row: tuple) -> 'CompensationRecord':
+        """从按COLUMNS顺序排列的查询结果行创建对象，不经过字典和__init__"""
+        record = cls.__new__(cls)
+        record.id, record.deduction_record_id, record.old_points, record.new_points, record.reason, date = row
+        record.date = parse_date(date)
+        return record
 
 
 class AdditionRecord:
     """加分记录模型"""
     
+    __slots__ = ('id', 'student_name', 'points', 'reason', 'start_date', 'end_date')
+    # from_row按此顺序读取查询结果中的列
+    COLUMNS = __slots__
+    
     def __init__(
         self, 
         student_name: str, 
@@ -225,39 +315,28 @@ class AdditionRecord:
             "student_name": self.student_name,
             "points": self.points,
             "reason": self.reason,
-            "start_date": self.start_date.strftime("%Y-%m-%d"),  # 统一使用年月日格式
-            "end_date": self.end_date.strftime("%Y-%m-%d")      # 统一使用年月日格式
+            "start_date": format_date(self.start_date),  # 统一使用年月日格式
+            "end_date": format_date(self.end_date)      # 统一使用年月日格式
         }
         
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AdditionRecord':
         """从字典创建对象"""
-        # 处理可能包含时间部分的ISO格式日期字符串
-        try:
-            start_date = datetime.fromisoformat(data["start_date"])
-            end_date = datetime.fromisoformat(data["end_date"])
-        except ValueError:
-            # 尝试处理其他格式的日期字符串
-            try:
-                # 如果包含T00:00:00这样的时间部分，先分割只取日期部分
-                if "T" in data["start_date"]:
-                    start_date = datetime.strptime(data["start_date"].split("T")[0], "%Y-%m-%d")
-                else:
-                    start_date = datetime.strptime(data["start_date"], "%Y-%m-%d")
-                
-                if "T" in data["end_date"]:
-                    end_date = datetime.strptime(data["end_date"].split("T")[0], "%Y-%m-%d")
-                else:
-                    end_date = datetime.strptime(data["end_date"], "%Y-%m-%d")
-            except Exception as e:
-                raise ValueError(f"无法解析日期格式: {data['start_date']}或{data['end_date']}, 错误: {str(e)}")
-        
         record = cls(
             data["student_name"],
             data["points"],
             data["reason"],
-            start_date,
-            end_date
+            parse_date(data["start_date"]),
+            parse_date(data["end_date"])
         )
         record.id = data["id"]
+        return record
+        
+    @classmethod
+    def from_row(cls, row: tuple) -> 'AdditionRecord':
+        """从按COLUMNS顺序排列的查询结果行创建对象，不经过字典和__init__"""
+        record = cls.__new__(cls)
+        record.id, record.student_name, record.points, record.reason, start_date, end_date = row
+        record.start_date = parse_date(start_date)
+        record.end_date = parse_date(end_date)
         return record
\ No newline at end of file
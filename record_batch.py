@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from collections import defaultdict
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:  # NumPy是可选依赖，未安装时只有to_numpy不可用，汇总在Python中进行
+    numpy = None
+
+# 各列类型对应的array类型码: 整数(id、日期天数、枚举值)、分数、字典编码的文本(编号)
+TYPECODES = {'i': 'q', 'f': 'd', 's': 'i'}
+
+BATCH_SIZE = 1000  # 每次从数据库读取的行数
+
+
+class RecordBatch:
+    """按列保存的查询结果
+
+    每列是一个连续的类型化数组，所有列长度相同，第i行由各列的第i个元素组成。
+    文本列按字典编码保存: 列中是编号，dictionaries[列名][编号]为原字符串，
+    重复的学生姓名等只保存一次。统计时只需遍历所需的数值列，不创建每行的记录对象。
+    """
+
+    __slots__ = ('columns', 'dictionaries')
+
+    def __init__(self, columns: Dict[str, array], dictionaries: Optional[Dict[str, List[str]]] = None):
+        """
+        参数:
+            columns: {列名: array}，各列长度必须相同
+            dictionaries: {文本列名: 字符串列表}，列中的编号为字符串在列表中的位置
+
+        异常:
+            ValueError: 各列长度不一致
+        """
+        if len({len(values) for values in columns.values()}) > 1:
+            raise ValueError("各列长度不一致")
+        self.columns = columns
+        self.dictionaries = dictionaries or {}
+
+    @classmethod
+    def from_cursor(cls, cursor, schema: Sequence[Tuple[str, str]], batch_size: int = BATCH_SIZE) -> 'RecordBatch':
+        """把游标中的查询结果按列读入RecordBatch
+
+        参数:
+            cursor: 已执行查询的游标，结果各列的顺序与schema一致，且不含空值
+            schema: (列名, 类型)序列，类型为'i'(整数)、'f'(分数)或's'(文本，字典编码)
+            batch_size: 每次从游标读取的行数
+
+        返回:
+            RecordBatch对象
+        """
+        def chunks():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield zip(*rows)
+        return cls.from_chunks(schema, chunks())
+
+    @classmethod
+    def from_columns(cls, schema: Sequence[Tuple[str, str]], columns: Sequence[Iterable[Any]]) -> 'RecordBatch':
+        """把已按列取出的值保存为RecordBatch
+
+        参数:
+            schema: (列名, 类型)序列，类型同from_cursor
+            columns: 与schema顺序一致的各列的值，不含空值
+
+        返回:
+            RecordBatch对象
+        """
+        return cls.from_chunks(schema, [columns])
+
+    @classmethod
+    def from_chunks(cls, schema: Sequence[Tuple[str, str]],
+                    chunks: Iterable[Iterable[Iterable[Any]]]) -> 'RecordBatch':
+        """逐块把按列取出的值追加到各列，每块处理完即可释放，内存占用只与块大小有关
+
+        参数:
+            schema: (列名, 类型)序列，类型同from_cursor
+            chunks: 可迭代对象，每块为与schema顺序一致的各列的值，不含空值
+
+        返回:
+            RecordBatch对象，文本列的编号在各块之间保持一致
+        """
+        names = [name for name, _ in schema]
+        arrays = [array(TYPECODES[kind]) for _, kind in schema]
+        indexes = {name: {} for name, kind in schema if kind == 's'}  # 字符串 -> 编号
+        for chunk in chunks:
+            for values, name, buffer in zip(chunk, names, arrays):
+                index = indexes.get(name)
+                if index is not None:
+                    buffer.extend([index.setdefault(value, len(index)) for value in values])
+                else:
+                    buffer.extend(values)
+        return cls(dict(zip(names, arrays)), {name: list(index) for name, index in indexes.items()})
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __repr__(self) -> str:
+        return f"RecordBatch({len(self)}行, 列: {', '.join(self.columns)})"
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """全部列名"""
+        return tuple(self.columns)
+
+    def column(self, name: str) -> array:
+        """获取一列的数组，文本列返回编号"""
+        return self.columns[name]
+
+    def values(self, name: str) -> list:
+        """获取一列的值，文本列返回解码后的字符串"""
+        dictionary = self.dictionaries.get(name)
+        if dictionary is None:
+            return self.columns[name].tolist()
+        return [dictionary[code] for code in self.columns[name]]
+
+    def to_numpy(self, name: str):
+        """获取一列的NumPy数组视图
+
+        视图与RecordBatch共用内存，不复制数据；文本列返回编号。
+
+        异常:
+            ImportError: 未安装NumPy
+        """
+        if numpy is None:
+            raise ImportError("需要安装NumPy才能把列转换为NumPy数组")
+        values = self.columns[name]
+        return numpy.frombuffer(values, dtype=values.typecode) if len(values) else numpy.empty(0, values.typecode)
+
+    def filter(self, mask: Iterable[Any]) -> 'RecordBatch':
+        """按掩码筛选行
+
+        参数:
+            mask: 与行数相同长度的序列，值为真的行被保留
+
+        返回:
+            新的RecordBatch，文本列与原对象共用字典
+        """
+        if not isinstance(mask, (bytes, bytearray, list)):
+            mask = list(mask)
+        if len(mask) != len(self):
+            raise ValueError("掩码长度与行数不一致")
+        columns = {
+            name: array(values.typecode, compress(values, mask))
+            for name, values in self.columns.items()
+        }
+        return RecordBatch(columns, self.dictionaries)
+
+    def between(self, name: str, low, high) -> bytes:
+        """生成low <= 值 <= high的行的掩码，供filter使用"""
+        return bytes(low <= value <= high for value in self.columns[name])
+
+    def group_sum(self, key: str, value: str) -> Dict[Any, float]:
+        """按key列分组，对value列求和
+
+        参数:
+            key: 分组列，文本列按解码后的字符串分组
+            value: 求和的数值列
+
+        返回:
+            {分组值: 总和}，只包含出现过的分组
+        """
+        keys = self.columns[key]
+        values = self.columns[value]
+        dictionary = self.dictionaries.get(key)
+        if dictionary is not None:
+            # 字典编码的列可直接用编号作为下标累加
+            if numpy is not None and len(keys):
+                sums = numpy.bincount(self.to_numpy(key), weights=self.to_numpy(value),
+                                      minlength=len(dictionary)).tolist()
+            else:
+                sums = [0.0] * len(dictionary)
+                for code, points in zip(keys, values):
+                    sums[code] += points
+            present = set(keys)
+            return {dictionary[code]: sums[code] for code in range(len(dictionary)) if code in present}
+
+        sums = defaultdict(float)
+        for group, points in zip(keys, values):
+            sums[group] += points
+        return dict(sums)
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # 统计模块需要NumPy，未安装时ScoreStatistics不可用
+    np = None
+
+from database import Database
+from models import DeductionType, ViolationType, day_to_str
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+# 违规类别，ViolationType.get_category_types中未归类的违规类型计入"其他"
+VIOLATION_CATEGORIES = ("学习", "卫生", "纪律")
+OTHER_CATEGORY = "其他"
+
+# 时间序列的周期
+PERIODS = ("day", "week", "month")
+WEEK_OFFSET = 3  # 1970-01-01是星期四，天数加3后按7整除即为以星期一开始的周
+
+
+def numpy_available() -> bool:
+    """是否已安装NumPy"""
+    return np is not None
+
+
+def _category_table():
+    """违规类型的值 -> 类别编号的查找表，下标0(非违规扣分)和未归类的类型为"其他"的编号"""
+    other = len(VIOLATION_CATEGORIES)
+    table = np.full(max(member.value for member in ViolationType) + 1, other, dtype=np.int64)
+    for index, category in enumerate(VIOLATION_CATEGORIES):
+        for member in ViolationType.get_category_types(category):
+            table[member.value] = index
+    return table
+
+
+def _weighted_counts(keys, weights, size: int):
+    """按下标累加权重，没有记录时也返回浮点数组"""
+    return np.bincount(keys, weights=weights, minlength=size).astype(np.float64, copy=False)
+
+
+def _optional(values) -> list:
+    """把NumPy数组转换为列表，NaN转换为None"""
+    return [None if value != value else value for value in values.tolist()]
+
+
+def _describe(values, percentiles: Sequence[float]) -> Dict[str, Any]:
+    """一组数值的均值、中位数、标准差、最值和百分位数，没有数值时各项为None"""
+    if not len(values):
+        return {'count': 0, 'mean': None, 'median': None, 'std': None, 'min': None, 'max': None,
+                'percentiles': {q: None for q in percentiles}}
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'median': float(np.median(values)),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'percentiles': dict(zip(percentiles, np.percentile(values, percentiles).tolist())),
+    }
+
+
+def _group_percentiles(groups, values, group_count: int, percentiles: Sequence[float]):
+    """按组计算百分位数(与numpy.percentile的线性插值相同)
+
+    先按(组, 数值)排序，每组的数值连续且有序，各组的第q百分位数可一次按下标取出。
+
+    返回:
+        形状为(len(percentiles), group_count)的数组，没有数值的组为NaN
+    """
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.cumsum(counts) - counts
+    result = np.full((len(percentiles), group_count), np.nan)
+    present = counts > 0
+    if not present.any():
+        return result
+    last = (counts[present] - 1).astype(np.float64)
+    for row, q in enumerate(percentiles):
+        position = last * (q / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        base = starts[present]
+        low_values = ordered[base + lower]
+        high_values = ordered[base + upper]
+        result[row, present] = low_values + (high_values - low_values) * (position - lower)
+    return result
+
+
+class ScoreStatistics:
+    """扣分和加分的统计分析
+
+    创建时从数据库读取一次指定时间段内的扣分记录和加分记录(RecordBatch)，转换为NumPy数组，
+    之后的各项统计都在数组上按列计算，不再查询数据库，也不创建每条记录的对象。
+    学生按ID映射为0..n-1的下标，扣分和加分使用相同的下标。
+    """
+
+    def __init__(self, db: Database, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """
+        参数:
+            db: 数据库对象，可以在后台线程中使用clone()得到的对象
+            start_date: 开始日期 (格式: 'YYYY-MM-DD')，包含当天，None表示不限
+            end_date: 结束日期 (格式: 'YYYY-MM-DD')，包含当天，None表示不限
+
+        异常:
+            ImportError: 未安装NumPy
+        """
+        if np is None:
+            raise ImportError("统计分析需要安装NumPy")
+        self.start_date = start_date
+        self.end_date = end_date
+
+        students = sorted(db.get_students(), key=lambda student: student.id)
+        self.student_names = [student.name for student in students]
+        self.initial_scores = np.array([student.initial_score for student in students], dtype=np.float64)
+        student_ids = np.array([student.id for student in students], dtype=np.int64)
+
+        deductions = db.get_deduction_batch(start_date, end_date)
+        self.deduction_students = np.searchsorted(student_ids, deductions.to_numpy('student_id'))
+        self.deduction_points = deductions.to_numpy('points')
+        self.deduction_days = deductions.to_numpy('date')
+        self.deduction_types = deductions.to_numpy('deduction_type')
+        self.violation_types = deductions.to_numpy('violation_type')
+
+        additions = db.get_addition_batch(start_date, end_date)
+        self.addition_students = np.searchsorted(student_ids, additions.to_numpy('student_id'))
+        self.addition_points = additions.to_numpy('points')
+        self.addition_days = additions.to_numpy('start_date')
+
+    @property
+    def student_count(self) -> int:
+        return len(self.student_names)
+
+    def _student_totals(self):
+        """每个学生的(扣分总和, 加分总和)"""
+        deductions = _weighted_counts(self.deduction_students, self.deduction_points, self.student_count)
+        additions = _weighted_counts(self.addition_students, self.addition_points, self.student_count)
+        return deductions, additions
+
+    def student_summary(self, percentiles: Sequence[float] = (50, 90)) -> List[Dict[str, Any]]:
+        """每个学生的扣分分布和加分、扣分总和
+
+        参数:
+            percentiles: 计算每个学生单次扣分分值的哪些百分位数
+
+        返回:
+            按学生ID排序的列表，每项包含:
+            - student_name: 学生姓名
+            - deduction_count: 扣分次数
+            - deduction_points: 扣分总和
+            - deduction_mean: 单次扣分的平均值，没有扣分时为None
+            - deduction_median: 单次扣分的中位数，没有扣分时为None
+            - deduction_percentiles: {百分位: 单次扣分的百分位数}
+            - addition_points: 加分总和
+            - net_points: 加分总和 - 扣分总和
+            - total_score: 初始分数 + 净得分
+        """
+        counts = np.bincount(self.deduction_students, minlength=self.student_count)
+        deductions, additions = self._student_totals()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, deductions / counts, np.nan)
+        requested = list(percentiles)
+        table = _group_percentiles(self.deduction_students, self.deduction_points, self.student_count,
+                                   [50] + requested)
+        medians = _optional(table[0])
+        columns = [_optional(row) for row in table[1:]]
+        net = additions - deductions
+        total = self.initial_scores + net
+        return [
+            {
+                'student_name': name,
+                'deduction_count': count,
+                'deduction_points': deduction,
+                'deduction_mean': mean,
+                'deduction_median': median,
+                'deduction_percentiles': {q: column[index] for q, column in zip(requested, columns)},
+                'addition_points': addition,
+                'net_points': net_points,
+                'total_score': total_score,
+            }
+            for index, (name, count, deduction, mean, median, addition, net_points, total_score) in enumerate(zip(
+                self.student_names, counts.tolist(), deductions.tolist(), _optional(means), medians,
+                additions.tolist(), net.tolist(), total.tolist()
+            ))
+        ]
+
+    def class_summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """全班的分数分布
+
+        返回:
+            字典，包含:
+            - student_count: 学生人数
+            - deduction_count: 扣分记录数
+            - addition_count: 加分记录数
+            - net_points: 每个学生净得分(加分总和 - 扣分总和)的分布
+            - total_score: 每个学生总分(初始分数 + 净得分)的分布
+            - deduction_points: 单次扣分分值的分布
+            - addition_points: 单次加分分值的分布
+            每个分布是包含count、mean、median、std、min、max和percentiles({百分位: 值})的字典
+        """
+        deductions, additions = self._student_totals()
+        net = additions - deductions
+        return {
+            'student_count': self.student_count,
+            'deduction_count': int(len(self.deduction_points)),
+            'addition_count': int(len(self.addition_points)),
+            'net_points': _describe(net, percentiles),
+            'total_score': _describe(self.initial_scores + net, percentiles),
+            'deduction_points': _describe(self.deduction_points, percentiles),
+            'addition_points': _describe(self.addition_points, percentiles),
+        }
+
+    def _period_keys(self, days, period: str):
+        """把天数转换为周期编号: 天数、周数(星期一开始)或自1970-01起的月数"""
+        if period == 'day':
+            return days
+        if period == 'week':
+            return (days + WEEK_OFFSET) // 7
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+    @staticmethod
+    def _period_label(key: int, period: str) -> str:
+        if period == 'day':
+            return day_to_str(key)
+        if period == 'week':
+            return day_to_str(key * 7 - WEEK_OFFSET)
+        return str(np.datetime64(key, 'M'))
+
+    def time_series(self, period: str = 'week', window: int = 4) -> List[Dict[str, Any]]:
+        """按日、周或月汇总的时间序列，包含没有记录的周期
+
+        加分记录按开始日期计入周期。
+
+        参数:
+            period: 'day'、'week'或'month'
+            window: 滚动窗口包含的周期数
+
+        返回:
+            按时间排序的列表，每项包含:
+            - period: 周期开始日期('YYYY-MM-DD')，按月时为'YYYY-MM'
+            - deduction_count: 扣分次数
+            - violation_count: 违规扣分次数
+            - deduction_points: 扣分总和
+            - addition_points: 加分总和
+            - rolling_deduction_points: 截至本周期的window个周期内的扣分总和
+            - rolling_deduction_mean: 上述窗口内每个周期的平均扣分
+
+        异常:
+            ValueError: period或window无效
+        """
+        if period not in PERIODS:
+            raise ValueError(f"不支持的周期: {period}")
+        if window < 1:
+            raise ValueError("滚动窗口至少包含1个周期")
+        deduction_keys = self._period_keys(self.deduction_days, period)
+        addition_keys = self._period_keys(self.addition_days, period)
+        keys = np.concatenate((deduction_keys, addition_keys))
+        if not len(keys):
+            return []
+        first = int(keys.min())
+        span = int(keys.max()) - first + 1
+
+        deduction_offsets = deduction_keys - first
+        counts = np.bincount(deduction_offsets, minlength=span)
+        violations = np.bincount(deduction_offsets[self.deduction_types == DeductionType.VIOLATION.value],
+                                 minlength=span)
+        deductions = _weighted_counts(deduction_offsets, self.deduction_points, span)
+        additions = _weighted_counts(addition_keys - first, self.addition_points, span)
+
+        # 滚动窗口: 累计和与window个周期之前的累计和相减；开头不足window个周期时按实际周期数平均
+        cumulative = np.concatenate(([0.0], np.cumsum(deductions)))
+        ends = np.arange(1, span + 1)
+        starts = np.maximum(ends - window, 0)
+        rolling = cumulative[ends] - cumulative[starts]
+        sizes = ends - starts
+
+        return [
+            {
+                'period': self._period_label(first + offset, period),
+                'deduction_count': count,
+                'violation_count': violation_count,
+                'deduction_points': deduction,
+                'addition_points': addition,
+                'rolling_deduction_points': rolling_points,
+                'rolling_deduction_mean': rolling_points / size,
+            }
+            for offset, (count, violation_count, deduction, addition, rolling_points, size) in enumerate(zip(
+                counts.tolist(), violations.tolist(), deductions.tolist(), additions.tolist(),
+                rolling.tolist(), sizes.tolist()
+            ))
+        ]
+
+    def violation_categories(self) -> Dict[str, Any]:
+        """按违规类别(ViolationType.get_category_types)统计违规扣分
+
+        返回:
+            字典，包含:
+            - categories: 类别名称列表，最后一项为"其他"
+            - totals: 每个类别一项，包含category、count、points和share(占违规次数的比例)
+            - students: 每个学生一项，包含student_name、counts({类别: 次数})和points({类别: 扣分})
+        """
+        categories = list(VIOLATION_CATEGORIES) + [OTHER_CATEGORY]
+        violation = self.deduction_types == DeductionType.VIOLATION.value
+        category = _category_table()[self.violation_types[violation]]
+        students = self.deduction_students[violation]
+        points = self.deduction_points[violation]
+
+        category_count = len(categories)
+        cells = students * category_count + category
+        size = self.student_count * category_count
+        counts = np.bincount(cells, minlength=size).reshape(self.student_count, category_count)
+        sums = _weighted_counts(cells, points, size).reshape(self.student_count, category_count)
+
+        total_counts = counts.sum(axis=0)
+        total_points = sums.sum(axis=0)
+        violation_count = int(total_counts.sum())
+        totals = [
+            {
+                'category': name,
+                'count': count,
+                'points': category_points,
+                'share': count / violation_count if violation_count else 0.0,
+            }
+            for name, count, category_points in zip(categories, total_counts.tolist(), total_points.tolist())
+        ]
+        return {
+            'categories': categories,
+            'totals': totals,
+            'students': [
+                {
+                    'student_name': name,
+                    'counts': dict(zip(categories, student_counts)),
+                    'points': dict(zip(categories, student_points)),
+                }
+                for name, student_counts, student_points in zip(
+                    self.student_names, counts.tolist(), sums.tolist()
+                )
+            ],
+        }
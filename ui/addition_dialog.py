@@ -12,7 +12,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QDate
 
 from database import Database
-from models import AdditionRecord, STUDENT_LIST
+from models import AdditionRecord, STUDENT_LIST, format_date
 
 
 class AdditionDialog(QDialog):
@@ -195,9 +195,7 @@ class AdditionDialog(QDialog):
         
         # 不同分数批量加分
         if self.diff_points_checkbox.isChecked():
-            success_count = 0
-            fail_count = 0
-            processed_count = 0
+            records = []
             
             # 从表格中获取每个学生的分数
             for row in range(self.students_table.rowCount()):
@@ -206,44 +204,26 @@ class AdditionDialog(QDialog):
                 
                 try:
                     points = float(points_text)
-                    if points <= 0:  # 跳过零分或负分
-                        continue
-                        
-                    processed_count += 1
+                except ValueError:
+                    QMessageBox.warning(self, "错误", f"学生 {student_name} 的加分分数无效: {points_text}")
+                    return
                     
-                    record = AdditionRecord(
-                        student_name=student_name,
-                        points=points,
-                        reason=reason,
-                        start_date=start_date,
-                        end_date=end_date
-                    )
+                if points <= 0:  # 跳过零分或负分
+                    continue
                     
-                    if self.db.add_addition_record(record):
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                except ValueError as e:
-                    QMessageBox.warning(
-                        self,
-                        "错误",
-                        f"学生 {student_name} 加分记录添加失败: {str(e)}"
-                    )
-                    fail_count += 1
+                records.append(AdditionRecord(
+                    student_name=student_name,
+                    points=points,
+                    reason=reason,
+                    start_date=start_date,
+                    end_date=end_date
+                ))
             
-            if processed_count == 0:
+            if not records:
                 QMessageBox.warning(self, "错误", "请至少为一名学生设置大于0的分数")
                 return
                 
-            if success_count > 0:
-                QMessageBox.information(
-                    self,
-                    "成功",
-                    f"成功添加 {success_count} 条不同分数加分记录，失败 {fail_count} 条"
-                )
-                super().accept()
-            else:
-                QMessageBox.warning(self, "错误", "所有加分记录添加失败")
+            self.add_batch_records(records, "不同分数")
                 
         # 相同分数批量加分
         elif self.batch_checkbox.isChecked():
@@ -265,40 +245,17 @@ class AdditionDialog(QDialog):
                 QMessageBox.warning(self, "错误", "请至少选择一个学生")
                 return
                 
-            success_count = 0
-            fail_count = 0
-            
-            for student_name in selected_students:
-                record = AdditionRecord(
+            records = [
+                AdditionRecord(
                     student_name=student_name,
                     points=points,
                     reason=reason,
                     start_date=start_date,
                     end_date=end_date
                 )
-                
-                try:
-                    if self.db.add_addition_record(record):
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                except ValueError as e:
-                    QMessageBox.warning(
-                        self,
-                        "错误",
-                        f"学生 {student_name} 加分记录添加失败: {str(e)}"
-                    )
-                    fail_count += 1
-                    
-            if success_count > 0:
-                QMessageBox.information(
-                    self,
-                    "成功",
-                    f"成功添加 {success_count} 条相同分数加分记录，失败 {fail_count} 条"
-                )
-                super().accept()
-            else:
-                QMessageBox.warning(self, "错误", "所有加分记录添加失败")
+                for student_name in selected_students
+            ]
+            self.add_batch_records(records, "相同分数")
         else:
             # 单个学生加分
             student_name = self.student_combo.currentText()
@@ -328,6 +285,29 @@ class AdditionDialog(QDialog):
                     QMessageBox.warning(self, "错误", "加分记录添加失败")
             except ValueError as e:
                 QMessageBox.warning(self, "错误", str(e))
+        
+    def add_batch_records(self, records, batch_name: str):
+        """一次性添加一批加分记录，并在一个消息框中显示结果
+        
+        参数:
+            records: AdditionRecord对象列表
+            batch_name: 批量方式名称，用于提示信息
+        """
+        result = self.db.add_batch_addition_records(records)
+        failures = result['failures']
+        
+        if not result['inserted']:
+            details = "\n".join(f"{failure['student_name']}: {failure['error']}" for failure in failures)
+            QMessageBox.warning(self, "错误", f"所有加分记录添加失败:\n{details}")
+            return
+            
+        message = f"成功添加 {result['inserted']} 条{batch_name}加分记录，失败 {len(failures)} 条"
+        if failures:
+            details = "\n".join(f"{failure['student_name']}: {failure['error']}" for failure in failures)
+            QMessageBox.warning(self, "部分失败", f"{message}\n\n失败明细:\n{details}")
+        else:
+            QMessageBox.information(self, "成功", message)
+        super().accept()
 
 
 class DeleteAdditionDialog(QDialog):
@@ -400,8 +380,8 @@ class DeleteAdditionDialog(QDialog):
             return
             
         for record in self.addition_records:
-            start_date_str = record.start_date.strftime("%Y-%m-%d")
-            end_date_str = record.end_date.strftime("%Y-%m-%d")
+            start_date_str = format_date(record.start_date)
+            end_date_str = format_date(record.end_date)
             item_text = f"{start_date_str} 至 {end_date_str}: {record.points} 分 - {record.reason}"
             item = QListWidgetItem(item_text)
             item.setData(Qt.UserRole, record.id)
@@ -11,7 +11,27 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QDate
 
 from database import Database
-from models import DeductionRecord, CompensationRecord, DeductionType, ViolationType, STUDENT_LIST
+from models import DeductionRecord, CompensationRecord, DeductionType, ViolationType, STUDENT_LIST, format_date
+
+
+def show_batch_result(dialog: QDialog, result: dict):
+    """在一个消息框中显示批量扣分结果(bulk_add_deduction_records的返回值)"""
+    failures = result['failures']
+    if not failures:
+        QMessageBox.information(dialog, "成功", f"批量扣分记录添加成功，共 {result['inserted']} 条")
+        return
+        
+    details = "\n".join(
+        f"{failure['student_name'] or '(未知学生)'}: {failure['error']}" for failure in failures
+    )
+    if result['inserted']:
+        QMessageBox.warning(
+            dialog,
+            "部分失败",
+            f"成功添加 {result['inserted']} 条扣分记录，失败 {len(failures)} 条:\n{details}"
+        )
+    else:
+        QMessageBox.warning(dialog, "错误", f"批量扣分记录添加失败:\n{details}")
 
 
 class ViolationDeductionDialog(QDialog):
@@ -187,11 +207,10 @@ class ViolationDeductionDialog(QDialog):
                 )
                 records.append(record)
                 
-            if self.db.add_batch_deduction_records(records):
-                QMessageBox.information(self, "成功", "批量扣分记录添加成功")
+            result = self.db.bulk_add_deduction_records(records)
+            show_batch_result(self, result)
+            if result['inserted']:
                 super().accept()
-            else:
-                QMessageBox.warning(self, "错误", "批量扣分记录添加失败")
         else:
             # 单个学生扣分
             student_name = self.student_combo.currentText()
@@ -390,11 +409,10 @@ class NonViolationDeductionDialog(QDialog):
                 )
                 records.append(record)
                 
-            if self.db.add_batch_deduction_records(records):
-                QMessageBox.information(self, "成功", "批量扣分记录添加成功")
+            result = self.db.bulk_add_deduction_records(records)
+            show_batch_result(self, result)
+            if result['inserted']:
                 super().accept()
-            else:
-                QMessageBox.warning(self, "错误", "批量扣分记录添加失败")
         else:
             # 单个学生扣分
             student_name = self.student_combo.currentText()
@@ -523,7 +541,7 @@ class CompensationDialog(QDialog):
             return
             
         for record in self.deduction_records:
-            date_str = record.date.strftime("%Y-%m-%d")
+            date_str = format_date(record.date)
             reason = record.violation_behavior if record.deduction_type == DeductionType.VIOLATION else record.treatment_measures
             if reason is None:
                 reason = "无详细原因"
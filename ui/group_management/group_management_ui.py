@@ -171,20 +171,10 @@ class GroupManagementUI(QWidget):
         self.student_selector.clear()
         current_group_id = self.group_selector.currentData()
         if current_group_id:
-            # 查询当前小组成员
-            self.db.cursor.execute(
-                'SELECT student_name FROM student_groups WHERE group_id = ?',
-                (current_group_id,)
-            )
-            current_member_names = [row['student_name'] for row in self.db.cursor.fetchall()]
-            
-            # 获取学生ID
-            current_member_ids = []
-            for name in current_member_names:
-                self.db.cursor.execute('SELECT id FROM students WHERE name = ?', (name,))
-                result = self.db.cursor.fetchone()
-                if result:
-                    current_member_ids.append(result['id'])
+            # 查询当前小组成员的学生ID
+            current_member_ids = [
+                member['student_id'] for member in self.db.get_group_members(current_group_id)
+            ]
             
             all_students = self.db.get_students()
             available_students = [
@@ -201,20 +191,8 @@ class GroupManagementUI(QWidget):
             # 清空表格
             self.member_table.setRowCount(0)
             
-            # 获取成员名称列表
-            self.db.cursor.execute(
-                'SELECT student_name FROM student_groups WHERE group_id = ?',
-                (current_group_id,)
-            )
-            member_names = [row['student_name'] for row in self.db.cursor.fetchall()]
-            
-            # 获取学生ID
-            member_ids = []
-            for name in member_names:
-                self.db.cursor.execute('SELECT id FROM students WHERE name = ?', (name,))
-                result = self.db.cursor.fetchone()
-                if result:
-                    member_ids.append(result['id'])
+            # 获取成员的学生ID
+            member_ids = [member['student_id'] for member in self.db.get_group_members(current_group_id)]
             
             # 设置表格行数
             self.member_table.setRowCount(len(member_ids))
@@ -252,15 +230,8 @@ class GroupManagementUI(QWidget):
         self.ranking_table.setRowCount(len(ranking))
         
         for i, group in enumerate(ranking):
-            # 获取小组ID
-            group_id = group['id']
-            
-            # 查询小组成员数量
-            self.db.cursor.execute(
-                'SELECT COUNT(*) as member_count FROM student_groups WHERE group_id = ?',
-                (group_id,)
-            )
-            member_count = self.db.cursor.fetchone()['member_count']
+            # 成员数随排名一并查询
+            member_count = group['member_count']
             
             # 排名
             rank_item = QTableWidgetItem(str(i + 1))
@@ -425,12 +396,7 @@ class GroupManagementUI(QWidget):
             return
             
         # 检查小组成员数量是否已达到上限
-        self.db.cursor.execute(
-            'SELECT student_name FROM student_groups WHERE group_id = ?',
-            (current_group_id,)
-        )
-        member_names = [row['student_name'] for row in self.db.cursor.fetchall()]
-        if len(member_names) >= 7:
+        if len(self.db.get_group_members(current_group_id)) >= 7:
             QMessageBox.warning(self, "错误", "小组成员已达到上限（最多7人）")
             return
             
@@ -463,7 +429,7 @@ class GroupManagementUI(QWidget):
                 self.db.cursor.execute(
                     'SELECT sg.group_id, g.name FROM student_groups sg '
                     'JOIN groups g ON sg.group_id = g.id '
-                    'WHERE sg.student_name = (SELECT name FROM students WHERE id = ?)',
+                    'WHERE sg.student_id = ?',
                     (student_id,)
                 )
                 existing_group = self.db.cursor.fetchone()
@@ -565,22 +531,12 @@ class GroupManagementUI(QWidget):
                         f.write(f"描述: {group['description']}\n")
                     
                     # 获取小组成员
-                    self.db.cursor.execute(
-                        'SELECT student_name FROM student_groups WHERE group_id = ?',
-                        (group['id'],)
-                    )
-                    member_names = [row['student_name'] for row in self.db.cursor.fetchall()]
-                    f.write(f"成员数: {len(member_names)}\n")
+                    members = self.db.get_group_members(group['id'])
+                    f.write(f"成员数: {len(members)}\n")
                     f.write("成员列表:\n")
                     
-                    for member_name in member_names:
-                        self.db.cursor.execute('SELECT * FROM students WHERE name = ?', (member_name,))
-                        student_row = self.db.cursor.fetchone()
-                        if student_row:
-                            student_id = student_row['id']
-                            student = self.db.get_student_by_id(student_id)
-                        if student:
-                            f.write(f"  - {student.name} (ID: {student.id})\n")
+                    for member in members:
+                        f.write(f"  - {member['student_name']} (ID: {member['student_id']})\n")
                     
                     f.write("\n")  # 小组间空行
             
@@ -105,15 +105,8 @@ class GroupRankingByDateRangeDialog(RankingDialogBase):
         
         # 填充数据
         for i, group in enumerate(ranking):
-            # 获取小组ID
-            group_id = group['id']
-            
-            # 查询小组成员数量
-            self.db.cursor.execute(
-                'SELECT COUNT(*) as member_count FROM student_groups WHERE group_id = ?',
-                (group_id,)
-            )
-            member_count = self.db.cursor.fetchone()['member_count']
+            # 成员数随排名一并查询
+            member_count = group['member_count']
             
             # 排名
             rank = str(i + 1)
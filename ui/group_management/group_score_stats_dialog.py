@@ -5,6 +5,8 @@ from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor
 import datetime
 
+from ui.query_worker import QueryRunner
+
 class GroupScoreStatsDialog(QDialog):
     """小组分数统计对话框"""
     
@@ -12,6 +14,7 @@ class GroupScoreStatsDialog(QDialog):
         super().__init__(parent)
         self.db = db
         self.group_id = group_id
+        self.query_runner = QueryRunner(db, self)
         
         # 获取小组信息
         groups = self.db.get_groups()
@@ -24,6 +27,11 @@ class GroupScoreStatsDialog(QDialog):
         self.init_ui()
         self.update_stats()
         
+    def done(self, result):
+        """关闭对话框时取消尚未完成的查询"""
+        self.query_runner.cancel()
+        super().done(result)
+        
     def init_ui(self):
         """初始化UI"""
         layout = QVBoxLayout()
@@ -150,39 +158,46 @@ class GroupScoreStatsDialog(QDialog):
             QMessageBox.warning(self, "错误", f"日期格式无效: {e}")
             return
         
-        # 获取小组成员
-        members = self.db.get_group_members(self.group_id)
-        member_count = len(members)
+        # 在后台线程中统计，完成后由show_stats显示
+        self.query_runner.run(
+            lambda db: self.query_stats(db, start_date_str, end_date_str),
+            self.show_stats,
+            lambda error: QMessageBox.warning(self, "错误", f"统计失败: {error}")
+        )
         
-        if member_count == 0:
-            return
+    def query_stats(self, db, start_date_str, end_date_str):
+        """查询小组成员及其在指定时间段内的加分(在后台线程中执行)
         
-        # 获取小组在指定时间段内的加分记录
-        addition_records = self.db.get_group_addition_records(
-            self.group_id, 
-            start_date_str,  # 使用格式化后的日期字符串
-            end_date_str     # 使用格式化后的日期字符串
+        返回:
+            (小组成员列表, 小组总分, {学生ID: 个人得分})
+        """
+        # 获取小组成员
+        members = db.get_group_members(self.group_id)
+        if not members:
+            return members, 0, {}
+        
+        # 一次读取全部成员在指定时间段内的加分记录(按列)，不再逐个学生查询
+        additions = db.get_addition_batch(
+            start_date_str,
+            end_date_str,
+            [member['student_id'] for member in members]
         )
         
-        # 计算总分
-        group_total_score = sum(record.get('points', 0) for record in addition_records)
+        # 计算总分和每个学生的个人得分
+        group_total_score = sum(additions.column('points'))
+        student_scores = additions.group_sum('student_id', 'points')
+            
+        return members, group_total_score, student_scores
         
+    def show_stats(self, stats):
+        """显示统计结果"""
+        members, group_total_score, student_scores = stats
+        if not members:
+            return
+            
         # 清空表格
         self.stats_table.setRowCount(0)
         
-        # 获取每个学生的个人得分
-        student_scores = {}
-        for member in members:
-            student_id = member['student_id']
-            # 获取学生在指定时间段内的个人加分记录
-            student_records = self.db.get_student_addition_records(
-                student_id,
-                start_date_str,
-                end_date_str
-            )
-            # 计算学生个人得分
-            student_scores[student_id] = sum(record.get('points', 0) for record in student_records)
-        
         # 填充表格
         for i, member in enumerate(members):
             # 直接使用成员信息，不需要再次查询
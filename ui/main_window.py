@@ -4,33 +4,81 @@
 import os
 import sys
 import json
+from typing import Optional
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QAction, QToolBar, QStatusBar, QLabel, QTableWidget, 
-    QTableWidgetItem, QHeaderView, QMessageBox, QInputDialog,
+    QTableWidgetItem, QTableView, QAbstractItemView, QHeaderView, QMessageBox, QInputDialog,
     QLineEdit, QComboBox, QPushButton, QFileDialog, QDialogButtonBox,
     QDialog
 )
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QTimer
 from PyQt5.QtGui import QIcon, QFont
 
 from database import Database
-from models import Student, DeductionRecord, CompensationRecord, AdditionRecord, DeductionType, STUDENT_LIST
+from data_archive import ARCHIVE_SUFFIX, export_archive, import_archive
+from data_export import export_json
+from data_import import import_json
+from models import (
+    Student, DeductionRecord, CompensationRecord, AdditionRecord, DeductionType, STUDENT_LIST,
+    date_to_day, day_to_str
+)
+from score_statistics import numpy_available
 from ui.deduction_dialog import ViolationDeductionDialog, NonViolationDeductionDialog, CompensationDialog
 from ui.search_dialog import DeductionSearchDialog, AdditionSearchDialog
 from ui.violation_count_dialog import ViolationCountDialog
 from ui.addition_dialog import AdditionDialog, DeleteAdditionDialog
 from ui.ranking_dialog import DeductionRankingDialog, AdditionRankingDialog, TotalScoreRankingDialog
+from ui.statistics_dialog import StatisticsDialog
 from ui.student_dialog import InitialScoreDialog
+from ui.query_worker import QueryRunner, close_thread_databases
+from ui.record_table_model import RecordColumn, RecordTableModel
+
+# 主窗口记录表格的列，每行是update_records_table中生成的字典
+RECORDS_TABLE_COLUMNS = [
+    RecordColumn("类型", lambda r: r["type"]),
+    RecordColumn("姓名", lambda r: r["name"]),
+    RecordColumn("分数", lambda r: r["points"], 'f', lambda points: f"{points:.1f}",
+                 alignment=Qt.AlignCenter,
+                 # 扣分为红色，加分为绿色
+                 foreground=lambda points: Qt.red if points < 0 else Qt.darkGreen),
+    RecordColumn("原因", lambda r: r["reason"] or ""),
+    RecordColumn("日期", lambda r: date_to_day(r["date"]), 'i', day_to_str,
+                 alignment=Qt.AlignCenter),
+    RecordColumn("违规类型", lambda r: r.get("violation_type", "")),
+]
+
+
+def backup_progress(report, message: str):
+    """把在线备份的进度回调(status, remaining, total)转换为(说明, 百分比)报告给GUI线程"""
+    return lambda status, remaining, total: report((message, 100 * (total - remaining) // max(total, 1)))
+
+
+def restore_snapshot_task(db: Database, path: str, report) -> None:
+    """为当前数据创建快照后恢复path处的快照(在后台线程中执行)"""
+    db.create_snapshot(progress=backup_progress(report, "正在为当前数据创建快照"))
+    db.restore_snapshot(path, progress=backup_progress(report, "正在恢复快照"))
+
+
+def delete_all_data_task(db: Database, report) -> None:
+    """为当前数据创建快照后删除所有数据(在后台线程中执行)"""
+    db.create_snapshot(progress=backup_progress(report, "正在为当前数据创建快照"))
+    if not db.delete_all_data():
+        raise RuntimeError("数据库操作失败")
+
 
 class MainWindow(QMainWindow):
     """主窗口"""
     
+    SNAPSHOT_CHECK_INTERVAL = 10 * 60 * 1000  # 检查是否需要自动快照的间隔(毫秒)
+    
     def __init__(self, db=None):
         super().__init__()
         
         # 初始化数据库
         self.db = db if db is not None else Database()
+        self.data_runner = QueryRunner(self.db, self)  # 导入和导出
+        self.snapshot_runner = QueryRunner(self.db, self)
         
         # 设置窗口属性
         self.setWindowTitle("学生积分管理系统")
@@ -42,6 +90,20 @@ class MainWindow(QMainWindow):
         # 加载数据
         self.load_data()
         
+        # 定时自动快照: 启动时及之后每隔一段时间检查，距上次快照超过Database.SNAPSHOT_INTERVAL时创建
+        if self.db.db_path != ':memory:':
+            self.snapshot_timer = QTimer(self)
+            self.snapshot_timer.timeout.connect(self.run_auto_snapshot)
+            self.snapshot_timer.start(self.SNAPSHOT_CHECK_INTERVAL)
+            QTimer.singleShot(0, self.run_auto_snapshot)
+        
+    def closeEvent(self, event):
+        """关闭窗口时取消后台任务，关闭后台线程的数据库连接"""
+        self.data_runner.cancel()
+        self.snapshot_runner.cancel()
+        close_thread_databases(self.db)
+        super().closeEvent(event)
+        
     def init_ui(self):
         """初始化UI"""
         # 创建中央部件
@@ -155,6 +217,11 @@ class MainWindow(QMainWindow):
         total_ranking_action.triggered.connect(self.show_total_ranking_dialog)
         ranking_menu.addAction(total_ranking_action)
         
+        ranking_menu.addSeparator()
+        statistics_action = QAction("统计分析", self)
+        statistics_action.triggered.connect(self.show_statistics_dialog)
+        ranking_menu.addAction(statistics_action)
+        
         # 设置菜单
         settings_menu = menu_bar.addMenu("设置")
         
@@ -181,6 +248,18 @@ class MainWindow(QMainWindow):
         import_action.triggered.connect(self.import_data)
         data_menu.addAction(import_action)
         
+        data_menu.addSeparator()
+        
+        snapshot_action = QAction("创建快照", self)
+        snapshot_action.triggered.connect(self.create_snapshot)
+        data_menu.addAction(snapshot_action)
+        
+        restore_action = QAction("恢复快照", self)
+        restore_action.triggered.connect(self.restore_snapshot)
+        data_menu.addAction(restore_action)
+        
+        data_menu.addSeparator()
+        
         # 清除数据选项
         clear_action = QAction("清除数据", self)
         clear_action.triggered.connect(self.show_clear_data_dialog)
@@ -202,6 +281,7 @@ class MainWindow(QMainWindow):
         tool_bar = QToolBar("工具栏")
         tool_bar.setIconSize(QSize(32, 32))
         self.addToolBar(tool_bar)
+        self.tool_bar = tool_bar
         
         # 违规扣分
         violation_action = QAction("违规扣分", self)
@@ -270,16 +350,16 @@ class MainWindow(QMainWindow):
         
     def create_records_table(self):
         """创建记录表格"""
-        self.records_table = QTableWidget()
-        self.records_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.records_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.records_model = RecordTableModel(RECORDS_TABLE_COLUMNS, self)
+        self.records_table = QTableView()
+        self.records_table.setModel(self.records_model)
+        self.records_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.records_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.records_table.setAlternatingRowColors(True)
-        
-        # 设置表头
-        headers = ["类型", "姓名", "分数", "原因", "日期", "违规类型"]
-        self.records_table.setColumnCount(len(headers))
-        self.records_table.setHorizontalHeaderLabels(headers)
         self.records_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # 点击表头时在模型中排序，初始保持按日期倒序
+        self.records_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.records_table.setSortingEnabled(True)
         
     def load_data(self):
         """加载数据"""
@@ -299,24 +379,18 @@ class MainWindow(QMainWindow):
         
     def update_student_table(self, student_name: str):
         """更新学生信息表格"""
-        student = self.db.get_student(student_name)
-        if not student:
+        # 从学生积分汇总表读取加分、扣分总分和总分
+        summary = self.db.get_student_score_summary(student_name)
+        if not summary:
             return
             
-        # 获取扣分总分
-        deduction_records = self.db.get_deduction_records(student_name)
-        deduction_points = sum(record.points for record in deduction_records)
-        
-        # 获取加分总分
-        addition_records = self.db.get_addition_records(student_name)
-        addition_points = sum(record.points for record in addition_records)
-        
-        # 计算总分
-        total_score = student.initial_score - deduction_points + addition_points
+        deduction_points = summary['deduction_points']
+        addition_points = summary['addition_points']
+        total_score = summary['total_score']
         
         # 更新表格
         self.student_table.setItem(0, 0, QTableWidgetItem(student_name))
-        self.student_table.setItem(0, 1, QTableWidgetItem(f"{student.initial_score:.1f}"))
+        self.student_table.setItem(0, 1, QTableWidgetItem(f"{summary['initial_score']:.1f}"))
         self.student_table.setItem(0, 2, QTableWidgetItem(f"{deduction_points:.1f}"))
         self.student_table.setItem(0, 3, QTableWidgetItem(f"{addition_points:.1f}"))
         self.student_table.setItem(0, 4, QTableWidgetItem(f"{total_score:.1f}"))
@@ -353,7 +427,7 @@ class MainWindow(QMainWindow):
                 "points": -record.points,  # 扣分为负数
                 "reason": record.violation_behavior if record.deduction_type == DeductionType.VIOLATION else record.treatment_measures,
                 "date": record.date,
-                "record": record,
+                "name": record.student_name,
                 "violation_type": type_str
             })
             
@@ -364,47 +438,15 @@ class MainWindow(QMainWindow):
                 "points": record.points,
                 "reason": record.reason,
                 "date": record.start_date,  # 使用开始日期
-                "record": record
+                "name": record.student_name
             })
             
         # 按日期排序
         all_records.sort(key=lambda x: x["date"], reverse=True)
         
-        # 更新表格
-        self.records_table.setRowCount(len(all_records))
-        
-        for i, record in enumerate(all_records):
-            # 类型
-            type_item = QTableWidgetItem(record["type"])
-            self.records_table.setItem(i, 0, type_item)
-            
-            # 姓名
-            name_item = QTableWidgetItem(record["record"].student_name)
-            self.records_table.setItem(i, 1, name_item)
-            
-            # 分数
-            points_item = QTableWidgetItem(f"{record['points']:.1f}")
-            points_item.setTextAlignment(Qt.AlignCenter)
-            # 设置颜色：扣分为红色，加分为绿色
-            if record['points'] < 0:
-                points_item.setForeground(Qt.red)
-            else:
-                points_item.setForeground(Qt.darkGreen)
-            self.records_table.setItem(i, 2, points_item)
-            
-            # 原因
-            reason_item = QTableWidgetItem(record["reason"])
-            self.records_table.setItem(i, 3, reason_item)
-            
-            # 日期
-            date_item = QTableWidgetItem(record["date"].strftime("%Y-%m-%d"))
-            date_item.setTextAlignment(Qt.AlignCenter)
-            self.records_table.setItem(i, 4, date_item)
-            
-            # 违规类型
-            if "violation_type" in record:
-                violation_item = QTableWidgetItem(record["violation_type"])
-                self.records_table.setItem(i, 5, violation_item)
+        # 更新表格，模型按列保存，单元格文本在绘制可见行时才生成
+        self.records_model.set_records(all_records)
+        self.records_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
             
     # 对话框显示方法
     def show_violation_deduction_dialog(self):
@@ -452,6 +494,14 @@ class MainWindow(QMainWindow):
         dialog = TotalScoreRankingDialog(self.db, self)
         dialog.exec_()
         
+    def show_statistics_dialog(self):
+        """显示统计分析对话框"""
+        if not numpy_available():
+            QMessageBox.warning(self, "警告", "统计分析需要安装NumPy")
+            return
+        dialog = StatisticsDialog(self.db, self)
+        dialog.exec_()
+        
     def show_deduction_search_dialog(self):
         """显示扣分记录查询对话框"""
         dialog = DeductionSearchDialog(self.db, self)
@@ -520,71 +570,71 @@ class MainWindow(QMainWindow):
             
     def export_data(self):
         """导出数据"""
+        # 新的任务会取消尚未完成的导入或导出，因此在此期间不接受新的导出
+        if self.data_runner.is_running():
+            QMessageBox.information(self, "提示", "正在导入或导出数据，请等待当前操作完成")
+            return
+            
         # 选择保存文件
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "导出数据",
             "",
-            "JSON文件 (*.json)"
+            f"JSON文件 (*.json);;归档文件 (*{ARCHIVE_SUFFIX})"
         )
         
         if not file_path:
             return
             
-        try:
-            # 获取所有学生
-            students = self.db.get_students()
-            students_data = [student.to_dict() for student in students]
-            
-            # 获取所有扣分记录
-            all_deduction_records = []
-            for student in students:
-                records = self.db.get_deduction_records(student.name)
-                all_deduction_records.extend([record.to_dict() for record in records])
-                
-            # 获取所有补偿记录
-            all_compensation_records = []
-            for student in students:
-                records = self.db.get_student_compensation_records(student.name)
-                all_compensation_records.extend([record.to_dict() for record in records])
-                
-            # 获取所有加分记录
-            all_addition_records = []
-            for student in students:
-                records = self.db.get_addition_records(student.name)
-                all_addition_records.extend([record.to_dict() for record in records])
-                
-            # 获取配置
-            self.db.cursor.execute('SELECT * FROM config')
-            config_rows = self.db.cursor.fetchall()
-            config_data = {row['key']: row['value'] for row in config_rows}
-            
-            # 组合数据
-            export_data = {
-                "students": students_data,
-                "deduction_records": all_deduction_records,
-                "compensation_records": all_compensation_records,
-                "addition_records": all_addition_records,
-                "config": config_data
-            }
-            
-            # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
-                
-            QMessageBox.information(self, "成功", "数据导出成功")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"导出数据失败: {str(e)}")
+        # 在后台线程中逐表读取数据并写入文件；归档文件按列存储，体积更小，导入更快
+        export = export_archive if file_path.endswith(ARCHIVE_SUFFIX) else export_json
+        self.status_bar.showMessage("正在导出数据...")
+        self.data_runner.run(
+            lambda db: export(db, file_path),
+            self.on_export_finished,
+            self.on_export_failed
+        )
+        
+    def on_export_finished(self, _):
+        """导出完成"""
+        self.status_bar.showMessage("就绪")
+        QMessageBox.information(self, "成功", "数据导出成功")
+        
+    def on_export_failed(self, error: str):
+        """导出失败"""
+        self.status_bar.showMessage("就绪")
+        QMessageBox.critical(self, "错误", f"导出数据失败: {error}")
+        
+    def set_busy(self, message: Optional[str] = None):
+        """后台任务替换整个数据库期间禁用界面并在状态栏显示message；message为None时恢复"""
+        for widget in (self.centralWidget(), self.menuBar(), self.tool_bar):
+            widget.setEnabled(message is None)
+        self.status_bar.showMessage(message or "就绪")
+        
+    def background_task_running(self) -> bool:
+        """是否有尚未完成的导入导出或快照任务，有则提示用户等待"""
+        if self.data_runner.is_running() or self.snapshot_runner.is_running():
+            QMessageBox.information(self, "提示", "正在处理数据或快照，请等待当前操作完成")
+            return True
+        return False
+        
+    def show_progress(self, progress: tuple):
+        """在状态栏显示后台任务的进度(说明, 百分比)"""
+        message, percent = progress
+        self.status_bar.showMessage(f"{message}... {percent}%")
         
     def import_data(self):
         """导入数据"""
+        # 导入会替换整个数据库，不能与其他导入导出或快照操作同时进行
+        if self.background_task_running():
+            return
+            
         # 选择导入文件
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "导入数据",
             "",
-            "JSON文件 (*.json)"
+            f"JSON文件 (*.json);;归档文件 (*{ARCHIVE_SUFFIX})"
         )
         
         if not file_path:
@@ -602,88 +652,109 @@ class MainWindow(QMainWindow):
         if reply != QMessageBox.Yes:
             return
             
-        try:
-            # 读取文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                import_data = json.load(f)
-                
-            # 验证数据格式
-            required_keys = ["students", "deduction_records", "compensation_records", "addition_records", "config"]
-            for key in required_keys:
-                if key not in import_data:
-                    raise ValueError(f"导入文件缺少必要的数据: {key}")
-                    
-            # 关闭当前数据库连接
-            self.db.close()
-            
-            # 备份当前数据库
-            backup_path = self.db.db_path + ".bak"
-            if os.path.exists(self.db.db_path):
-                import shutil
-                shutil.copy2(self.db.db_path, backup_path)
-                
-            # 删除当前数据库
-            if os.path.exists(self.db.db_path):
-                os.remove(self.db.db_path)
-                
-            # 重新连接数据库（会创建新的数据库文件）
-            self.db.connect()
-            self.db.init_db()
-            
-            # 导入学生数据
-            for student_data in import_data["students"]:
-                student = Student.from_dict(student_data)
-                self.db.update_student_initial_score(student.name, student.initial_score)
-                
-            # 导入扣分记录
-            for record_data in import_data["deduction_records"]:
-                record = DeductionRecord.from_dict(record_data)
-                self.db.add_deduction_record(record)
-                
-            # 导入补偿记录
-            for record_data in import_data["compensation_records"]:
-                record = CompensationRecord.from_dict(record_data)
-                self.db.add_compensation_record(record)
-                
-            # 导入加分记录
-            for record_data in import_data["addition_records"]:
-                record = AdditionRecord.from_dict(record_data)
-                try:
-                    self.db.add_addition_record(record)
-                except ValueError:
-                    # 忽略时间重叠的加分记录
-                    pass
-                    
-            # 导入配置
-            for key, value in import_data["config"].items():
-                self.db.cursor.execute(
-                    'INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)',
-                    (key, value)
-                )
-                
-            self.db.conn.commit()
-            
-            QMessageBox.information(self, "成功", "数据导入成功")
-            
-            # 刷新界面
-            self.load_data()
+        # 在后台线程中先校验整个文件，再在一个事务中替换全部数据；失败时数据库保持不变
+        load = import_archive if file_path.endswith(ARCHIVE_SUFFIX) else import_json
+        self.set_busy("正在导入数据...")
+        self.data_runner.run(
+            lambda db: load(db, file_path),
+            self.on_import_finished,
+            self.on_import_failed
+        )
+        
+    def on_import_finished(self, report: dict):
+        """导入完成"""
+        self.set_busy(None)
+        QMessageBox.information(
+            self, "成功",
+            f"数据导入成功，共{report['total']}条记录，"
+            f"耗时{report['seconds']:.2f}秒({report['rows_per_second']:.0f}条/秒)"
+        )
+        
+        # 刷新界面
+        self.load_data()
+        
+    def on_import_failed(self, error: str):
+        """导入失败"""
+        self.set_busy(None)
+        QMessageBox.critical(self, "错误", f"导入数据失败: {error}")
+
+    def run_auto_snapshot(self):
+        """在后台线程中按需创建自动快照并清理旧快照"""
+        if self.snapshot_runner.is_running():
+            return
+        self.snapshot_runner.run(lambda db: db.auto_snapshot(), lambda _: None)
+        
+    def create_snapshot(self):
+        """立即创建快照"""
+        if self.background_task_running():
+            return
+        self.status_bar.showMessage("正在创建快照...")
+        self.snapshot_runner.run(
+            lambda db, report: db.create_snapshot(progress=backup_progress(report, "正在创建快照")),
+            self.on_snapshot_finished,
+            self.on_snapshot_failed,
+            self.show_progress
+        )
+        
+    def on_snapshot_finished(self, path: str):
+        """快照创建完成"""
+        self.status_bar.showMessage("就绪")
+        QMessageBox.information(self, "成功", f"快照已保存到: {path}")
+        
+    def on_snapshot_failed(self, error: str):
+        """快照创建失败"""
+        self.status_bar.showMessage("就绪")
+        QMessageBox.critical(self, "错误", f"创建快照失败: {error}")
+        
+    def restore_snapshot(self):
+        """选择快照并恢复"""
+        if self.background_task_running():
+            return
+        snapshots = self.db.list_snapshots()
+        if not snapshots:
+            QMessageBox.information(self, "提示", "还没有任何快照")
+            return
             
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"导入数据失败: {str(e)}")
+        labels = [
+            f"{snapshot['created_at'].strftime('%Y-%m-%d %H:%M:%S')} ({snapshot['size'] / 1024:.0f} KB)"
+            for snapshot in snapshots
+        ]
+        label, ok = QInputDialog.getItem(self, "恢复快照", "选择要恢复的快照:", labels, 0, False)
+        if not ok:
+            return
+        snapshot = snapshots[labels.index(label)]
+        
+        reply = QMessageBox.question(
+            self,
+            "确认恢复",
+            "恢复快照将覆盖当前数据库中的所有数据(恢复前会为当前数据创建快照)，确定要继续吗？",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
             
-            # 尝试恢复备份
-            if os.path.exists(backup_path):
-                try:
-                    self.db.close()
-                    if os.path.exists(self.db.db_path):
-                        os.remove(self.db.db_path)
-                    import shutil
-                    shutil.copy2(backup_path, self.db.db_path)
-                    self.db.connect()
-                    QMessageBox.information(self, "恢复", "已恢复到导入前的数据")
-                except Exception as restore_error:
-                    QMessageBox.critical(self, "错误", f"恢复备份失败: {str(restore_error)}")
-
+        # 在后台线程中逐步复制并报告进度，完成前禁用界面
+        path = snapshot['path']
+        self.set_busy("正在恢复快照...")
+        self.snapshot_runner.run(
+            lambda db, report: restore_snapshot_task(db, path, report),
+            self.on_restore_finished,
+            self.on_restore_failed,
+            self.show_progress
+        )
+        
+    def on_restore_finished(self, _):
+        """快照恢复完成"""
+        self.set_busy(None)
+        QMessageBox.information(self, "成功", "快照恢复成功")
+        self.load_data()
+        
+    def on_restore_failed(self, error: str):
+        """快照恢复失败，当前数据库未被修改"""
+        self.set_busy(None)
+        QMessageBox.critical(self, "错误", f"恢复快照失败: {error}")
+        
     def show_group_management(self):
         """显示小组管理界面"""
         from ui.group_management.group_management_ui import GroupManagementUI
@@ -710,29 +781,46 @@ class MainWindow(QMainWindow):
         
     def delete_all_data(self):
         """删除所有数据"""
+        if self.background_task_running():
+            return
+            
         # 确认对话框
         reply = QMessageBox.question(
             self,
             "确认删除",
-            "确定要删除所有数据吗？此操作不可恢复！",
+            "确定要删除所有数据吗？删除前会为当前数据创建快照，可通过“恢复快照”找回。",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
         
-        if reply == QMessageBox.StandardButton.Yes:
-            try:
-                # 关闭当前数据库连接
-                self.db.close()
-                
-                # 删除数据库文件
-                if os.path.exists(self.db.db_path):
-                    os.remove(self.db.db_path)
-                
-                # 重新创建数据库
-                self.db.connect()
-                self.db.init_db()
-                
-                QMessageBox.information(self, "成功", "所有数据已删除")
-                self.load_data()
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"删除数据失败: {str(e)}")
\ No newline at end of file
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+            
+        # 在一个事务中清空所有数据表，不再关闭连接、删除数据库文件
+        if self.db.db_path == ':memory:':
+            # 内存数据库无法创建快照，也不能在其他线程中打开
+            if self.db.delete_all_data():
+                self.on_delete_finished(None)
+            else:
+                self.on_delete_failed("数据库操作失败")
+            return
+            
+        # 删除前的快照在后台线程中创建并报告进度，完成前禁用界面
+        self.set_busy("正在删除所有数据...")
+        self.snapshot_runner.run(
+            delete_all_data_task,
+            self.on_delete_finished,
+            self.on_delete_failed,
+            self.show_progress
+        )
+        
+    def on_delete_finished(self, _):
+        """所有数据已删除"""
+        self.set_busy(None)
+        QMessageBox.information(self, "成功", "所有数据已删除")
+        self.load_data()
+        
+    def on_delete_failed(self, error: str):
+        """删除所有数据失败"""
+        self.set_busy(None)
+        QMessageBox.critical(self, "错误", f"删除数据失败: {error}")
\ No newline at end of file
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import weakref
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from database import Database
+
+
+# 查询使用的线程池。线程池的线程不是由Python创建的，threading.local中的数据在每次任务结束后
+# 就会丢失，因此每个线程的Database对象以线程ID为键保存；线程不会因空闲而退出，
+# 线程数和每个数据库的连接数都不超过最大线程数，线程ID也不会被新线程复用
+_thread_pool = None
+MAX_QUERY_THREADS = 4  # 导出、快照和对话框的查询可以同时进行
+
+# 主数据库对象 -> {线程ID: 该线程使用的clone()}。以对象本身为弱引用键，
+# 主数据库对象被释放后条目随之删除，不会因id()被复用而取到其他数据库的连接
+_thread_databases = weakref.WeakKeyDictionary()
+_thread_databases_lock = threading.Lock()
+
+
+def _pool() -> QThreadPool:
+    """获取查询使用的线程池，首次调用时创建"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setExpiryTimeout(-1)
+        _thread_pool.setMaxThreadCount(MAX_QUERY_THREADS)
+    return _thread_pool
+
+
+def _thread_database(db: Database) -> Database:
+    """获取当前线程中与db共享缓存的Database对象，首次调用时创建"""
+    ident = threading.get_ident()
+    with _thread_databases_lock:
+        thread_db = _thread_databases.setdefault(db, {}).get(ident)
+    if thread_db is None or thread_db.conn is None:
+        # 首次使用，或db关闭时已关闭了本线程的连接(例如删除数据库文件后重新连接)
+        thread_db = db.clone()
+        with _thread_databases_lock:
+            _thread_databases.setdefault(db, {})[ident] = thread_db
+    return thread_db
+
+
+def close_thread_databases(db: Database):
+    """等待线程池中的查询结束，关闭各线程为db打开的连接
+
+    在GUI线程中调用，例如主窗口关闭时；之后再提交的查询会重新打开连接。
+    调用前应先取消尚未完成的查询，否则需等待其执行完毕。
+    """
+    _pool().waitForDone()
+    with _thread_databases_lock:
+        clones = _thread_databases.pop(db, {})
+    for clone in clones.values():
+        clone.close()
+
+
+class _QuerySignals(QObject):
+    """查询任务完成时发出的信号"""
+    finished = pyqtSignal(int, object)  # (查询编号, 结果)
+    failed = pyqtSignal(int, str)       # (查询编号, 错误信息)
+    progress = pyqtSignal(int, object)  # (查询编号, 进度)
+
+
+class _QueryTask(QRunnable):
+    """在线程池中执行一次查询"""
+
+    def __init__(self, db: Database, func: Callable[..., Any], ticket: int, signals: _QuerySignals,
+                 reports_progress: bool = False):
+        super().__init__()
+        self.db = db
+        self.func = func
+        self.ticket = ticket
+        self.signals = signals
+        self.reports_progress = reports_progress
+        self.cancelled = False
+        self._running_db = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消任务；任务正在执行查询时中断该查询"""
+        with self._lock:
+            self.cancelled = True
+            if self._running_db is not None:
+                self._running_db.read_conn.interrupt()
+
+    def report_progress(self, value: Any):
+        """在后台线程中报告进度，由GUI线程的on_progress显示"""
+        if not self.cancelled:
+            self.signals.progress.emit(self.ticket, value)
+
+    def run(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            thread_db = _thread_database(self.db)
+            self._running_db = thread_db
+        try:
+            if self.reports_progress:
+                result = self.func(thread_db, self.report_progress)
+            else:
+                result = self.func(thread_db)
+        except Exception as e:
+            error = str(e)
+            result = None
+        else:
+            error = None
+        finally:
+            with self._lock:
+                self._running_db = None
+
+        if self.cancelled:
+            return
+        if error is None:
+            self.signals.finished.emit(self.ticket, result)
+        else:
+            self.signals.failed.emit(self.ticket, error)
+
+
+class QueryRunner(QObject):
+    """在后台线程中执行数据库查询，并在GUI线程中回调结果
+
+    每个对话框持有一个QueryRunner。查询函数以当前线程的Database对象为参数，
+    在线程池中执行；结果通过Qt信号送回GUI线程后调用on_result。
+    新提交的查询会取代尚未完成的旧查询，旧查询的结果被丢弃；
+    对话框关闭时调用cancel()取消全部查询。
+    """
+
+    def __init__(self, db: Database, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.db = db
+        self._ticket = 0
+        self._task = None
+        self._callbacks = None
+
+        self._signals = _QuerySignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._signals.progress.connect(self._on_progress)
+
+    def run(self, func: Callable[..., Any],
+            on_result: Callable[[Any], None],
+            on_error: Optional[Callable[[str], None]] = None,
+            on_progress: Optional[Callable[[Any], None]] = None) -> int:
+        """提交查询
+
+        参数:
+            func: 在后台线程中执行的函数，参数为该线程的Database对象，返回查询结果；
+                  提供on_progress时还以报告进度的函数为第二个参数
+            on_result: 查询成功后在GUI线程中以结果为参数调用
+            on_error: 查询失败后在GUI线程中以错误信息为参数调用
+            on_progress: func报告进度后在GUI线程中以进度为参数调用
+
+        返回:
+            查询编号
+        """
+        self.cancel()
+        self._ticket += 1
+        self._callbacks = (on_result, on_error, on_progress)
+        self._task = _QueryTask(self.db, func, self._ticket, self._signals, on_progress is not None)
+        _pool().start(self._task)
+        return self._ticket
+
+    def cancel(self):
+        """取消尚未完成的查询，其结果不会再回调"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._callbacks = None
+
+    def is_running(self) -> bool:
+        """是否有尚未完成的查询"""
+        return self._task is not None
+
+    def _on_finished(self, ticket: int, result: Any):
+        if ticket != self._ticket or self._callbacks is None:
+            return  # 已被取消或被更新的查询取代
+        on_result, _, _ = self._callbacks
+        self._task = None
+        self._callbacks = None
+        on_result(result)
+
+    def _on_failed(self, ticket: int, error: str):
+        if ticket != self._ticket or self._callbacks is None:
+            return
+        _, on_error, _ = self._callbacks
+        self._task = None
+        self._callbacks = None
+        if on_error is not None:
+            on_error(error)
+        else:
+            print(f"后台查询失败: {error}")
+
+    def _on_progress(self, ticket: int, value: Any):
+        if ticket != self._ticket or self._callbacks is None:
+            return
+        self._callbacks[2](value)
@@ -4,12 +4,13 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
     QTableWidget, QTableWidgetItem, QHeaderView,
-    QPushButton, QDialogButtonBox
+    QPushButton, QDialogButtonBox, QMessageBox
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 from database import Database
+from ui.query_worker import QueryRunner
 
 
 class RankingDialogBase(QDialog):
@@ -18,6 +19,7 @@ class RankingDialogBase(QDialog):
     def __init__(self, db: Database, title: str, parent=None):
         super().__init__(parent)
         self.db = db
+        self.query_runner = QueryRunner(db, self)
         
         self.setWindowTitle(title)
         self.setMinimumWidth(600)
@@ -46,6 +48,15 @@ class RankingDialogBase(QDialog):
         """加载数据（子类实现）"""
         pass
         
+    def done(self, result):
+        """关闭对话框时取消尚未完成的查询"""
+        self.query_runner.cancel()
+        super().done(result)
+        
+    def show_error(self, error: str):
+        """显示后台查询的错误"""
+        QMessageBox.critical(self, "错误", f"加载数据失败: {error}")
+        
     def setup_table(self, headers):
         """设置表格"""
         self.table.setColumnCount(len(headers))
@@ -219,15 +230,17 @@ class TotalScoreRankingDialog(RankingDialogBase):
         headers = ["排名", "学生", "初始分数", "扣分总分", "加分总分", "总分"]
         self.setup_table(headers)
         
-        # 获取总分排名
-        ranking = self.db.get_total_score_ranking()
+        # 在后台线程中获取总分排名
+        self.query_runner.run(lambda db: db.get_total_score_ranking(), self.show_ranking, self.show_error)
         
+    def show_ranking(self, ranking):
+        """显示总分排名"""
         # 设置行数
         self.table.setRowCount(len(ranking))
         
         # 填充数据
         for i, student_data in enumerate(ranking):
-            rank = str(i + 1)
+            rank = str(student_data['rank'])  # 总分相同的学生名次相同
             student_name = student_data['name']
             initial_score = student_data['initial_score']
             deduction_points = student_data['deduction_points']
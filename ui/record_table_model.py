@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from typing import Any, Callable, Iterable, List, Optional
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush, QColor
+
+from record_batch import RecordBatch
+
+
+class RecordColumn:
+    """表格中的一列：从记录取出保存的值，以及如何显示、对齐和设置文字颜色"""
+
+    def __init__(self, header: str, value: Callable[[Any], Any], kind: str = 's',
+                 text: Optional[Callable[[Any], str]] = None,
+                 alignment: Optional[int] = None,
+                 foreground: Optional[Callable[[Any], Any]] = None):
+        """
+        参数:
+            header: 表头文字，同一表格中不能重复
+            value: 以记录为参数，返回该列保存的值(不能为None)，加载时每条记录只调用一次
+            kind: 值的类型，'i'(整数，如日期天数)、'f'(分数)或's'(文本)，排序按保存的值进行
+            text: 以保存的值为参数，返回单元格显示的文本，默认为str(值)
+            alignment: 单元格文本对齐方式，默认左对齐
+            foreground: 以保存的值为参数，返回文字颜色(Qt.GlobalColor或QColor)，返回None时使用默认颜色
+        """
+        self.header = header
+        self.value = value
+        self.kind = kind
+        self.text = text or str
+        self.alignment = alignment
+        self.foreground = foreground
+
+
+def records_to_batch(columns: List[RecordColumn], record_chunks: Iterable[list]) -> RecordBatch:
+    """把逐批产生的记录按列取值保存为RecordBatch
+
+    只读取列定义，不访问模型，可以在后台线程中执行(例如对iter_deduction_records的结果)，
+    每批记录取值后即可释放，不需要先得到全部记录的列表。
+
+    参数:
+        columns: 表格的列
+        record_chunks: 可迭代对象，每项为一批记录
+
+    返回:
+        以各列表头为列名的RecordBatch，交给RecordTableModel.set_batch显示
+    """
+    return RecordBatch.from_chunks(
+        [(column.header, column.kind) for column in columns],
+        ([[column.value(record) for record in records] for column in columns] for records in record_chunks)
+    )
+
+
+class RecordTableModel(QAbstractTableModel):
+    """只读记录表格模型
+
+    加载记录时按列取出各列的值保存为RecordBatch(类型化数组，文本按字典编码)，
+    不保留每行的记录对象；单元格文本在视图绘制可见行时才由列值生成。
+    结果较多时应在后台线程中用records_to_batch生成RecordBatch，再在GUI线程中调用set_batch，
+    替换数据的耗时与行数无关。
+    行数较多时先向视图提供一批，滚动到底部时由视图通过canFetchMore/fetchMore继续加载。
+    排序在模型中进行：按列计算一次排序键(缓存)，再对行号数组排序，列数据本身不移动。
+    """
+
+    BATCH_SIZE = 500  # 每次向视图提供的行数
+
+    def __init__(self, columns: List[RecordColumn], parent=None, batch_size: int = BATCH_SIZE):
+        super().__init__(parent)
+        self.columns = columns
+        self.batch_size = batch_size
+        self._batch = records_to_batch(columns, [])
+        self._order = None     # 排序后的行号数组，None表示保持查询结果的顺序
+        self._sort_keys = {}   # 列号 -> 各行的排序键
+        self._loaded = 0       # 已提供给视图的行数
+
+    def set_records(self, records: list):
+        """在当前线程中按列取值并替换全部记录，用于记录较少的表格
+
+        参数:
+            records: 记录序列，按各列的value取值后不再保留
+        """
+        self.set_batch(records_to_batch(self.columns, [records]))
+
+    def set_batch(self, batch: RecordBatch):
+        """替换全部记录，恢复查询结果的原始顺序
+
+        参数:
+            batch: records_to_batch生成的RecordBatch
+        """
+        self.beginResetModel()
+        self._batch = batch
+        self._order = None
+        self._sort_keys = {}
+        self._loaded = min(self.batch_size, len(self._batch))
+        self.endResetModel()
+
+    def value(self, row: int, column: int) -> Any:
+        """返回视图中第row行第column列保存的值"""
+        if self._order is not None:
+            row = self._order[row]
+        header = self.columns[column].header
+        code = self._batch.columns[header][row]
+        dictionary = self._batch.dictionaries.get(header)
+        return code if dictionary is None else dictionary[code]
+
+    def row_text(self, row: int) -> dict:
+        """返回视图中第row行的显示文本，{表头: 文本}"""
+        return {
+            column.header: column.text(self.value(row, index))
+            for index, column in enumerate(self.columns)
+        }
+
+    def total_count(self) -> int:
+        """记录总数(包括尚未加载到视图中的行)"""
+        return len(self._batch)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        if role == Qt.DisplayRole:
+            return column.text(self.value(index.row(), index.column()))
+        if role == Qt.TextAlignmentRole and column.alignment is not None:
+            return int(column.alignment)
+        if role == Qt.ForegroundRole and column.foreground is not None:
+            color = column.foreground(self.value(index.row(), index.column()))
+            if color is not None:
+                return QBrush(QColor(color))
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._batch)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self._batch) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def _column_sort_keys(self, column: int) -> array:
+        """计算一列的排序键：数值列直接使用保存的值，文本列使用字符串在字典中的排名"""
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            header = self.columns[column].header
+            keys = self._batch.columns[header]
+            dictionary = self._batch.dictionaries.get(header)
+            if dictionary is not None:
+                ranks = array('i', [0]) * len(dictionary)
+                for rank, code in enumerate(sorted(range(len(dictionary)), key=dictionary.__getitem__)):
+                    ranks[code] = rank
+                keys = array('i', [ranks[code] for code in keys])
+            self._sort_keys[column] = keys
+        return keys
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """按列排序全部记录(包括尚未加载的行)；column为-1时恢复原始顺序"""
+        self.beginResetModel()
+        if column < 0 or column >= len(self.columns):
+            self._order = None
+        else:
+            keys = self._column_sort_keys(column)
+            self._order = array('l', sorted(range(len(keys)), key=keys.__getitem__,
+                                             reverse=order == Qt.DescendingOrder))
+        self.endResetModel()
@@ -1,13 +1,76 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-    QDateEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QComboBox, QFormLayout
+    QDateEdit, QPushButton, QTableView, QAbstractItemView,
+    QMessageBox, QComboBox, QFormLayout, QHeaderView
 )
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QDoubleValidator
 from typing import Optional
 from database import Database, DeductionRecord
-from models import ViolationType, AdditionRecord
+from models import ViolationType, date_to_day, day_to_str
+from record_batch import RecordBatch
+from ui.query_worker import QueryRunner
+from ui.record_table_model import RecordColumn, RecordTableModel, records_to_batch
+
+
+def deduction_type_text(record: DeductionRecord) -> str:
+    """扣分记录的违规类型或非违规类型"""
+    if record.deduction_type.value == 1:  # 违规
+        if hasattr(record, 'violation_type') and record.violation_type:
+            return record.violation_type.name
+    else:  # 非违规
+        if hasattr(record, 'non_violation_type') and record.non_violation_type:
+            return record.non_violation_type
+    return ""
+
+
+# 扣分记录查询结果的列
+DEDUCTION_COLUMNS = [
+    RecordColumn("日期", lambda r: date_to_day(r.date), 'i', day_to_str),
+    RecordColumn("姓名", lambda r: r.student_name),
+    RecordColumn("扣分类型", lambda r: "违规" if r.deduction_type.value == 1 else "非违规"),
+    RecordColumn("违规类型", deduction_type_text),
+    RecordColumn("扣分原因", lambda r: r.reason or ""),
+    RecordColumn("扣分值", lambda r: r.points, 'f'),
+    RecordColumn("处理措施", lambda r: r.treatment_measures or ""),
+]
+
+# 加分记录查询结果的列
+ADDITION_COLUMNS = [
+    RecordColumn("开始日期", lambda r: date_to_day(r.start_date), 'i', day_to_str),
+    RecordColumn("结束日期", lambda r: date_to_day(r.end_date), 'i', day_to_str),
+    RecordColumn("姓名", lambda r: r.student_name),
+    RecordColumn("加分原因", lambda r: r.reason or ""),
+    RecordColumn("加分值", lambda r: r.points, 'f'),
+]
+
+
+class ResultsTable(QTableView):
+    """显示查询结果的只读表格，点击表头在模型中排序
+
+    列宽可由用户调整。按内容计算列宽需要逐行测量文本，只在表格第一次有结果时进行一次，
+    之后的查询保留当前列宽。
+    """
+    
+    def __init__(self, model: RecordTableModel, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # 初始不按任何列排序，保持查询结果的顺序
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.columns_sized = False
+        
+    def show_batch(self, batch: RecordBatch):
+        """显示后台线程中由records_to_batch生成的查询结果，耗时与行数无关"""
+        self.model().set_batch(batch)
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        if not self.columns_sized and len(batch):
+            self.resizeColumnsToContents()
+            self.columns_sized = True
 
 
 class DeductionSearchDialog(QDialog):
@@ -16,11 +79,17 @@ class DeductionSearchDialog(QDialog):
     def __init__(self, db: Database, parent=None):
         super().__init__(parent)
         self.db = db
+        self.query_runner = QueryRunner(db, self)
         self.setWindowTitle("扣分记录查询")
         self.setMinimumSize(600, 400)
         
         self.init_ui()
         
+    def done(self, result):
+        """关闭对话框时取消尚未完成的查询"""
+        self.query_runner.cancel()
+        super().done(result)
+        
     def init_ui(self):
         """初始化界面"""
         layout = QVBoxLayout()
@@ -34,6 +103,13 @@ class DeductionSearchDialog(QDialog):
         self.name_edit.setPlaceholderText("输入学生姓名(可选)")
         condition_layout.addWidget(self.name_edit)
         
+        # 关键词输入，在违规行为、扣分原因和处理措施中查找
+        condition_layout.addWidget(QLabel("关键词:"))
+        self.text_edit = QLineEdit()
+        self.text_edit.setPlaceholderText("违规行为/原因/处理措施(可选)")
+        self.text_edit.returnPressed.connect(self.on_search)
+        condition_layout.addWidget(self.text_edit)
+        
         # 记录类型筛选
         condition_layout.addWidget(QLabel("记录类型:"))
         self.type_combo = QComboBox()
@@ -112,16 +188,8 @@ class DeductionSearchDialog(QDialog):
         layout.addLayout(condition_layout)
         
         # 结果表格
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "日期", "姓名", "扣分类型", "违规类型", "扣分原因", "扣分值", "处理措施"
-        ])
-        self.table.horizontalHeader().setStretchLastSection(True)
-        
-        # 设置表格为只读
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.model = RecordTableModel(DEDUCTION_COLUMNS, self)
+        self.table = ResultsTable(self.model)
         
         # 连接双击事件
         self.table.doubleClicked.connect(self.on_table_double_click)
@@ -136,6 +204,7 @@ class DeductionSearchDialog(QDialog):
     def on_search(self):
         """执行查询"""
         name = self.name_edit.text().strip() or None
+        text = self.text_edit.text().strip() or None
         start_date = self.start_date_edit.date().toString("yyyy-MM-dd")
         end_date = self.end_date_edit.date().toString("yyyy-MM-dd")
         
@@ -176,8 +245,9 @@ class DeductionSearchDialog(QDialog):
             QMessageBox.warning(self, "警告", "最小分数不能大于最大分数")
             return
         
-        try:
-            records = self.db.search_deduction_records(
+        # 在后台线程中分批查询并按列保存结果，再次查询时取代尚未完成的上一次查询
+        self.query_runner.run(
+            lambda db: records_to_batch(DEDUCTION_COLUMNS, db.iter_deduction_records(
                 name=name,
                 start_date=start_date,
                 end_date=end_date,
@@ -185,13 +255,18 @@ class DeductionSearchDialog(QDialog):
                 violation_type=violation_type,
                 non_violation_type=non_violation_type,
                 min_points=min_points,
-                max_points=max_points
-            )
-            if not records:
-                QMessageBox.information(self, "提示", "没有找到匹配的记录")
-            self.display_results(records)
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"查询失败: {str(e)}")
+                max_points=max_points,
+                text=text
+            )),
+            self.on_search_finished,
+            lambda error: QMessageBox.critical(self, "错误", f"查询失败: {error}")
+        )
+        
+    def on_search_finished(self, batch: RecordBatch):
+        """显示后台查询的结果"""
+        if not len(batch):
+            QMessageBox.information(self, "提示", "没有找到匹配的记录")
+        self.display_results(batch)
             
     def on_type_changed(self):
         """当扣分类型改变时，更新相关控件的状态"""
@@ -210,55 +285,26 @@ class DeductionSearchDialog(QDialog):
     
     def on_table_double_click(self, index):
         """处理表格双击事件，显示记录详情"""
-        row = index.row()
-        
-        # 获取完整时间戳
-        full_date = self.table.item(row, 0).data(Qt.UserRole)
-        
-        # 准备记录数据
+        # 模型不保留记录对象，详情取自该行各列的显示文本
+        row = self.model.row_text(index.row())
         record_data = {
-            "date": full_date,
-            "name": self.table.item(row, 1).text(),
-            "deduction_type": self.table.item(row, 2).text(),
-            "violation_type": self.table.item(row, 3).text(),
-            "reason": self.table.item(row, 4).text(),
-            "points": self.table.item(row, 5).text(),
-            "treatment_measures": self.table.item(row, 6).text()
+            "date": row["日期"],
+            "name": row["姓名"],
+            "deduction_type": row["扣分类型"],
+            "violation_type": row["违规类型"],
+            "reason": row["扣分原因"],
+            "points": row["扣分值"],
+            "treatment_measures": row["处理措施"]
         }
         
         # 创建并显示详情对话框
         detail_dialog = DeductionDetailDialog(record_data, self)
         detail_dialog.exec_()
         
-    def display_results(self, records: list[DeductionRecord]):
+    def display_results(self, batch: RecordBatch):
         """显示查询结果"""
-        self.table.setRowCount(len(records))
-        
-        for row, record in enumerate(records):
-            # 将datetime对象转换为字符串格式（只显示年月日）
-            date_str = record.date.strftime("%Y-%m-%d")
-            self.table.setItem(row, 0, QTableWidgetItem(date_str))
-            # 存储完整时间戳到用户角色数据中
-            full_date_str = record.date.strftime("%Y-%m-%d %H:%M:%S")
-            self.table.item(row, 0).setData(Qt.UserRole, full_date_str)
-            self.table.setItem(row, 1, QTableWidgetItem(record.student_name))
-            self.table.setItem(row, 2, QTableWidgetItem(
-                "违规" if record.deduction_type.value == 1 else "非违规"
-            ))
-            # 根据记录类型显示违规类型或非违规类型
-            type_str = ""
-            if record.deduction_type.value == 1:  # 违规
-                if hasattr(record, 'violation_type') and record.violation_type:
-                    type_str = record.violation_type.name
-            else:  # 非违规
-                if hasattr(record, 'non_violation_type') and record.non_violation_type:
-                    type_str = record.non_violation_type
-            self.table.setItem(row, 3, QTableWidgetItem(type_str))
-            self.table.setItem(row, 4, QTableWidgetItem(record.reason))
-            self.table.setItem(row, 5, QTableWidgetItem(str(record.points)))
-            self.table.setItem(row, 6, QTableWidgetItem(record.treatment_measures))
-            
-        self.table.resizeColumnsToContents()
+        # 模型按列保存结果，表格只绘制可见行，滚动时再加载后续行
+        self.table.show_batch(batch)
 
 
 class AdditionSearchDialog(QDialog):
@@ -267,11 +313,17 @@ class AdditionSearchDialog(QDialog):
     def __init__(self, db: Database, parent=None):
         super().__init__(parent)
         self.db = db
+        self.query_runner = QueryRunner(db, self)
         self.setWindowTitle("加分记录查询")
         self.setMinimumSize(600, 400)
         
         self.init_ui()
         
+    def done(self, result):
+        """关闭对话框时取消尚未完成的查询"""
+        self.query_runner.cancel()
+        super().done(result)
+        
     def init_ui(self):
         """初始化界面"""
         layout = QVBoxLayout()
@@ -328,12 +380,8 @@ class AdditionSearchDialog(QDialog):
         layout.addLayout(condition_layout)
         
         # 结果表格
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "开始日期", "结束日期", "姓名", "加分原因", "加分值"
-        ])
-        self.table.horizontalHeader().setStretchLastSection(True)
+        self.model = RecordTableModel(ADDITION_COLUMNS, self)
+        self.table = ResultsTable(self.model)
         layout.addWidget(self.table)
         
         self.setLayout(layout)
@@ -371,36 +419,28 @@ class AdditionSearchDialog(QDialog):
             QMessageBox.warning(self, "警告", "最小分数不能大于最大分数")
             return
         
-        try:
-            records = self.db.search_addition_records(
+        # 在后台线程中分批查询并按列保存结果，再次查询时取代尚未完成的上一次查询
+        self.query_runner.run(
+            lambda db: records_to_batch(ADDITION_COLUMNS, db.iter_addition_records(
                 student_name=name,
                 start_date=start_date,
                 end_date=end_date,
                 min_points=min_points,
                 max_points=max_points
-            )
-            if not records:
-                QMessageBox.information(self, "提示", "没有找到匹配的记录")
-            self.display_results(records)
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"查询失败: {str(e)}")
+            )),
+            self.on_search_finished,
+            lambda error: QMessageBox.critical(self, "错误", f"查询失败: {error}")
+        )
+        
+    def on_search_finished(self, batch: RecordBatch):
+        """显示后台查询的结果"""
+        if not len(batch):
+            QMessageBox.information(self, "提示", "没有找到匹配的记录")
+        self.display_results(batch)
             
-    def display_results(self, records: list[AdditionRecord]):
+    def display_results(self, batch: RecordBatch):
         """显示查询结果"""
-        self.table.setRowCount(len(records))
-        
-        for row, record in enumerate(records):
-            # 将datetime对象转换为字符串格式
-            start_date_str = record.start_date.strftime("%Y-%m-%d")
-            end_date_str = record.end_date.strftime("%Y-%m-%d")
-            
-            self.table.setItem(row, 0, QTableWidgetItem(start_date_str))
-            self.table.setItem(row, 1, QTableWidgetItem(end_date_str))
-            self.table.setItem(row, 2, QTableWidgetItem(record.student_name))
-            self.table.setItem(row, 3, QTableWidgetItem(record.reason))
-            self.table.setItem(row, 4, QTableWidgetItem(str(record.points)))
-            
-        self.table.resizeColumnsToContents()
+        self.table.show_batch(batch)
 
 
 class DeductionDetailDialog(QDialog):
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, List
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit, QComboBox, QSpinBox,
+    QPushButton, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
+    QDialogButtonBox, QMessageBox
+)
+from PyQt5.QtCore import Qt, QDate
+
+from database import Database
+from score_statistics import ScoreStatistics, DEFAULT_PERCENTILES
+from ui.query_worker import QueryRunner
+
+
+# 时间序列周期: (显示名称, ScoreStatistics.time_series的period参数, 滚动窗口单位)
+PERIOD_OPTIONS = (("按周", "week", "周"), ("按月", "month", "月"), ("按日", "day", "天"))
+
+# 全班概况表中的各项分布: (显示名称, class_summary中的键)
+DISTRIBUTIONS = (
+    ("学生总分", "total_score"),
+    ("学生净得分", "net_points"),
+    ("单次扣分", "deduction_points"),
+    ("单次加分", "addition_points"),
+)
+
+
+def _format(value, digits: int = 2) -> str:
+    """格式化统计值，None显示为'-'"""
+    if value is None:
+        return "-"
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.{digits}f}"
+
+
+def compute_statistics(db: Database, start_date: str, end_date: str, period: str, window: int) -> Dict[str, Any]:
+    """读取时间段内的数据并计算对话框显示的全部统计(在后台线程中执行)"""
+    statistics = ScoreStatistics(db, start_date, end_date)
+    return {
+        'class': statistics.class_summary(),
+        'students': statistics.student_summary(),
+        'series': statistics.time_series(period, window),
+        'categories': statistics.violation_categories(),
+    }
+
+
+class StatisticsDialog(QDialog):
+    """统计分析对话框: 全班分数分布、学生统计、趋势和违规类别"""
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.query_runner = QueryRunner(db, self)
+
+        self.setWindowTitle("统计分析")
+        self.setMinimumSize(900, 600)
+
+        self.init_ui()
+        self.load_data()
+
+    def init_ui(self):
+        """初始化UI"""
+        layout = QVBoxLayout(self)
+
+        # 查询条件
+        condition_layout = QHBoxLayout()
+        condition_layout.addWidget(QLabel("开始日期:"))
+        self.start_date_edit = QDateEdit()
+        self.start_date_edit.setCalendarPopup(True)
+        self.start_date_edit.setDate(QDate.currentDate().addMonths(-3))
+        condition_layout.addWidget(self.start_date_edit)
+
+        condition_layout.addWidget(QLabel("结束日期:"))
+        self.end_date_edit = QDateEdit()
+        self.end_date_edit.setCalendarPopup(True)
+        self.end_date_edit.setDate(QDate.currentDate())
+        condition_layout.addWidget(self.end_date_edit)
+
+        condition_layout.addWidget(QLabel("趋势:"))
+        self.period_combo = QComboBox()
+        for label, period, _ in PERIOD_OPTIONS:
+            self.period_combo.addItem(label, period)
+        self.period_combo.currentIndexChanged.connect(self.update_window_suffix)
+        condition_layout.addWidget(self.period_combo)
+
+        condition_layout.addWidget(QLabel("滚动窗口:"))
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(1, 365)
+        self.window_spin.setValue(4)
+        condition_layout.addWidget(self.window_spin)
+        self.update_window_suffix()
+
+        self.query_button = QPushButton("查询")
+        self.query_button.clicked.connect(self.load_data)
+        condition_layout.addWidget(self.query_button)
+        condition_layout.addStretch()
+        layout.addLayout(condition_layout)
+
+        # 统计结果
+        self.tabs = QTabWidget()
+        self.class_table = self.add_tab("全班概况")
+        self.student_table = self.add_tab("学生统计")
+        self.series_table = self.add_tab("趋势")
+        self.category_table = self.add_tab("违规类别")
+        layout.addWidget(self.tabs)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def add_tab(self, title: str) -> QTableWidget:
+        """添加一个只读表格页"""
+        table = QTableWidget()
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        table.setAlternatingRowColors(True)
+        self.tabs.addTab(table, title)
+        return table
+
+    def update_window_suffix(self):
+        """滚动窗口的单位随趋势周期变化"""
+        self.window_spin.setSuffix(f" {PERIOD_OPTIONS[self.period_combo.currentIndex()][2]}")
+
+    def done(self, result):
+        """关闭对话框时取消尚未完成的查询"""
+        self.query_runner.cancel()
+        super().done(result)
+
+    def load_data(self):
+        """在后台线程中计算统计，完成后由show_statistics显示"""
+        start_date = self.start_date_edit.date().toString("yyyy-MM-dd")
+        end_date = self.end_date_edit.date().toString("yyyy-MM-dd")
+        if start_date > end_date:
+            QMessageBox.warning(self, "警告", "开始日期不能晚于结束日期")
+            return
+        period = self.period_combo.currentData()
+        window = self.window_spin.value()
+
+        self.query_button.setEnabled(False)
+        self.summary_label.setText("正在统计...")
+        self.query_runner.run(
+            lambda db: compute_statistics(db, start_date, end_date, period, window),
+            self.show_statistics,
+            self.show_error
+        )
+
+    def show_error(self, error: str):
+        """显示后台统计的错误"""
+        self.query_button.setEnabled(True)
+        self.summary_label.setText("")
+        QMessageBox.critical(self, "错误", f"统计失败: {error}")
+
+    def show_statistics(self, result: Dict[str, Any]):
+        """显示统计结果"""
+        self.query_button.setEnabled(True)
+        summary = result['class']
+        self.summary_label.setText(
+            f"学生 {summary['student_count']} 人，扣分记录 {summary['deduction_count']} 条，"
+            f"加分记录 {summary['addition_count']} 条"
+        )
+        self.show_class_summary(summary)
+        self.show_student_summary(result['students'])
+        self.show_time_series(result['series'])
+        self.show_categories(result['categories'])
+
+    def fill_table(self, table: QTableWidget, headers: List[str], rows: List[List[str]]):
+        """设置表头并填充表格"""
+        table.clear()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column_index, text in enumerate(row):
+                item = QTableWidgetItem(text)
+                if column_index > 0:
+                    item.setTextAlignment(Qt.AlignCenter)
+                table.setItem(row_index, column_index, item)
+
+    def show_class_summary(self, summary: Dict[str, Any]):
+        """全班概况: 每项分布一行"""
+        headers = ["项目", "数量", "平均", "中位数", "标准差", "最小"]
+        headers += [f"P{q}" for q in DEFAULT_PERCENTILES] + ["最大"]
+        rows = []
+        for label, key in DISTRIBUTIONS:
+            distribution = summary[key]
+            rows.append(
+                [label, _format(distribution['count']), _format(distribution['mean']),
+                 _format(distribution['median']), _format(distribution['std']), _format(distribution['min'])]
+                + [_format(distribution['percentiles'][q]) for q in DEFAULT_PERCENTILES]
+                + [_format(distribution['max'])]
+            )
+        self.fill_table(self.class_table, headers, rows)
+
+    def show_student_summary(self, students: List[Dict[str, Any]]):
+        """学生统计: 按总分从高到低排列"""
+        headers = ["学生", "扣分次数", "扣分总和", "平均扣分", "扣分中位数", "扣分P90", "加分总和", "净得分", "总分"]
+        rows = [
+            [student['student_name'], _format(student['deduction_count']), _format(student['deduction_points']),
+             _format(student['deduction_mean']), _format(student['deduction_median']),
+             _format(student['deduction_percentiles'].get(90)), _format(student['addition_points']),
+             _format(student['net_points']), _format(student['total_score'])]
+            for student in sorted(students, key=lambda student: student['total_score'], reverse=True)
+        ]
+        self.fill_table(self.student_table, headers, rows)
+
+    def show_time_series(self, series: List[Dict[str, Any]]):
+        """趋势: 每个周期一行"""
+        headers = ["周期", "扣分次数", "违规次数", "扣分总和", "加分总和", "滚动扣分总和", "滚动平均扣分"]
+        rows = [
+            [entry['period'], _format(entry['deduction_count']), _format(entry['violation_count']),
+             _format(entry['deduction_points']), _format(entry['addition_points']),
+             _format(entry['rolling_deduction_points']), _format(entry['rolling_deduction_mean'])]
+            for entry in series
+        ]
+        self.fill_table(self.series_table, headers, rows)
+
+    def show_categories(self, categories: Dict[str, Any]):
+        """违规类别: 第一行为全班合计，之后每个有违规的学生一行(次数/扣分)"""
+        names = categories['categories']
+        headers = ["学生"] + names
+        totals = {total['category']: total for total in categories['totals']}
+        rows = [["全班"] + [
+            f"{totals[name]['count']}次/{totals[name]['points']:.1f}分 ({totals[name]['share']:.0%})"
+            for name in names
+        ]]
+        for student in categories['students']:
+            if not any(student['counts'].values()):
+                continue
+            rows.append([student['student_name']] + [
+                f"{student['counts'][name]}次/{student['points'][name]:.1f}分" for name in names
+            ])
+        self.fill_table(self.category_table, headers, rows)